@@ -0,0 +1,57 @@
+
+# =========================================
+# Shared helpers for the benchmark suite
+# =========================================
+# Puts code/ on sys.path (the examples are plain scripts, not a package) and provides
+# timing/summary helpers so every benchmark reports numbers the same way.
+# =========================================
+
+import sys
+import time
+import statistics
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+CODE_DIR = Path(__file__).resolve().parents[1] / "code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.insert(0, str(CODE_DIR))
+
+
+def summarize(samples_s: list[float]) -> dict:
+    """
+    Summarize timing samples (seconds) in milliseconds.
+    """
+    ordered = sorted(samples_s)
+    p95_index = min(len(ordered) - 1, int(round(len(ordered) * 0.95)) - 1)
+    return {
+        "samples": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "median_ms": round(statistics.median(ordered) * 1000, 4),
+        "p95_ms": round(ordered[max(p95_index, 0)] * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+    }
+
+
+async def measure(run_once: Callable[[], Awaitable[object]], iterations: int, warmup: int = 3) -> list[float]:
+    """
+    Await `run_once()` `warmup` times untimed, then `iterations` times timed.
+    """
+    for _ in range(warmup):
+        await run_once()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await run_once()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def trimmed_mean_ms(samples_s: list[float], trim: float = 0.1) -> float:
+    """
+    Mean in milliseconds after dropping the `trim` fraction of samples at each end, which
+    keeps timer and scheduler outliers of sleep-driven runs out of small differences.
+    """
+    ordered = sorted(samples_s)
+    cut = int(len(ordered) * trim)
+    kept = ordered[cut:len(ordered) - cut] or ordered
+    return round(statistics.fmean(kept) * 1000, 4)
@@ -0,0 +1,68 @@
+# =========================================
+# Benchmark: agent construction and request schema cost, with and without the registry
+# =========================================
+# create_agent(tools=get_weather, response_format=CityInfo) as every request in the
+# examples would do it, once with plain functions (a new pydantic input model each time)
+# and once with the SchemaRegistry's cached declarations. Then the per-request
+# option preparation (tool and response_format JSON schemas) of the plain
+# AzureOpenAIChatClient against SchemaCachedAzureOpenAIChatClient; nothing is sent.
+# =========================================
+
+import asyncio
+
+import _common
+from agent_framework import ChatMessage
+from agent_framework.azure import AzureOpenAIChatClient
+from mock_chat_client import MockChatClient, MockTurn
+from schema_registry import SchemaCachedAzureOpenAIChatClient, SchemaRegistry
+from agent_workflow import CityInfo, get_weather
+
+_SETTINGS = dict(
+    endpoint="https://benchmark.openai.azure.com",
+    deployment_name="benchmark",
+    api_key="benchmark",
+    api_version="2024-10-21",
+)
+
+
+async def run(quick: bool = False) -> dict:
+    iterations = 50 if quick else 2000
+    client = MockChatClient([MockTurn(text="ok")])
+    registry = SchemaRegistry()
+
+    async def plain_agent():
+        client.create_agent(name="Indian-Weather-Agent", tools=get_weather, response_format=CityInfo)
+
+    async def registry_agent():
+        client.create_agent(name="Indian-Weather-Agent", tools=registry.tools(get_weather), response_format=CityInfo)
+
+    plain_client = AzureOpenAIChatClient(**_SETTINGS)
+    cached_client = SchemaCachedAzureOpenAIChatClient(**_SETTINGS)
+    plain_options = plain_client.create_agent(tools=get_weather, response_format=CityInfo).chat_options
+    cached_options = cached_client.create_agent(tools=get_weather, response_format=CityInfo).chat_options
+    messages = [ChatMessage(role="user", text="I am currently at Marina Beach")]
+
+    async def plain_request():
+        plain_client._prepare_options(messages, plain_options)
+
+    async def cached_request():
+        cached_client._prepare_options(messages, cached_options)
+
+    construction = {
+        "plain": _common.summarize(await _common.measure(plain_agent, iterations)),
+        "registry": _common.summarize(await _common.measure(registry_agent, iterations)),
+    }
+    request = {
+        "plain": _common.summarize(await _common.measure(plain_request, iterations)),
+        "registry": _common.summarize(await _common.measure(cached_request, iterations)),
+    }
+    return {
+        "create_agent": construction,
+        "prepare_request": request,
+        "create_agent_saved_ms": round(construction["plain"]["median_ms"] - construction["registry"]["median_ms"], 4),
+        "prepare_request_saved_ms": round(request["plain"]["median_ms"] - request["registry"]["median_ms"], 4),
+    }
+
+
+if __name__ == "__main__":
+    print(asyncio.run(run()))
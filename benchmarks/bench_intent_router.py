@@ -0,0 +1,88 @@
+# =========================================
+# Benchmark: local intent router vs. always running both agents
+# =========================================
+# agent_workflow.build_workflow() (router -> weather -> tourist when needed) against the
+# previous topology (weather -> pipelined tourist on every input), on mock agents with
+# model delays, for a weather question and a recommendation request. Reports wall time,
+# model calls per run and the HopSkippedEvents seen, plus the cost of classify() itself.
+# =========================================
+
+import asyncio
+import time
+
+import _common
+from agent_framework import WorkflowBuilder
+from mock_chat_client import MockChatClient, MockTurn
+from pipelined_edges import PipelinedAgentExecutor, add_pipelined_edge
+from intent_router import HopSkippedEvent
+from agent_workflow import CityInfo, build_workflow
+
+FIRST_TOKEN_DELAY = 0.2
+TOKEN_DELAY = 0.005
+PROMPTS = {
+    "weather_question": "What is the weather in Chennai today?",
+    "recommendation": "I am currently at Marina Beach, where should I go next?",
+}
+
+
+def _agents() -> tuple[MockChatClient, MockChatClient, object, object]:
+    weather_client = MockChatClient(
+        [MockTurn(structured=CityInfo(name="Chennai", weather="sunny"))],
+        first_token_delay=FIRST_TOKEN_DELAY, token_delay=TOKEN_DELAY,
+    )
+    tourist_client = MockChatClient(
+        [MockTurn(structured={"response": "Visit the Government Museum."})],
+        first_token_delay=FIRST_TOKEN_DELAY, token_delay=TOKEN_DELAY,
+    )
+    weather = weather_client.create_agent(name="Indian-Weather-Agent", response_format=CityInfo)
+    tourist = tourist_client.create_agent(name="Indian-Tourist-Agent")
+    return weather_client, tourist_client, weather, tourist
+
+
+def _unrouted(weather, tourist):
+    source, target = PipelinedAgentExecutor(weather), PipelinedAgentExecutor(tourist)
+    builder = WorkflowBuilder().set_start_executor(source)
+    return add_pipelined_edge(builder, source, target, required_fields=["name", "weather"]).build()
+
+
+async def _measure(prompt: str, routed: bool, iterations: int) -> dict:
+    calls: list[int] = []
+    skipped: list[int] = []
+
+    async def run_once():
+        weather_client, tourist_client, weather, tourist = _agents()
+        workflow = build_workflow(weather, tourist) if routed else _unrouted(weather, tourist)
+        skipped.append(sum([isinstance(event, HopSkippedEvent) async for event in workflow.run_stream(prompt)]))
+        calls.append(weather_client.call_count + tourist_client.call_count)
+
+    summary = _common.summarize(await _common.measure(run_once, iterations, warmup=1))
+    return {**summary, "model_calls": max(calls), "skipped_hops": max(skipped)}
+
+
+async def run(quick: bool = False) -> dict:
+    iterations = 2 if quick else 10
+    results: dict[str, dict] = {}
+    for kind, prompt in PROMPTS.items():
+        unrouted = await _measure(prompt, False, iterations)
+        routed = await _measure(prompt, True, iterations)
+        results[kind] = {
+            "unrouted": unrouted,
+            "routed": routed,
+            "saved_calls": unrouted["model_calls"] - routed["model_calls"],
+            "saved_ms": round(unrouted["median_ms"] - routed["median_ms"], 2),
+        }
+
+    # The router's own cost per input
+    _, _, weather, tourist = _agents()
+    router = build_workflow(weather, tourist).executors["router"].router
+    rounds = 200 if quick else 5000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for prompt in PROMPTS.values():
+            router.classify(prompt)
+    results["classify_us"] = round((time.perf_counter() - start) / (rounds * len(PROMPTS)) * 1e6, 2)
+    return results
+
+
+if __name__ == "__main__":
+    print(asyncio.run(run()))
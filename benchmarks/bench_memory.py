@@ -0,0 +1,44 @@
+
+# =========================================
+# Benchmark: peak memory per 1k concurrent agent runs
+# =========================================
+# Starts 1,000 agent.run calls at once against a mock client with a small first-token
+# delay (so they are all in flight together) and records the tracemalloc peak.
+# =========================================
+
+import asyncio
+import tracemalloc
+
+import _common
+from mock_chat_client import MockChatClient, MockTurn
+from simple_agent_with_tools_stream import get_weather
+
+CONCURRENT_RUNS = 1000
+
+
+async def run(quick: bool = False) -> dict:
+    runs = 200 if quick else CONCURRENT_RUNS
+    client = MockChatClient([
+        MockTurn(tool_calls=[("get_weather", {"location": "Chennai"})]),
+        MockTurn(text="It is rainy in Chennai for the next 2 days."),
+    ], first_token_delay=0.05)
+    agent = client.create_agent(name="Indian-Agent", instructions="You are my Indian Agent.", tools=get_weather)
+    await agent.run("warm up")
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    await asyncio.gather(*(agent.run("What is the weather in Chennai?") for _ in range(runs)))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_bytes = peak - baseline
+    return {
+        "concurrent_runs": runs,
+        "peak_mb": round(peak_bytes / 1024 / 1024, 3),
+        "peak_mb_per_1k_runs": round(peak_bytes / runs * 1000 / 1024 / 1024, 3),
+        "peak_kb_per_run": round(peak_bytes / runs / 1024, 3),
+    }
+
+
+if __name__ == "__main__":
+    print(asyncio.run(run()))
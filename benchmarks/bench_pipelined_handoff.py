@@ -0,0 +1,75 @@
+
+# =========================================
+# Benchmark: pipelined hand-off vs. plain chained edge
+# =========================================
+# Upstream agent streams a CityReport whose required fields (name, weather) come first
+# and a long summary last; the downstream agent has its own first-token delay. With a
+# plain edge the downstream call starts after the whole upstream response, with a
+# pipelined edge it starts once name and weather are complete, so the two overlap.
+# =========================================
+
+import asyncio
+import time
+
+import _common
+from pydantic import BaseModel
+from agent_framework import AgentExecutor, WorkflowBuilder
+from mock_chat_client import MockChatClient, MockTurn
+from pipelined_edges import EarlyHandoffEvent, PipelinedAgentExecutor, add_pipelined_edge
+
+FIRST_TOKEN_DELAY = 0.2
+TOKEN_DELAY = 0.005
+
+
+class CityReport(BaseModel):
+    name: str | None = None
+    weather: str | None = None
+    summary: str | None = None
+
+
+def _agents():
+    report = CityReport(name="Chennai", weather="sunny", summary="Marina Beach and the Kapaleeshwarar Temple. " * 8)
+    weather = MockChatClient(
+        [MockTurn(structured=report)], first_token_delay=FIRST_TOKEN_DELAY, token_delay=TOKEN_DELAY
+    ).create_agent(name="Indian-Weather-Agent", response_format=CityReport)
+    tourist = MockChatClient(
+        [MockTurn(structured={"response": "Visit the Government Museum."})],
+        first_token_delay=FIRST_TOKEN_DELAY, token_delay=TOKEN_DELAY,
+    ).create_agent(name="Indian-Tourist-Agent")
+    return weather, tourist
+
+
+async def run(quick: bool = False) -> dict:
+    iterations = 2 if quick else 10
+    handoff_offsets = []
+
+    async def chained():
+        weather, tourist = _agents()
+        source, target = AgentExecutor(weather), AgentExecutor(tourist)
+        workflow = WorkflowBuilder().set_start_executor(source).add_edge(source, target).build()
+        async for _ in workflow.run_stream("I am currently at Marina Beach"):
+            pass
+
+    async def pipelined():
+        weather, tourist = _agents()
+        source, target = PipelinedAgentExecutor(weather), PipelinedAgentExecutor(tourist)
+        builder = WorkflowBuilder().set_start_executor(source)
+        workflow = add_pipelined_edge(builder, source, target, required_fields=["name", "weather"]).build()
+        start = time.perf_counter()
+        async for event in workflow.run_stream("I am currently at Marina Beach"):
+            if isinstance(event, EarlyHandoffEvent):
+                handoff_offsets.append(event.at - start)
+
+    sequential = _common.summarize(await _common.measure(chained, iterations, warmup=1))
+    overlapped = _common.summarize(await _common.measure(pipelined, iterations, warmup=1))
+    return {
+        "chained_edge": sequential,
+        "pipelined_edge": overlapped,
+        "handoff_after_ms": _common.summarize(handoff_offsets)["median_ms"],
+        "saved_ms": round(sequential["median_ms"] - overlapped["median_ms"], 2),
+        "speedup": round(sequential["median_ms"] / overlapped["median_ms"], 3),
+    }
+
+
+if __name__ == "__main__":
+    print(asyncio.run(run()))
@@ -0,0 +1,42 @@
+
+# =========================================
+# Benchmark: per-update overhead of agent.run_stream
+# =========================================
+# Streams a long scripted reply (one character per update, no model delay) and compares
+# consuming agent.run_stream against iterating the mock client's raw stream directly.
+# The difference divided by the number of updates is the framework cost per update.
+# =========================================
+
+import asyncio
+
+import _common
+from mock_chat_client import MockChatClient, MockTurn
+
+UPDATES = 2000
+
+
+async def run(quick: bool = False) -> dict:
+    iterations = 3 if quick else 20
+    client = MockChatClient([MockTurn(text="x" * UPDATES)], chunk_size=1)
+    agent = client.create_agent(name="Indian-Agent", instructions="You are my Indian Agent.")
+
+    async def raw_stream():
+        async for _ in client._inner_get_streaming_response(messages=[], chat_options=agent.chat_options):
+            pass
+
+    async def agent_stream():
+        async for _ in agent.run_stream("Stream a long answer."):
+            pass
+
+    raw = _common.summarize(await _common.measure(raw_stream, iterations))
+    framework = _common.summarize(await _common.measure(agent_stream, iterations))
+    return {
+        "updates_per_run": UPDATES,
+        "raw_stream": raw,
+        "agent_run_stream": framework,
+        "overhead_per_update_us": round((framework["median_ms"] - raw["median_ms"]) * 1000 / UPDATES, 3),
+    }
+
+
+if __name__ == "__main__":
+    print(asyncio.run(run()))
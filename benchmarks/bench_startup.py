@@ -0,0 +1,61 @@
+# =========================================
+# Benchmark: CLI startup time
+# =========================================
+# Wall time of fresh interpreters (best of N, so disk cache and scheduler noise drop out):
+# `agent --help`, `agent tools` with the Azure settings missing (fails before any framework
+# import), importing each subcommand's module on its own, and the old behaviour of
+# importing every example module up front. A bare `python -c pass` is reported as the
+# floor; each figure is also given net of it.
+# =========================================
+
+import os
+import sys
+import time
+import asyncio
+import subprocess
+
+import _common
+from agent_cli import EXAMPLES
+
+CLI = str(_common.CODE_DIR / "agent_cli.py")
+_IMPORT = "import sys, importlib; sys.path.insert(0, {code!r}); [importlib.import_module(name) for name in {modules!r}]"
+
+
+def _best_of(command: list[str], runs: int, env: dict[str, str] | None = None) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, env=env, check=False)
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 1)
+
+
+def _import(modules: list[str]) -> list[str]:
+    return [sys.executable, "-c", _IMPORT.format(code=str(_common.CODE_DIR), modules=modules)]
+
+
+def _measure(quick: bool) -> dict:
+    runs = 2 if quick else 7
+    no_azure = {key: value for key, value in os.environ.items() if not key.startswith("azure_")}
+    interpreter = _best_of([sys.executable, "-c", "pass"], runs)
+    modules = sorted({module for module, _, _ in EXAMPLES.values()} | {"batch_runner", "agent_server"})
+
+    timings = {
+        "cli_help": _best_of([sys.executable, CLI, "--help"], runs),
+        "cli_missing_config": _best_of([sys.executable, CLI, "tools"], runs, env=no_azure),
+        "eager_all_modes": _best_of(_import(modules), runs),
+        **{f"import_{module}": _best_of(_import([module]), runs) for module in modules},
+    }
+    return {
+        "interpreter_ms": interpreter,
+        "wall_ms": timings,
+        "net_ms": {name: round(value - interpreter, 1) for name, value in timings.items()},
+    }
+
+
+async def run(quick: bool = False) -> dict:
+    return await asyncio.to_thread(_measure, quick)
+
+
+if __name__ == "__main__":
+    print(asyncio.run(run()))
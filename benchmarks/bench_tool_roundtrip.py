@@ -0,0 +1,44 @@
+
+# =========================================
+# Benchmark: tool-call round-trip overhead for get_weather
+# =========================================
+# One agent.run where the (mock) model calls get_weather and then answers, compared with
+# doing the same two model calls and the tool call by hand. The difference is what the
+# framework's function-invocation loop costs per tool round trip.
+# =========================================
+
+import asyncio
+
+import _common
+from mock_chat_client import MockChatClient, MockTurn
+from simple_agent_with_tools_stream import get_weather
+
+
+async def run(quick: bool = False) -> dict:
+    iterations = 20 if quick else 300
+    client = MockChatClient([
+        MockTurn(tool_calls=[("get_weather", {"location": "Chennai"})]),
+        MockTurn(text="It is rainy in Chennai for the next 2 days."),
+    ])
+    agent = client.create_agent(name="Indian-Agent", instructions="You are my Indian Agent.", tools=get_weather)
+
+    async def direct():
+        # Same work without the framework loop: model call, tool call, model call
+        first = await client._inner_get_response(messages=[], chat_options=agent.chat_options)
+        get_weather("Chennai")
+        await client._inner_get_response(messages=first.messages, chat_options=agent.chat_options)
+
+    async def agent_run():
+        await agent.run("What is the weather in Chennai?")
+
+    baseline = _common.summarize(await _common.measure(direct, iterations))
+    framework = _common.summarize(await _common.measure(agent_run, iterations))
+    return {
+        "direct": baseline,
+        "agent_run_with_tool": framework,
+        "overhead_per_round_trip_ms": round(framework["median_ms"] - baseline["median_ms"], 4),
+    }
+
+
+if __name__ == "__main__":
+    print(asyncio.run(run()))
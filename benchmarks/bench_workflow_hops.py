@@ -0,0 +1,59 @@
+
+# =========================================
+# Benchmark: WorkflowBuilder hop latency for the two-agent workflow
+# =========================================
+# Rebuilds the weather -> tourist workflow from agent_workflow.py on mock clients and
+# compares workflow.run_stream with calling the two agents back to back by hand.
+# The difference divided by the number of hops is the per-hop workflow overhead.
+# =========================================
+
+import asyncio
+
+import _common
+from agent_framework import AgentExecutor, ChatMessage, Role, WorkflowBuilder
+from mock_chat_client import MockChatClient, MockTurn
+from agent_workflow import CityInfo, get_weather
+
+HOPS = 2  # start -> weather agent, weather agent -> tourist agent
+
+
+def _agents():
+    weather = MockChatClient([
+        MockTurn(tool_calls=[("get_weather", {"location": "Chennai"})]),
+        MockTurn(structured=CityInfo(name="Chennai", weather="sunny")),
+    ]).create_agent(name="Indian-Weather-Agent", tools=get_weather, response_format=CityInfo)
+    tourist = MockChatClient([
+        MockTurn(structured={"response": "Visit the Government Museum."}),
+    ]).create_agent(name="Indian-Tourist-Agent")
+    return weather, tourist
+
+
+async def run(quick: bool = False) -> dict:
+    iterations = 10 if quick else 100
+
+    async def workflow_run():
+        # Executors keep their thread between runs, so build a fresh workflow each time
+        weather, tourist = _agents()
+        weather_exec, tourist_exec = AgentExecutor(weather), AgentExecutor(tourist)
+        workflow = WorkflowBuilder().set_start_executor(weather_exec).add_edge(weather_exec, tourist_exec).build()
+        async for _ in workflow.run_stream("I am currently at Marina Beach"):
+            pass
+
+    async def direct_run():
+        weather, tourist = _agents()
+        prompt = ChatMessage(role=Role.USER, text="I am currently at Marina Beach")
+        first = await weather.run(prompt)
+        # The workflow edge forwards the full conversation: the prompt plus every reply
+        await tourist.run([prompt, *first.messages])
+
+    direct = _common.summarize(await _common.measure(direct_run, iterations))
+    workflow = _common.summarize(await _common.measure(workflow_run, iterations))
+    return {
+        "direct_two_agents": direct,
+        "workflow_run_stream": workflow,
+        "overhead_per_hop_ms": round((workflow["median_ms"] - direct["median_ms"]) / HOPS, 4),
+    }
+
+
+if __name__ == "__main__":
+    print(asyncio.run(run()))
@@ -0,0 +1,99 @@
+
+# =========================================
+# Framework Overhead Benchmark Suite
+# =========================================
+# Runs every benchmark against the deterministic MockChatClient (no Azure credentials
+# needed) and writes the results as JSON, tagged with the git commit, so runs can be
+# compared between commits.
+#
+# Usage:
+#   uv run python benchmarks/run_benchmarks.py                       # all benchmarks
+#   uv run python benchmarks/run_benchmarks.py --only run_stream --quick
+#   uv run python benchmarks/run_benchmarks.py --baseline benchmarks/results/<old>.json
+# =========================================
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import importlib
+import subprocess
+from pathlib import Path
+
+import _common
+
+BENCHMARKS = ["run_stream", "tool_roundtrip", "workflow_hops", "memory", "pipelined_handoff", "agent_construction", "metrics_overhead", "startup", "intent_router"]
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=_common.CODE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _flatten(prefix: str, value, out: dict) -> dict:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, item, out)
+    elif isinstance(value, (int, float)):
+        out[prefix] = value
+    return out
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """
+    Print the relative change of every numeric result against a baseline run.
+    """
+    now = _flatten("", current["results"], {})
+    before = _flatten("", baseline["results"], {})
+    print(f"\nComparison against {baseline['meta']['commit']}:")
+    for key in sorted(now.keys() & before.keys()):
+        if before[key]:
+            change = (now[key] - before[key]) / abs(before[key]) * 100
+            print(f"  {key:<60} {before[key]:>12} -> {now[key]:>12} ({change:+.1f}%)")
+
+
+async def run_all(names: list[str], quick: bool) -> dict:
+    results = {}
+    for name in names:
+        module = importlib.import_module(f"bench_{name}")
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = await module.run(quick=quick)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the framework overhead benchmarks.")
+    parser.add_argument("--only", nargs="*", choices=BENCHMARKS, help="Run only these benchmarks.")
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations, for smoke runs.")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json).")
+    parser.add_argument("--baseline", help="Earlier result file to compare against.")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+        },
+        "results": asyncio.run(run_all(args.only or BENCHMARKS, args.quick)),
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report["results"], indent=2))
+    print(f"\nResults written to {output}", file=sys.stderr)
+
+    if args.baseline:
+        compare(report, json.loads(Path(args.baseline).read_text()))
@@ -0,0 +1,108 @@
+
+# =========================================
+# Unified `agent` Command Line
+# =========================================
+# One entry point for every example instead of one script per mode. Only argparse is
+# imported up front (even asyncio waits until a command runs); a subcommand imports its
+# own example module (and with it agent_framework, the OpenAI SDK, pydantic, ...) only
+# once it is chosen, so `agent --help`, a typo or a missing Azure variable fail in
+# milliseconds instead of after a full framework import, and no mode pays for the
+# modules of the others.
+#
+# Usage (installed as a console script, or `uv run python code/agent_cli.py ...`):
+#   agent simple
+#   agent tools
+#   agent stream
+#   agent hil
+#   agent structured [--stream]
+#   agent workflow [RUN_ID] [--message "What is the weather in Chennai?"]
+#   agent fanout
+#   agent mcp
+#   agent batch --input prompts.jsonl --output results.jsonl --concurrency 32
+#   agent serve --port 8000 --max-streams 500
+# =========================================
+
+import sys
+import argparse
+import importlib
+from collections.abc import Sequence
+from typing import Any
+
+# subcommand -> (module, coroutine function, help)
+EXAMPLES: dict[str, tuple[str, str, str]] = {
+    "simple": ("simple_agent", "simple_agent", "Basic agent on the Responses API."),
+    "tools": ("simple_agent_with_tools", "simple_agent_with_tools", "Agent with the get_weather tool."),
+    "stream": ("simple_agent_with_tools_stream", "simple_agent_with_tools_stream", "Streaming agent showing function calls and results."),
+    "hil": ("simple_agent_HIL", "hil_example", "Human-in-the-loop tool approvals."),
+    "structured": ("agent_with_tool_structured_response", "simple_agent_with_tools", "Structured (CityInfo) response."),
+    "workflow": ("agent_workflow", "simple_agent_with_tools", "Weather -> tourist multi-agent workflow."),
+    "fanout": ("agent_fanout_workflow", "fan_out_workflow", "Concurrent fan-out/fan-in workflow."),
+    "mcp": ("agent_mcp_workflow", "agent_mcp_duckduckgo", "Web search agent over an MCP tool."),
+}
+
+
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="agent", description="Run the Microsoft Agent Framework examples.")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+    parsers = {name: commands.add_parser(name, help=help, description=help) for name, (_, _, help) in EXAMPLES.items()}
+    parsers["structured"].add_argument("--stream", action="store_true", help="Print partial CityInfo snapshots while streaming.")
+    parsers["workflow"].add_argument("run_id", nargs="?", help="Resume this run (with agent_workflow_checkpoints set).")
+    parsers["workflow"].add_argument("--message", default="I am currently at Marina Beach", help="Workflow input.")
+
+    batch = commands.add_parser("batch", help="Run JSONL prompts through the tools agent.", description="Run JSONL prompts through the agent with bounded concurrency.")
+    batch.add_argument("--input", default="-", help="JSONL input file, or - for stdin.")
+    batch.add_argument("--output", default="-", help="JSONL output file, or - for stdout.")
+    batch.add_argument("--concurrency", type=_positive_int, default=16, help="Maximum requests in flight.")
+    batch.add_argument("--rpm", type=float, default=None, help="Requests per minute quota of the deployment.")
+    batch.add_argument("--tpm", type=float, default=None, help="Tokens per minute quota of the deployment.")
+    batch.add_argument("--metrics-out", default=None, help="Write latency metrics here (.prom for Prometheus text, else JSON).")
+
+    serve = commands.add_parser("serve", help="Serve the agents over HTTP with SSE streaming.", description="Serve the example agents over HTTP with SSE streaming.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8000)
+    serve.add_argument("--max-streams", type=int, default=256, help="Concurrent runs before new requests get 503.")
+    serve.add_argument("--slow-client-timeout", type=float, default=30.0, help="Seconds a full stream buffer is tolerated.")
+    return parser
+
+
+def _entry(module: str, function: str) -> Any:
+    return getattr(importlib.import_module(module), function)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    # Fail on missing Azure settings before paying for the framework import
+    from client_factory import load_config
+    try:
+        load_config()
+    except EnvironmentError as exc:
+        parser.error(str(exc))
+
+    import asyncio
+
+    if args.command == "batch":
+        batch_main = _entry("batch_runner", "batch_main")
+        asyncio.run(batch_main(args.input, args.output, args.concurrency, args.rpm, args.tpm, args.metrics_out))
+    elif args.command == "serve":
+        _entry("agent_server", "serve")(args.host, args.port, args.max_streams, args.slow_client_timeout)
+    elif args.command == "structured" and args.stream:
+        asyncio.run(_entry("agent_with_tool_structured_response", "simple_agent_with_tools_streaming")())
+    elif args.command == "workflow":
+        asyncio.run(_entry("agent_workflow", "simple_agent_with_tools")(args.run_id, args.message))
+    else:
+        module, function, _ = EXAMPLES[args.command]
+        asyncio.run(_entry(module, function)())
+
+
+# Entry point: `agent` console script / python code/agent_cli.py
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,87 @@
+
+# =========================================
+# Concurrent Fan-out / Fan-in Agent Workflow Example
+# =========================================
+# Runs independent agents concurrently on the same input and merges their structured
+# outputs, so the end-to-end latency is close to the slowest branch rather than the sum.
+# Per-branch wall times are reported as BranchTimingEvent workflow events.
+# =========================================
+
+import time
+import asyncio
+from typing import Annotated
+from pydantic import Field, BaseModel
+from agent_framework import WorkflowOutputEvent
+from client_factory import get_chat_client
+from workflow_fanout import BranchTimingEvent, TimedAgentExecutor, build_fan_out_workflow
+
+
+# Structured response models for the branches
+class CityInfo(BaseModel):
+    name: str | None = None  # City name
+    weather: str | None = None  # Weather description
+
+
+class FoodInfo(BaseModel):
+    city: str | None = None  # City name
+    dish: str | None = None  # Signature local dish
+
+
+class HistoryInfo(BaseModel):
+    city: str | None = None  # City name
+    landmark: str | None = None  # Most famous historical landmark
+    founded: str | None = None  # When the city was founded
+
+
+# Tool function for weather lookup
+def get_weather(location: Annotated[str, Field(description="The location to get weather for")]) -> str:
+    """
+    Tool function to get weather information for a given location.
+    In a real implementation, this would call a weather API.
+    """
+    # Placeholder response for demonstration
+    return f"The weather in {location} is sunny for the next 2 days."
+
+
+async def fan_out_workflow():
+    """
+    Main function to run three independent agents concurrently and print their merged output.
+    """
+    chat_client = get_chat_client()
+
+    # Independent branches: each one only needs the user's input
+    branches = [
+        TimedAgentExecutor(chat_client.create_agent(
+            name="Indian-Weather-Agent",
+            instructions="You figure out the city from the information provided and also return weather.",
+            tools=get_weather,
+            response_format=CityInfo
+        )),
+        TimedAgentExecutor(chat_client.create_agent(
+            name="Indian-Food-Agent",
+            instructions="You figure out the city from the information provided and return its signature dish.",
+            response_format=FoodInfo
+        )),
+        TimedAgentExecutor(chat_client.create_agent(
+            name="Indian-History-Agent",
+            instructions="You figure out the city from the information provided and return its history highlights.",
+            response_format=HistoryInfo
+        )),
+    ]
+    workflow = build_fan_out_workflow(branches)
+
+    # Run the workflow and report per-branch timings plus the merged output
+    # (branch tokens interleave when run concurrently, so they are not printed here)
+    start = time.perf_counter()
+    async for event in workflow.run_stream("I am currently at Marina Beach"):
+        if isinstance(event, BranchTimingEvent):
+            print(f"[{event.executor_id}] finished in {event.elapsed_ms:.0f} ms")
+        elif isinstance(event, WorkflowOutputEvent):
+            print("\n=== Merged output ===")
+            print(event.data)
+    print(f"End-to-end: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+# Entry point: run the fan-out workflow demonstration
+if __name__ == "__main__":
+    asyncio.run(fan_out_workflow())
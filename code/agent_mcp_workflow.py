@@ -11,58 +11,66 @@
 # =========================================
 
 import os
+import sys
+import time
 import asyncio
-from agent_framework.azure import AzureOpenAIChatClient
-from agent_framework import ChatAgent, MCPStdioTool
+from client_factory import get_chat_client
+from agent_framework import ChatAgent
+from mcp_pool import MCPStdioPool
+
+
+def search_pool() -> MCPStdioPool:
+    """
+    Pool of warm DuckDuckGo MCP sessions (via Docker), or of the local stand-in search
+    server when the agent_mcp_server environment variable is set to "local".
+    """
+    if os.getenv("agent_mcp_server", "docker") == "local":
+        server_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mcp_search_server.py")
+        return MCPStdioPool(name="duckduckgo", command=sys.executable, args=[server_script], size=2)
+    return MCPStdioPool(
+        name="duckduckgo",
+        command="docker",
+        args=[
+            "run",
+            "-i",
+            "duckduckgo-mcp-server:latest"
+        ],
+        size=2,
+    )
+
 
 async def agent_mcp_duckduckgo():
     """Example using DuckDuckGo MCP server via Docker for web search.
     
-    This function sets up the DuckDuckGo MCP tool and the Azure OpenAI chat agent,
-    allowing for web searches to be performed and results to be printed.
+    This function sets up a warm pool of DuckDuckGo MCP sessions and the Azure OpenAI
+    chat agent, allowing for web searches to be performed and results to be printed.
+    Only the first query waits for the MCP servers to start.
     """
     
-    # Load Azure OpenAI configuration from environment variables
-    endpoint = os.getenv("azure_endpoint")
-    api_key = os.getenv("azure_apikey")
-    deployment_name = os.getenv("azure_deployment")
-    api_version = os.getenv("azure_version")
-
-    # Validate required environment variables
-    if not all([endpoint, api_key, deployment_name, api_version]):
-        raise EnvironmentError("Missing one or more required Azure OpenAI environment variables.")
-
-    # Create the DuckDuckGo MCP tool (runs via Docker)
+    # Start the DuckDuckGo MCP sessions once (runs via Docker) and reuse them per query
     async with (
-        MCPStdioTool(
-            name="duckduckgo",
-            command="docker",
-            args=[
-                "run",
-                "-i",
-                "duckduckgo-mcp-server:latest"
-            ]
-        ) as ddg_tool,
-        # Create the chat agent with Azure OpenAI
+        search_pool() as ddg_pool,
+        # Create the chat agent on the shared, pooled Azure OpenAI chat client
         ChatAgent(
-            chat_client=AzureOpenAIChatClient(
-                endpoint=endpoint,
-                deployment_name=deployment_name,
-                api_version=api_version,
-                api_key=api_key
-            ),
+            chat_client=get_chat_client(),
             name="WebSearchAgent",
             instructions="You are a helpful assistant that can answer questions by searching the web using DuckDuckGo.",
         ) as agent,
     ):
-        # Define the query to run
-        query = "What is the capital of France?"
-        # Stream the agent's response and print only the final result
-        async for event in agent.run_stream(query, tools=ddg_tool):
-            contents = getattr(event, 'contents', [])
-            for content in contents:
-                if hasattr(content, "text"):
-                    print(content.text, end="", flush=True)
+        # Define the queries to run
+        queries = ["What is the capital of France?", "What is the capital of India?"]
+        for query in queries:
+            start = time.perf_counter()
+            # Lease a warm MCP session for this run
+            async with ddg_pool.lease() as ddg_tool:
+                # Stream the agent's response and print only the final result
+                async for event in agent.run_stream(query, tools=ddg_tool):
+                    contents = getattr(event, 'contents', [])
+                    for content in contents:
+                        if hasattr(content, "text"):
+                            print(content.text, end="", flush=True)
+            print(f"\n[{query}] answered in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+        print(f"MCP pool stats: {ddg_pool.stats.to_dict()}")
 
 
 
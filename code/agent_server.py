@@ -0,0 +1,389 @@
+
+# =========================================
+# Long-running Agent Server (HTTP + Server-Sent Events)
+# =========================================
+# Every example is a one-shot asyncio.run(...) script, so each invocation pays for Python
+# startup, the agent_framework import, client construction and the TLS handshake. This
+# server builds the agents once and serves them over HTTP from one event loop:
+#
+#   GET  /health                          server counters
+#   GET  /metrics                         latency histograms, Prometheus text (metrics.py)
+#   POST /agents/{name}/run               {"message": "...", "thread": <state>?} -> JSON
+#   POST /agents/{name}/run_stream        same body -> SSE: update*, done | error
+#   POST /workflows/{name}/run            {"message": "..."} -> JSON outputs
+#   POST /workflows/{name}/run_stream     same body -> SSE: skipped*, update*, output*, done | error
+#
+# Threads are request scoped: a request runs on a new thread, or on the serialized thread
+# state it sends, and gets the updated state back ("thread" in the JSON / done event), so
+# the server itself keeps no conversation state. Workflows are built per request (their
+# executors hold run state); the agents and the pooled chat client are shared.
+#
+# Backpressure: each stream has a small buffer between the agent and the socket. When a
+# client reads slowly the buffer fills and the agent stream is no longer pulled; if it stays
+# full for `slow_client_timeout` seconds the run is cancelled and the stream ends with an
+# error event in place of the updates still buffered. Past `max_streams` concurrent
+# runs new requests get 503 with Retry-After instead of queueing without bound.
+#
+# Usage:
+#   uv run python code/agent_server.py --port 8000 --max-streams 500
+#   curl -N -X POST localhost:8000/agents/indian-agent/run_stream -d '{"message": "Weather in Chennai?"}'
+# =========================================
+
+import os
+import sys
+import json
+import asyncio
+import logging
+from collections.abc import AsyncGenerator, AsyncIterable, AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, asdict
+from typing import Any
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from agent_framework import AgentRunUpdateEvent, WorkflowOutputEvent
+from intent_router import HopSkippedEvent
+from metrics import Metrics, get_metrics
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+_TOO_SLOW = object()
+
+
+@dataclass
+class ServerStats:
+    """
+    Counters describing the traffic the agent server has seen.
+    """
+    active: int = 0
+    peak_active: int = 0
+    requests: int = 0
+    rejected: int = 0
+    failed: int = 0
+    slow_clients: int = 0
+    disconnected: int = 0
+
+
+class _ServerBusy(Exception):
+    pass
+
+
+class _NotFound(Exception):
+    pass
+
+
+class _BadRequest(Exception):
+    pass
+
+
+class _StreamResponse(StreamingResponse):
+    """
+    StreamingResponse that runs `on_close` however the response ends, even when the
+    client disconnects before the body is first read.
+    """
+
+    def __init__(self, content: AsyncIterable[bytes], on_close: Callable[[], None]):
+        super().__init__(content, media_type="text/event-stream")
+        self._on_close = on_close
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._on_close()
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+def _update_payload(update: Any) -> dict:
+    return {"text": update.text, "contents": [content.to_dict() for content in update.contents]}
+
+
+class AgentServer:
+    """
+    Serves prebuilt agents and workflow factories over HTTP with bounded concurrency.
+    """
+
+    def __init__(
+        self,
+        agents: dict[str, Any] | None = None,
+        workflows: dict[str, Callable[[], Any]] | None = None,
+        *,
+        max_streams: int = 256,
+        buffer_size: int = 32,
+        slow_client_timeout: float = 30.0,
+        ping_interval: float = 15.0,
+        metrics: Metrics | None = None,
+    ):
+        self.agents = agents or {}
+        self.workflows = workflows or {}
+        self.max_streams = max_streams
+        self.buffer_size = buffer_size
+        self.slow_client_timeout = slow_client_timeout
+        self.ping_interval = ping_interval
+        self.stats = ServerStats()
+        self.metrics = metrics or get_metrics()
+
+    # ---- admission ----------------------------------------------------------
+
+    def _admit(self) -> None:
+        if self.stats.active >= self.max_streams:
+            self.stats.rejected += 1
+            raise _ServerBusy
+        self.stats.active += 1
+        self.stats.requests += 1
+        self.stats.peak_active = max(self.stats.peak_active, self.stats.active)
+
+    def _release(self) -> None:
+        self.stats.active -= 1
+
+    def _busy(self) -> Response:
+        return JSONResponse({"error": "Server is at capacity, retry shortly."}, status_code=503, headers={"Retry-After": "1"})
+
+    # ---- streaming ----------------------------------------------------------
+
+    async def _sse(self, events: AsyncGenerator[tuple[str, Any], None]) -> AsyncIterator[bytes]:
+        """
+        Encode (event, data) pairs as SSE through a bounded buffer; the run is cancelled
+        when the stream ends early (client gone, or too slow).
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.buffer_size)
+
+        async def send(item: Any) -> bool:
+            # Waits while the buffer is full: a slow reader slows the agent down.
+            # Only this wait counts as a slow client, not timeouts inside the run
+            try:
+                await asyncio.wait_for(queue.put(item), self.slow_client_timeout)
+                return True
+            except TimeoutError:
+                return False
+
+        async def produce() -> None:
+            delivered = True
+            try:
+                async for item in events:
+                    if not (delivered := await send(item)):
+                        break
+            except Exception as exc:
+                self.stats.failed += 1
+                logger.exception("Agent run failed")
+                delivered = await send(("error", {"error": str(exc)}))
+            finally:
+                # Stop the agent run (and its upstream HTTP stream) right away
+                await events.aclose()
+            if delivered and await send(_END):
+                return
+            self.stats.slow_clients += 1
+            logger.warning("Client read too slowly; cancelling its run.")
+            # Drop the updates it has not read, so the stream still ends with an error
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(_TOO_SLOW)
+
+        producer = asyncio.create_task(produce())
+        finished = False
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), self.ping_interval)
+                except TimeoutError:
+                    if producer.done() and queue.empty():
+                        finished = True
+                        break
+                    # SSE comment line: keeps proxies from closing an idle stream
+                    yield b": ping\n\n"
+                    continue
+                if item is _END:
+                    finished = True
+                    break
+                if item is _TOO_SLOW:
+                    # An abnormal end: counted as a disconnect, not as a finished stream
+                    yield sse_event("error", {"error": "Client read too slowly; the run was cancelled."})
+                    break
+                yield sse_event(*item)
+        finally:
+            if not finished:
+                self.stats.disconnected += 1
+            producer.cancel()
+
+    async def _agent_events(self, agent: Any, message: str, thread: Any) -> AsyncIterator[tuple[str, Any]]:
+        async for update in agent.run_stream(message, thread=thread):
+            yield "update", _update_payload(update)
+        yield "done", {"thread": await thread.serialize()}
+
+    async def _workflow_events(self, workflow: Any, message: str) -> AsyncIterator[tuple[str, Any]]:
+        async for event in workflow.run_stream(message):
+            if isinstance(event, AgentRunUpdateEvent):
+                yield "update", {"executor_id": event.executor_id, **_update_payload(event.data)}
+            elif isinstance(event, HopSkippedEvent):
+                yield "skipped", {"executor_id": event.target_id, "intent": event.intent}
+            elif isinstance(event, WorkflowOutputEvent):
+                yield "output", {"executor_id": event.source_executor_id, "data": _output_payload(event.data)}
+        yield "done", {}
+
+    # ---- routes -------------------------------------------------------------
+
+    async def _body(self, request: Request) -> dict:
+        try:
+            body = await request.json()
+        except json.JSONDecodeError:
+            body = None
+        if not isinstance(body, dict) or not isinstance(body.get("message"), str):
+            raise _BadRequest('Expected a JSON body like {"message": "..."}.')
+        return body
+
+    async def _thread(self, agent: Any, body: dict) -> Any:
+        # Request-scoped thread: fresh, or restored from the state the client sent
+        state = body.get("thread")
+        if not state:
+            return agent.get_new_thread()
+        try:
+            return await agent.deserialize_thread(state)
+        except Exception as exc:
+            raise _BadRequest('Invalid "thread" state; send back the "thread" of an earlier response.') from exc
+
+    def _lookup(self, registry: dict, request: Request) -> Any:
+        name = request.path_params["name"]
+        if name not in registry:
+            raise _NotFound(name)
+        return registry[name]
+
+    async def health(self, request: Request) -> Response:
+        return JSONResponse({
+            **asdict(self.stats),
+            "max_streams": self.max_streams,
+            "agents": sorted(self.agents),
+            "workflows": sorted(self.workflows),
+        })
+
+    async def metrics_text(self, request: Request) -> Response:
+        return PlainTextResponse(self.metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+    async def run_agent(self, request: Request) -> Response:
+        agent = self._lookup(self.agents, request)
+        body = await self._body(request)
+        thread = await self._thread(agent, body)
+        self._admit()
+        try:
+            response = await agent.run(body["message"], thread=thread)
+            return JSONResponse({
+                "text": response.text,
+                "messages": [message.to_dict() for message in response.messages],
+                "thread": await thread.serialize(),
+            })
+        except Exception:
+            self.stats.failed += 1
+            raise
+        finally:
+            self._release()
+
+    async def run_agent_stream(self, request: Request) -> Response:
+        agent = self._lookup(self.agents, request)
+        body = await self._body(request)
+        thread = await self._thread(agent, body)
+        self._admit()
+        return _StreamResponse(self._sse(self._agent_events(agent, body["message"], thread)), self._release)
+
+    async def run_workflow(self, request: Request) -> Response:
+        factory = self._lookup(self.workflows, request)
+        body = await self._body(request)
+        self._admit()
+        try:
+            result = await self.metrics.instrument_workflow(factory()).run(body["message"])
+            return JSONResponse({"outputs": [_output_payload(output) for output in result.get_outputs()]})
+        except Exception:
+            self.stats.failed += 1
+            raise
+        finally:
+            self._release()
+
+    async def run_workflow_stream(self, request: Request) -> Response:
+        factory = self._lookup(self.workflows, request)
+        body = await self._body(request)
+        self._admit()
+        workflow = self.metrics.instrument_workflow(factory())
+        return _StreamResponse(self._sse(self._workflow_events(workflow, body["message"])), self._release)
+
+    def app(self, lifespan: Callable[[Starlette], Any] | None = None) -> Starlette:
+        async def not_found(request: Request, exc: _NotFound) -> Response:
+            return JSONResponse({"error": f"Unknown agent or workflow {exc.args[0]!r}."}, status_code=404)
+
+        async def bad_request(request: Request, exc: _BadRequest) -> Response:
+            return JSONResponse({"error": str(exc)}, status_code=400)
+
+        async def busy(request: Request, exc: _ServerBusy) -> Response:
+            return self._busy()
+
+        return Starlette(
+            routes=[
+                Route("/health", self.health, methods=["GET"]),
+                Route("/metrics", self.metrics_text, methods=["GET"]),
+                Route("/agents/{name}/run", self.run_agent, methods=["POST"]),
+                Route("/agents/{name}/run_stream", self.run_agent_stream, methods=["POST"]),
+                Route("/workflows/{name}/run", self.run_workflow, methods=["POST"]),
+                Route("/workflows/{name}/run_stream", self.run_workflow_stream, methods=["POST"]),
+            ],
+            exception_handlers={_NotFound: not_found, _BadRequest: bad_request, _ServerBusy: busy},
+            lifespan=lifespan,
+        )
+
+
+def _output_payload(data: Any) -> Any:
+    # Workflow outputs are usually AgentRunResponse objects
+    if hasattr(data, "to_dict"):
+        return {"text": getattr(data, "text", None), **data.to_dict()}
+    return data
+
+
+def create_app(**options: Any) -> Starlette:
+    """
+    The example agents and workflow behind an AgentServer. They are built once, when the
+    server starts, on the shared pooled (and optionally hedged) chat client.
+    """
+    server = AgentServer(**options)
+
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        from client_factory import aclose_clients, get_chat_client
+        from hedged_client import get_hedged_chat_client
+        from response_cache import response_cache_middleware_from_env
+        from simple_agent_with_tools import AGENT_NAME, AGENT_INSTRUCTIONS, get_weather
+        from agent_workflow import build_workflow, create_workflow_agents
+
+        server.agents["indian-agent"] = get_hedged_chat_client().create_agent(
+            name=AGENT_NAME,
+            instructions=AGENT_INSTRUCTIONS,
+            middleware=[*server.metrics.middleware(), *response_cache_middleware_from_env()],
+            tools=get_weather
+        )
+        workflow_agents = create_workflow_agents(get_chat_client())
+        server.workflows["city-guide"] = lambda: build_workflow(*workflow_agents)
+        app.state.server = server
+        try:
+            yield
+        finally:
+            await aclose_clients()
+
+    return server.app(lifespan=lifespan)
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, max_streams: int = 256, slow_client_timeout: float = 30.0) -> None:
+    import uvicorn
+
+    # Every concurrent stream holds one upstream connection: size the shared pool to match
+    os.environ.setdefault("agent_pool_max_connections", str(max_streams))
+    app = create_app(max_streams=max_streams, slow_client_timeout=slow_client_timeout)
+    uvicorn.run(app, host=host, port=port, log_level="warning")
+
+
+# Entry point: serve the example agents until interrupted (same as `agent serve`)
+if __name__ == "__main__":
+    from agent_cli import main
+
+    main(["serve", *sys.argv[1:]])
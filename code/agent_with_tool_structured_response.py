@@ -1,7 +1,9 @@
 
-import os
+import sys
+import time
 import asyncio
-from agent_framework.azure import AzureOpenAIChatClient
+from client_factory import get_chat_client
+from structured_stream import stream_structured
 from typing import Annotated
 from pydantic import Field,BaseModel
 
@@ -39,23 +41,8 @@ async def simple_agent_with_tools():
     Main function to run the agent with tool support and print a structured response to a sample query.
     Demonstrates how to get a structured (Pydantic model) response from the LLM.
     """
-    # Load Azure OpenAI configuration from environment variables
-    endpoint = os.getenv("azure_endpoint")
-    api_key = os.getenv("azure_apikey")
-    deployment_name = os.getenv("azure_deployment")
-    api_version = os.getenv("azure_version")
-
-    # Validate required environment variables
-    if not all([endpoint, api_key, deployment_name, api_version]):
-        raise EnvironmentError("Missing one or more required Azure OpenAI environment variables.")
-
-    # Create the agent with specified name, instructions, and tool(s)
-    agent = AzureOpenAIChatClient(
-        endpoint=endpoint,
-        deployment_name=deployment_name,
-        api_version=api_version,
-        api_key=api_key
-    ).create_agent(
+    # Create the agent on the shared, pooled chat client with specified name, instructions, and tool(s)
+    agent = get_chat_client().create_agent(
         name=AGENT_NAME,
         instructions=AGENT_INSTRUCTIONS,
         tools=get_weather
@@ -66,10 +53,27 @@ async def simple_agent_with_tools():
     response = await agent.run("I am at the Marina beach.", response_format=CityInfo)
     print(response)
 
-# Entry point: run the agent for structured response demonstration
-if __name__ == "__main__":
-    asyncio.run(simple_agent_with_tools())
+async def simple_agent_with_tools_streaming():
+    """
+    Same query, streamed: prints a typed partial CityInfo as soon as each field is complete,
+    so `name` can be used before the rest of the JSON has arrived.
+    """
+    agent = get_chat_client().create_agent(
+        name=AGENT_NAME,
+        instructions=AGENT_INSTRUCTIONS,
+        tools=get_weather
+    )
 
+    start = time.perf_counter()
+    updates = agent.run_stream("I am at the Marina beach.", response_format=CityInfo)
+    async for city in stream_structured(updates, CityInfo):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"[{elapsed_ms:.0f} ms] fields={sorted(city.model_fields_set)} {city!r}")
+
+# Entry point: run the agent for structured response demonstration
+# (pass --stream to see partial CityInfo snapshots while the response streams)
 if __name__ == "__main__":
-    # Entry point: run the agent with tools asynchronously
-    asyncio.run(simple_agent_with_tools())
\ No newline at end of file
+    if "--stream" in sys.argv:
+        asyncio.run(simple_agent_with_tools_streaming())
+    else:
+        asyncio.run(simple_agent_with_tools())
@@ -1,8 +1,12 @@
 
-import os
+import sys
+import uuid
 import asyncio
-from agent_framework.azure import AzureOpenAIChatClient
-from agent_framework import AgentExecutor, AgentRunUpdateEvent, WorkflowBuilder, WorkflowOutputEvent, WorkflowStatusEvent, WorkflowViz
+from client_factory import get_chat_client
+from agent_framework import AgentRunUpdateEvent, Case, Default, WorkflowBuilder, WorkflowOutputEvent, WorkflowStatusEvent
+from intent_router import HopSkippedEvent, Intent, IntentRouter, RouteOutputExecutor, RouterExecutor
+from workflow_checkpoint import CheckpointedPipelinedAgentExecutor, ExecutorReplayedEvent, checkpoint_run, checkpoint_store_from_env
+from workflow_viz import render_workflow_svg
 from typing import Annotated
 from pydantic import Field,BaseModel
 
@@ -29,82 +33,129 @@ def get_weather(location: Annotated[str, Field(description="The location to get
 
 
 
-async def simple_agent_with_tools():
+def create_workflow_agents(chat_client):
+    """
+    Create the Indian Weather and Indian Tourist agents. Agents hold no conversation
+    state, so one pair can serve any number of workflow runs.
+    """
+    # Create the first agent: Indian Weather Agent
+    indian_weather_agent = chat_client.create_agent(
+        name="Indian-Weather-Agent",
+        instructions="You are IWA, a helpful assistant that figures out the city from the information provided and also returns weather.",
+        tools=get_weather,
+        response_format=CityInfo
+    )
+
+    # Create the second agent: Indian Tourist Agent
+    indian_tourist_agent = chat_client.create_agent(
+        name="Indian-Tourist-Agent",
+        instructions=(
+            "You are ITA, an assistant who provides tourist recommendations based on a city. "
+            "Your input might be a JSON object that includes 'city' or 'weather'. "
+            "Base your response on 'city' and 'weather'. If the weather is sunny and warm, recommend an outdoor place. "
+            "Else recommend an indoor place. Do not recommend the place you are already at. "
+            "Return JSON with a single field response."
+        )
+    )
+    return indian_weather_agent, indian_tourist_agent
+
+
+# Keywords for the local router: weather questions only need the weather agent
+WEATHER_KEYWORDS = (
+    "weather", "forecast", "temperature", "rain", "raining", "rainy", "sunny", "humid", "humidity", "monsoon",
+    "hot", "cold",
+)
+RECOMMENDATION_KEYWORDS = (
+    "recommend", "recommendation", "suggest", "visit", "places", "place to", "things to do", "where should",
+    "where can", "tourist", "sightseeing", "i am at", "currently at", "trip", "plan",
+)
+
+
+def build_workflow(indian_weather_agent, indian_tourist_agent, checkpoints=None):
+    """
+    Build the router -> weather -> tourist workflow. Executors keep per-run state (their
+    threads, the router's decision), so build one workflow per run.
+    """
+    weather_executor = CheckpointedPipelinedAgentExecutor(indian_weather_agent, checkpoints=checkpoints)
+    tourist_executor = CheckpointedPipelinedAgentExecutor(indian_tourist_agent, checkpoints=checkpoints, output_response=True)
+
+    # Local router (no model call): a plain weather question skips the tourist agent
+    router = RouterExecutor(IntentRouter([
+        Intent("weather", (weather_executor.id,), WEATHER_KEYWORDS),
+        Intent("recommendation", (weather_executor.id, tourist_executor.id), RECOMMENDATION_KEYWORDS),
+    ], default="recommendation"))
+
+    def needs_tourist(_response=None) -> bool:
+        return router.needs(tourist_executor.id)
+
+    # The weather -> tourist hand-off is pipelined: the tourist agent starts as soon as
+    # `name` and `weather` are complete in the weather agent's CityInfo stream, unless
+    # the router skipped it. Without the tourist hop the weather answer is the output.
+    weather_executor.pipeline_to(tourist_executor, ["name", "weather"], when=needs_tourist)
+    return (
+        WorkflowBuilder()
+        .set_start_executor(router)
+        .add_edge(router, weather_executor)
+        .add_switch_case_edge_group(weather_executor, [
+            Case(condition=needs_tourist, target=tourist_executor),
+            Default(target=RouteOutputExecutor()),
+        ])
+        .build()
+    )
+
+
+async def simple_agent_with_tools(run_id: str | None = None, message: str = "I am currently at Marina Beach"):
     """
     Main function to run a multi-agent workflow with tool support and print structured responses.
     Demonstrates how to chain agents using a workflow and visualize the process.
+    Pass the run id of a failed run to resume it (needs agent_workflow_checkpoints=<file>).
+    A plain weather question (e.g. "What is the weather in Chennai?") skips the tourist agent.
     """
-    # Load Azure OpenAI configuration from environment variables
-    endpoint = os.getenv("azure_endpoint")
-    api_key = os.getenv("azure_apikey")
-    deployment_name = os.getenv("azure_deployment")
-    api_version = os.getenv("azure_version")
+    # Both agents share one pooled chat client (and so one keep-alive connection pool)
+    chat_client = get_chat_client()
 
-    # Validate required environment variables
-    if not all([endpoint, api_key, deployment_name, api_version]):
-        raise EnvironmentError("Missing one or more required Azure OpenAI environment variables.")
+    # Opt-in per-executor checkpoints: executors that completed in an earlier attempt of
+    # this run id are replayed from the store instead of calling the model again
+    checkpoints = checkpoint_store_from_env()
+    run_id = run_id or uuid.uuid4().hex[:12]
+    if checkpoints is not None:
+        print(f"Workflow run id: {run_id} (completed: {checkpoints.completed(run_id)})")
 
     try:
-        # Create the first agent: Indian Weather Agent
-        indian_weather_agent = AgentExecutor(AzureOpenAIChatClient(
-            endpoint=endpoint,
-            deployment_name=deployment_name,
-            api_version=api_version,
-            api_key=api_key
-        ).create_agent(
-            name="Indian-Weather-Agent",
-            instructions="You are IWA, a helpful assistant that figures out the city from the information provided and also returns weather.",
-            tools=get_weather,
-            response_format=CityInfo
-        ))
-
-        # Create the second agent: Indian Tourist Agent
-        indian_tourist_agent = AgentExecutor(AzureOpenAIChatClient(
-            endpoint=endpoint,
-            deployment_name=deployment_name,
-            api_version=api_version,
-            api_key=api_key
-        ).create_agent(
-            name="Indian-Tourist-Agent",
-            instructions=(
-                "You are ITA, an assistant who provides tourist recommendations based on a city. "
-                "Your input might be a JSON object that includes 'city' or 'weather'. "
-                "Base your response on 'city' and 'weather'. If the weather is sunny and warm, recommend an outdoor place. "
-                "Else recommend an indoor place. Do not recommend the place you are already at. "
-                "Return JSON with a single field response."
-            )
-        ))
-
-        # Build the workflow: weather agent feeds into tourist agent
-        workflow = WorkflowBuilder().set_start_executor(indian_weather_agent).add_edge(indian_weather_agent, indian_tourist_agent).build()
-
-        # Visualize the workflow and save as SVG
-        viz = WorkflowViz(workflow)
-        doc_diagram = viz.save_svg("docs/agent_workflow.svg")
+        workflow = build_workflow(*create_workflow_agents(chat_client), checkpoints=checkpoints)
 
-        # Run the workflow with a sample input and stream events
-        events = workflow.run_stream("I am currently at Marina Beach")
+        # Visualize the workflow as SVG on a worker thread; skipped when the saved diagram
+        # already shows this topology (or with agent_workflow_viz=off)
+        render_workflow_svg(workflow, "docs/agent_workflow.svg")
 
+        # Run the workflow with a sample input and stream events
         last_executor_id: str | None = None
 
-        async for event in events:
-            if isinstance(event, AgentRunUpdateEvent):
-                eid = event.executor_id
-                if eid != last_executor_id:
-                    if last_executor_id is not None:
-                        print()
-                    print(f"{eid}:", end=" ", flush=True)
-                    last_executor_id = eid
-                print(event.data, end="", flush=True)
-            elif isinstance(event, WorkflowStatusEvent):
-                print("\n=== Status ===")
-                print(event)
+        with checkpoint_run(run_id):
+            async for event in workflow.run_stream(message):
+                if isinstance(event, HopSkippedEvent):
+                    print(f"\n[{event.target_id}] skipped by the router (intent: {event.intent})")
+                elif isinstance(event, ExecutorReplayedEvent):
+                    print(f"\n[{event.executor_id}] replayed from checkpoint (no model call)")
+                elif isinstance(event, AgentRunUpdateEvent):
+                    eid = event.executor_id
+                    if eid != last_executor_id:
+                        if last_executor_id is not None:
+                            print()
+                        print(f"{eid}:", end=" ", flush=True)
+                        last_executor_id = eid
+                    print(event.data, end="", flush=True)
+                elif isinstance(event, WorkflowStatusEvent):
+                    print("\n=== Status ===")
+                    print(event)
 
     finally:
-        pass
+        if checkpoints is not None:
+            checkpoints.close()
 
 
 
 # Entry point: run the agent workflow demonstration
+# (pass a run id to resume a failed run: agent_workflow_checkpoints=<file> ... agent_workflow.py <run id>)
 if __name__ == "__main__":
-    asyncio.run(simple_agent_with_tools())
\ No newline at end of file
+    asyncio.run(simple_agent_with_tools(sys.argv[1] if len(sys.argv) > 1 else None))
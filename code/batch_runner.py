@@ -0,0 +1,184 @@
+
+# =========================================
+# High-throughput Batch Runner for agent.run
+# =========================================
+# Streams prompts from a JSONL file (or stdin), runs them through the tools agent
+# from simple_agent_with_tools.py with bounded asyncio concurrency, and writes one
+# JSONL result per prompt in completion order, tagged with the input id.
+#
+# Input lines:  {"id": "q1", "prompt": "What is the weather in Chennai?"}
+# Output lines: {"id": "q1", "response": "...", "latency_ms": 812.4}
+#               {"id": "q2", "error": "...", "latency_ms": 95.1}
+#
+# Memory stays flat: at most 2 x concurrency prompts are buffered and latencies
+# are folded into a fixed-size histogram instead of being kept per request.
+#
+# Usage:
+#   uv run python code/batch_runner.py --input prompts.jsonl --output results.jsonl --concurrency 32
+#   cat prompts.jsonl | uv run python code/batch_runner.py > results.jsonl
+#   agent_openai_max_retries=0 uv run python code/batch_runner.py --input prompts.jsonl --rpm 600 --tpm 90000
+#
+# --metrics-out writes agent run and tool latency histograms (metrics.py) when the batch ends.
+#
+# --rpm / --tpm put a shared client-side rate limiter (rate_limiter.py) in front of every
+# model call: token buckets, Retry-After pauses and AIMD concurrency instead of retry storms.
+# =========================================
+
+import sys
+import json
+import time
+import asyncio
+from dataclasses import asdict, dataclass, field
+from typing import TextIO
+
+from hedged_client import HedgedChatClient, get_hedged_chat_client
+from metrics import LatencyHistogram, get_metrics
+from rate_limiter import RateLimiter, RateLimitMiddleware
+from simple_agent_with_tools import AGENT_NAME, AGENT_INSTRUCTIONS, get_weather
+
+
+@dataclass
+class BatchSummary:
+    """
+    Totals reported at the end of a batch run.
+    """
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def to_dict(self) -> dict:
+        total = self.succeeded + self.failed
+        return {
+            "requests": total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "throughput_rps": round(total / self.elapsed_s, 2) if self.elapsed_s else 0.0,
+            "latency": self.latency.summary(),
+        }
+
+
+async def _read_records(source: TextIO, queue: asyncio.Queue, workers: int) -> None:
+    """
+    Read JSONL lines without blocking the event loop and feed them to the workers.
+    The bounded queue applies backpressure, so the input is never read ahead of the workers.
+    """
+    loop = asyncio.get_running_loop()
+    line_number = 0
+    while line := await loop.run_in_executor(None, source.readline):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            record = {"id": line_number, "error": f"Invalid JSON: {exc}"}
+        if isinstance(record, str):
+            record = {"prompt": record}
+        elif not isinstance(record, dict):
+            record = {"id": line_number, "error": "Expected a JSON object or string."}
+        record.setdefault("id", line_number)
+        await queue.put(record)
+    # One stop marker per worker
+    for _ in range(workers):
+        await queue.put(None)
+
+
+async def _worker(agent, queue: asyncio.Queue, sink: TextIO, summary: BatchSummary) -> None:
+    """
+    Run queued prompts one at a time and write each result as soon as it completes.
+    """
+    while (record := await queue.get()) is not None:
+        start = time.perf_counter()
+        result = {"id": record["id"]}
+        try:
+            if "error" in record:
+                raise ValueError(record["error"])
+            response = await agent.run(record["prompt"])
+            result["response"] = response.text
+            summary.succeeded += 1
+        except Exception as exc:
+            result["error"] = f"{type(exc).__name__}: {exc}"
+            summary.failed += 1
+        latency_ms = (time.perf_counter() - start) * 1000
+        summary.latency.record(latency_ms)
+        result["latency_ms"] = round(latency_ms, 2)
+        sink.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sink.flush()
+
+
+async def run_batch(agent, source: TextIO, sink: TextIO, concurrency: int = 16) -> BatchSummary:
+    """
+    Run every prompt in `source` through `agent` with at most `concurrency` requests in flight.
+    """
+    if concurrency < 1:
+        # Queue(maxsize=0) is unbounded and no worker would start: the input would pile up
+        raise ValueError("concurrency must be at least 1.")
+    summary = BatchSummary()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    start = time.perf_counter()
+    await asyncio.gather(
+        _read_records(source, queue, concurrency),
+        *(_worker(agent, queue, sink, summary) for _ in range(concurrency)),
+    )
+    summary.elapsed_s = time.perf_counter() - start
+    return summary
+
+
+async def batch_main(
+    input_path: str,
+    output_path: str,
+    concurrency: int,
+    rpm: float | None = None,
+    tpm: float | None = None,
+    metrics_path: str | None = None,
+) -> None:
+    """
+    Main function to run a JSONL batch through the tools agent and report throughput.
+    """
+    # Every model call of the batch is admitted through one rate limiter when a quota is given
+    limiter = RateLimiter(rpm=rpm, tpm=tpm, max_concurrency=concurrency) if rpm or tpm else None
+
+    # Create the agent once; every request shares it and its pooled connections.
+    # With agent_hedge_deployments set, slow model calls are hedged to a second deployment.
+    chat_client = get_hedged_chat_client()
+    # Agent run and get_weather latencies go to the process-wide metrics
+    metrics = get_metrics()
+    agent = chat_client.create_agent(
+        name=AGENT_NAME,
+        instructions=AGENT_INSTRUCTIONS,
+        middleware=[*metrics.middleware(), *([RateLimitMiddleware(limiter)] if limiter else [])],
+        tools=get_weather
+    )
+
+    source = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    sink = sys.stdout if output_path == "-" else open(output_path, "w", encoding="utf-8")
+    try:
+        summary = await run_batch(agent, source, sink, concurrency)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    # Report the summary (plus tool cache counters) on stderr so it never mixes with JSONL results on stdout
+    report = {**summary.to_dict(), "tool_cache": get_weather.cache_stats.to_dict(), "metrics": metrics.snapshot()}
+    if limiter is not None:
+        report["rate_limiter"] = limiter.snapshot()
+    if isinstance(chat_client, HedgedChatClient):
+        report["hedging"] = {**asdict(chat_client.stats), "hedge_rate": round(chat_client.stats.hedge_rate, 4)}
+    print(json.dumps(report, indent=2), file=sys.stderr)
+    if metrics_path:
+        # Prometheus text for *.prom, JSON otherwise
+        if metrics_path.endswith(".prom"):
+            metrics.write_prometheus(metrics_path)
+        else:
+            metrics.write_json(metrics_path)
+
+
+# Entry point: run a batch of prompts from the command line (same as `agent batch`)
+if __name__ == "__main__":
+    from agent_cli import main
+
+    main(["batch", *sys.argv[1:]])
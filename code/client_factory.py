@@ -0,0 +1,259 @@
+
+# =========================================
+# Shared Azure OpenAI Client Factory
+# =========================================
+# Every example used to build its own AzureOpenAIChatClient / AzureOpenAIResponsesClient
+# from the same four environment variables, so each agent paid for its own HTTP
+# connection pool and TLS handshake. This module validates the configuration once and
+# hands out one keep-alive connection pool per endpoint/deployment to every agent.
+#
+# Usage:
+#   from client_factory import get_chat_client
+#   agent = get_chat_client().create_agent(name=..., instructions=...)
+#
+# Pool limits can be tuned with the optional environment variables
+# agent_pool_max_connections, agent_pool_max_keepalive and agent_pool_keepalive_expiry.
+# agent_openai_max_retries sets the OpenAI SDK's own retries (set it to 0 when the
+# rate_limiter.py middleware should handle every 429).
+# =========================================
+
+import os
+import asyncio
+import importlib.util
+import weakref
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import httpx
+
+
+@dataclass(frozen=True)
+class AzureConfig:
+    """
+    Azure OpenAI connection settings shared by all agents.
+    """
+    endpoint: str
+    api_key: str
+    deployment_name: str
+    api_version: str
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """
+    Connection pool settings for the shared HTTP client.
+    HTTP/2 is only enabled when the optional `h2` package is installed.
+    """
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    max_retries: int = 2
+    http2: bool = field(default_factory=lambda: importlib.util.find_spec("h2") is not None)
+
+
+@dataclass
+class ConnectionStats:
+    """
+    Counters describing how often requests reused a pooled connection.
+    """
+    requests: int = 0
+    new_connections: int = 0
+    reused_connections: int = 0
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused_connections / self.requests if self.requests else 0.0
+
+
+class _CountingTransport(httpx.AsyncHTTPTransport):
+    """
+    HTTP transport that records whether each request opened a new connection
+    or was served from the keep-alive pool.
+    """
+
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+        # Network streams identify the underlying connection; weak refs let closed ones go away
+        self._seen_streams: weakref.WeakSet = weakref.WeakSet()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await super().handle_async_request(request)
+        self._stats.requests += 1
+        stream = response.extensions.get("network_stream")
+        if stream is not None and stream in self._seen_streams:
+            self._stats.reused_connections += 1
+        else:
+            self._stats.new_connections += 1
+            if stream is not None:
+                self._seen_streams.add(stream)
+        return response
+
+
+# One pooled HTTP client (and its stats) per (endpoint, deployment)
+_http_clients: dict[tuple[str, str], httpx.AsyncClient] = {}
+_connection_stats: dict[tuple[str, str], ConnectionStats] = {}
+_pool_settings: dict[tuple[str, str], PoolSettings] = {}
+# One framework chat client per (client kind, endpoint, deployment)
+_chat_clients: dict[tuple[str, str, str], object] = {}
+
+
+@lru_cache(maxsize=1)
+def load_config() -> AzureConfig:
+    """
+    Load and validate the Azure OpenAI configuration from environment variables.
+    The result is cached, so validation only happens once per process.
+    """
+    endpoint = os.getenv("azure_endpoint")
+    api_key = os.getenv("azure_apikey")
+    deployment_name = os.getenv("azure_deployment")
+    api_version = os.getenv("azure_version")
+
+    # Validate required environment variables
+    if not all([endpoint, api_key, deployment_name, api_version]):
+        raise EnvironmentError("Missing one or more required Azure OpenAI environment variables.")
+
+    return AzureConfig(
+        endpoint=endpoint,
+        api_key=api_key,
+        deployment_name=deployment_name,
+        api_version=api_version,
+    )
+
+
+@lru_cache(maxsize=1)
+def load_pool_settings() -> PoolSettings:
+    """
+    Load connection pool settings, falling back to the defaults for unset variables.
+    """
+    defaults = PoolSettings()
+    return PoolSettings(
+        max_connections=int(os.getenv("agent_pool_max_connections", defaults.max_connections)),
+        max_keepalive_connections=int(os.getenv("agent_pool_max_keepalive", defaults.max_keepalive_connections)),
+        keepalive_expiry=float(os.getenv("agent_pool_keepalive_expiry", defaults.keepalive_expiry)),
+        timeout=float(os.getenv("agent_pool_timeout", defaults.timeout)),
+        max_retries=int(os.getenv("agent_openai_max_retries", defaults.max_retries)),
+    )
+
+
+def _pool_key(config: AzureConfig) -> tuple[str, str]:
+    return (config.endpoint.rstrip("/"), config.deployment_name)
+
+
+def get_http_client(config: AzureConfig | None = None, pool: PoolSettings | None = None) -> httpx.AsyncClient:
+    """
+    Return the shared keep-alive HTTP client for the given endpoint/deployment,
+    creating it on first use. Asking for an existing client with different `pool`
+    settings raises ValueError.
+    """
+    config = config or load_config()
+    key = _pool_key(config)
+    client = _http_clients.get(key)
+    if client is not None and not client.is_closed:
+        if pool is not None and pool != _pool_settings[key]:
+            raise ValueError(
+                f"The HTTP client for {key[0]} ({key[1]}) already uses {_pool_settings[key]}; "
+                "close it with aclose_clients() before changing its pool settings."
+            )
+    else:
+        pool = pool or load_pool_settings()
+        stats = _connection_stats.setdefault(key, ConnectionStats())
+        transport = _CountingTransport(
+            stats,
+            http2=pool.http2,
+            limits=httpx.Limits(
+                max_connections=pool.max_connections,
+                max_keepalive_connections=pool.max_keepalive_connections,
+                keepalive_expiry=pool.keepalive_expiry,
+            ),
+        )
+        client = httpx.AsyncClient(transport=transport, timeout=pool.timeout)
+        _http_clients[key] = client
+        _pool_settings[key] = pool
+    return client
+
+
+def _get_openai_client(config: AzureConfig):
+    from openai import AsyncAzureOpenAI
+    from agent_framework import APP_INFO, prepend_agent_framework_to_user_agent
+
+    # Mirror the headers the framework would set if it built the client itself
+    headers = prepend_agent_framework_to_user_agent(dict(APP_INFO)) if APP_INFO else {}
+    return AsyncAzureOpenAI(
+        azure_endpoint=config.endpoint,
+        azure_deployment=config.deployment_name,
+        api_key=config.api_key,
+        api_version=config.api_version,
+        default_headers=headers,
+        max_retries=load_pool_settings().max_retries,
+        http_client=get_http_client(config),
+    )
+
+
+def _settings_endpoint(config: AzureConfig) -> str | None:
+    # The framework settings only accept https endpoints; the pre-built client already
+    # carries the endpoint, so plain-http stand-in servers can simply be left out here.
+    return config.endpoint if config.endpoint.startswith("https://") else None
+
+
+def get_chat_client(config: AzureConfig | None = None):
+    """
+    Return the shared AzureOpenAIChatClient for the given (or environment) configuration.
+    """
+    # Same client, but tool and response_format schemas are built once per process
+    from schema_registry import SchemaCachedAzureOpenAIChatClient
+
+    config = config or load_config()
+    key = ("chat", *_pool_key(config))
+    client = _chat_clients.get(key)
+    if client is None:
+        client = SchemaCachedAzureOpenAIChatClient(
+            endpoint=_settings_endpoint(config),
+            deployment_name=config.deployment_name,
+            api_version=config.api_version,
+            api_key=config.api_key,
+            async_client=_get_openai_client(config),
+        )
+        _chat_clients[key] = client
+    return client
+
+
+def get_responses_client(config: AzureConfig | None = None):
+    """
+    Return the shared AzureOpenAIResponsesClient for the given (or environment) configuration.
+    """
+    from agent_framework.azure import AzureOpenAIResponsesClient
+
+    config = config or load_config()
+    key = ("responses", *_pool_key(config))
+    client = _chat_clients.get(key)
+    if client is None:
+        client = AzureOpenAIResponsesClient(
+            endpoint=_settings_endpoint(config),
+            deployment_name=config.deployment_name,
+            api_version=config.api_version,
+            api_key=config.api_key,
+            async_client=_get_openai_client(config),
+        )
+        _chat_clients[key] = client
+    return client
+
+
+def connection_stats(config: AzureConfig | None = None) -> ConnectionStats:
+    """
+    Return the connection reuse counters for the given endpoint/deployment.
+    """
+    config = config or load_config()
+    return _connection_stats.setdefault(_pool_key(config), ConnectionStats())
+
+
+async def aclose_clients() -> None:
+    """
+    Close every pooled HTTP client and forget the cached chat clients.
+    """
+    clients = list(_http_clients.values())
+    _http_clients.clear()
+    _pool_settings.clear()
+    _chat_clients.clear()
+    await asyncio.gather(*(client.aclose() for client in clients))
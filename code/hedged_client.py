@@ -0,0 +1,324 @@
+
+# =========================================
+# Hedged Requests Across Azure Deployments
+# =========================================
+# A single slow completion from one deployment makes the p99 of agent.run several times
+# its median. HedgedChatClient sends each model call to a primary deployment and, if
+# that has not produced its first token within an adaptive threshold (by default the
+# p95 of recent times to first token), sends the same request to the next deployment.
+# Whichever stream starts first wins; the others are cancelled, which closes their HTTP
+# streams. A deployment that fails before its first token is failed over immediately.
+#
+# Non-streaming calls (agent.run) are hedged the same way on the whole-response latency,
+# with a separate threshold.
+#
+# Usage:
+#   client = hedged_chat_client([primary_config, secondary_config])
+#   agent = client.create_agent(name=..., instructions=..., tools=...)
+#   ...
+#   print(client.stats, client.ttft.threshold())
+#
+# get_hedged_chat_client() builds the client from the environment: the azure_* settings
+# are the primary and agent_hedge_deployments (a JSON list of {"endpoint", "deployment"}
+# objects, optionally with "api_key" and "api_version") adds the hedge targets. Without
+# agent_hedge_deployments it returns the plain shared chat client.
+#
+# Hedging spends extra tokens, so at most `max_hedge_rate` of the requests are hedged.
+# =========================================
+
+import os
+import json
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Callable, MutableSequence, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from agent_framework import (
+    BaseChatClient,
+    ChatMessage,
+    ChatOptions,
+    ChatResponse,
+    ChatResponseUpdate,
+    TextContent,
+    use_chat_middleware,
+    use_function_invocation,
+)
+from client_factory import AzureConfig, get_chat_client, load_config
+from schema_registry import SchemaCachingMixin
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class LatencyTracker:
+    """
+    Rolling window of observed latencies (seconds). threshold() is their `quantile`,
+    or `initial` until `min_samples` have been seen, never below `floor`.
+    """
+
+    def __init__(self, quantile: float = 0.95, window: int = 200, min_samples: int = 20, initial: float = 1.0, floor: float = 0.05):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.initial = initial
+        self.floor = floor
+        self._samples: deque[float] = deque(maxlen=window)
+        self._threshold: float | None = None
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+        self._threshold = None
+
+    def threshold(self) -> float:
+        if len(self._samples) < self.min_samples:
+            return max(self.initial, self.floor)
+        if self._threshold is None:
+            ordered = sorted(self._samples)
+            self._threshold = ordered[max(math.ceil(self.quantile * len(ordered)) - 1, 0)]
+        return max(self._threshold, self.floor)
+
+
+@dataclass
+class HedgeStats:
+    """
+    Counters describing how often requests were hedged and which attempt won.
+    """
+    requests: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    failovers: int = 0
+    cancelled: int = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        return self.hedged / self.requests if self.requests else 0.0
+
+
+def _has_output(update: ChatResponseUpdate) -> bool:
+    # The role-only opening chunk does not count as the first token
+    return any(not isinstance(content, TextContent) or content.text for content in update.contents)
+
+
+class _Attempt:
+    """
+    One deployment's try at a model call. `started` resolves when its first token (or,
+    for non-streaming calls, its response) arrives, or with the error it failed with.
+    """
+
+    def __init__(self, index: int, client: BaseChatClient, call: Callable[[BaseChatClient], Any], streaming: bool):
+        self.index = index
+        self.client = client
+        # When this attempt was sent; a hedge starts later than the race
+        self.sent_at = time.perf_counter()
+        self.started: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.response: ChatResponse | None = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._pump_stream(call) if streaming else self._await_response(call))
+
+    async def _pump_stream(self, call: Callable[[BaseChatClient], Any]) -> None:
+        try:
+            async for update in call(self.client):
+                self._queue.put_nowait(update)
+                if not self.started.done() and _has_output(update):
+                    self.started.set_result(time.perf_counter())
+        except Exception as exc:
+            if not self.started.done():
+                self.started.set_exception(exc)
+            else:
+                self._queue.put_nowait(exc)
+        finally:
+            if not self.started.done():
+                # Completed without output (an empty response): it still counts as started
+                self.started.set_result(time.perf_counter())
+            self._queue.put_nowait(_END)
+
+    async def _await_response(self, call: Callable[[BaseChatClient], Any]) -> None:
+        try:
+            self.response = await call(self.client)
+        except Exception as exc:
+            self.started.set_exception(exc)
+        else:
+            self.started.set_result(time.perf_counter())
+
+    async def updates(self) -> AsyncIterator[ChatResponseUpdate]:
+        while (item := await self._queue.get()) is not _END:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def cancel(self) -> bool:
+        if self.started.done() and not self.started.cancelled():
+            # Mark a late error as retrieved
+            self.started.exception()
+        if self.task.done():
+            return False
+        self.task.cancel()
+        return True
+
+
+@use_function_invocation
+@use_chat_middleware
+class HedgedChatClient(SchemaCachingMixin, BaseChatClient):
+    """
+    Chat client that sends each model call to the first of `clients` and hedges it to
+    the next ones when the first token is late.
+    """
+
+    OTEL_PROVIDER_NAME = "hedged"
+
+    def __init__(
+        self,
+        clients: Sequence[BaseChatClient],
+        *,
+        quantile: float = 0.95,
+        window: int = 200,
+        min_samples: int = 20,
+        initial_threshold: float = 1.0,
+        min_threshold: float = 0.05,
+        max_hedges: int = 1,
+        max_hedge_rate: float = 0.25,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        if not clients:
+            raise ValueError("HedgedChatClient needs at least one chat client.")
+        self.clients = list(clients)
+        self.max_hedges = max_hedges
+        self.max_hedge_rate = max_hedge_rate
+        # Time to first token for streaming calls, whole-response latency otherwise
+        self.ttft = LatencyTracker(quantile, window, min_samples, initial_threshold, min_threshold)
+        self.latency = LatencyTracker(quantile, window, min_samples, initial_threshold, min_threshold)
+        self.stats = HedgeStats()
+
+    def _can_hedge(self, hedges: int, next_index: int) -> bool:
+        return (
+            next_index < len(self.clients)
+            and hedges < self.max_hedges
+            and self.stats.hedged < self.max_hedge_rate * self.stats.requests
+        )
+
+    async def _race(self, call: Callable[[BaseChatClient], Any], streaming: bool) -> _Attempt:
+        """
+        Run `call` on the primary client, hedging and failing over to the others, and
+        return the attempt that started first. Every other attempt is cancelled.
+        """
+        tracker = self.ttft if streaming else self.latency
+        threshold = tracker.threshold()
+        self.stats.requests += 1
+        start = time.perf_counter()
+        attempts = [_Attempt(0, self.clients[0], call, streaming)]
+        hedge_at = start + threshold
+        next_index, hedges = 1, 0
+        winner: _Attempt | None = None
+        error: Exception | None = None
+        try:
+            while winner is None:
+                waiting = {attempt.started: attempt for attempt in attempts if not attempt.started.done()}
+                if not waiting:
+                    raise error
+                timeout = max(hedge_at - time.perf_counter(), 0) if self._can_hedge(hedges, next_index) else None
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # The first token is late: send the same request to the next deployment
+                    logger.debug("Hedging to deployment %d after %.3fs.", next_index, time.perf_counter() - start)
+                    attempts.append(_Attempt(next_index, self.clients[next_index], call, streaming))
+                    next_index += 1
+                    hedges += 1
+                    self.stats.hedged += 1
+                    hedge_at = time.perf_counter() + threshold
+                    continue
+                for future in done:
+                    attempt = waiting[future]
+                    if future.exception() is None:
+                        winner = winner or attempt
+                        continue
+                    error = future.exception()
+                    logger.warning("Deployment %d failed before its first token: %s", attempt.index, error)
+                    if winner is None and next_index < len(self.clients):
+                        attempts.append(_Attempt(next_index, self.clients[next_index], call, streaming))
+                        next_index += 1
+                        self.stats.failovers += 1
+        finally:
+            for attempt in attempts:
+                if attempt is not winner and attempt.cancel():
+                    self.stats.cancelled += 1
+        # The winner's own latency: measured from the race start, a winning hedge would
+        # record threshold + its own time and ratchet the threshold up
+        tracker.record(winner.started.result() - winner.sent_at)
+        if winner.index:
+            self.stats.hedge_wins += 1
+        return winner
+
+    async def _inner_get_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        def call(client: BaseChatClient) -> Any:
+            return client._inner_get_response(messages=list(messages), chat_options=chat_options, **kwargs)
+
+        winner = await self._race(call, streaming=False)
+        return winner.response
+
+    async def _inner_get_streaming_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> AsyncIterable[ChatResponseUpdate]:
+        def call(client: BaseChatClient) -> Any:
+            return client._inner_get_streaming_response(messages=list(messages), chat_options=chat_options, **kwargs)
+
+        winner = await self._race(call, streaming=True)
+        try:
+            async for update in winner.updates():
+                yield update
+        finally:
+            # The caller stopped reading early
+            winner.cancel()
+
+    def service_url(self) -> str:
+        return self.clients[0].service_url()
+
+
+def hedged_chat_client(configs: Sequence[AzureConfig], **options: Any) -> HedgedChatClient:
+    """
+    HedgedChatClient over the shared, pooled chat clients of `configs` (primary first).
+    """
+    return HedgedChatClient([get_chat_client(config) for config in configs], **options)
+
+
+def load_hedge_configs() -> list[AzureConfig]:
+    """
+    The primary configuration followed by the deployments in agent_hedge_deployments.
+    """
+    primary = load_config()
+    configs = [primary]
+    for entry in json.loads(os.getenv("agent_hedge_deployments") or "[]"):
+        configs.append(AzureConfig(
+            endpoint=entry["endpoint"],
+            api_key=entry.get("api_key", primary.api_key),
+            deployment_name=entry["deployment"],
+            api_version=entry.get("api_version", primary.api_version),
+        ))
+    return configs
+
+
+@lru_cache(maxsize=1)
+def get_hedged_chat_client():
+    """
+    Shared HedgedChatClient for the environment's deployments (one tracker per process),
+    or the plain shared chat client when no hedge deployments are configured.
+    """
+    configs = load_hedge_configs()
+    if len(configs) == 1:
+        return get_chat_client(configs[0])
+    return hedged_chat_client(configs)
@@ -0,0 +1,209 @@
+
+# =========================================
+# Resumable Human-in-the-Loop Approvals
+# =========================================
+# simple_agent_HIL.py used to answer an approval request by calling agent.run again
+# with the whole conversation rebuilt by hand: the prompt was sent a second time and
+# the model had to plan the tool call all over again.
+#
+# ResumableApprovals keeps the agent thread instead. When a run stops on
+# FunctionApprovalRequestContent, the pending requests are stored together with the
+# serialized thread (ApprovalStore, SQLite; in memory by default). When the decision
+# arrives -- possibly much later, or in another process -- the thread is restored and
+# only the approval responses are added to it: the framework runs the approved tool
+# calls and the model continues from where it stopped, in one model turn.
+#
+# An optional ApprovalPolicyCache auto-approves a (function, normalized arguments) pair
+# that a human already approved within a time window.
+#
+# Usage:
+#   approvals = ResumableApprovals(agent, policy=ApprovalPolicyCache(window=600))
+#   result = await approvals.run("What is the weather in Chennai?")
+#   if result.pending:
+#       result = await approvals.resume(result.turn_id, approved=True)
+#   print(result.response)
+# =========================================
+
+import json
+import time
+import uuid
+import sqlite3
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from agent_framework import (
+    AgentProtocol,
+    AgentRunResponse,
+    AgentThread,
+    ChatMessage,
+    FunctionApprovalRequestContent,
+    FunctionCallContent,
+    Role,
+)
+from tool_cache import _hashable, normalize_argument
+
+
+class ApprovalPolicyCache:
+    """
+    Remembers approved (function, normalized arguments) pairs for `window` seconds so
+    identical calls are approved without asking again. Rejections are never cached.
+    """
+
+    def __init__(self, window: float = 600.0, normalizer: Callable[[Any], Any] = normalize_argument):
+        self.window = window
+        self.normalizer = normalizer
+        self.auto_approved = 0
+        self._approved: dict[Any, float] = {}
+
+    def key(self, call: FunctionCallContent) -> Any:
+        arguments = call.parse_arguments() or {}
+        return call.name, tuple(sorted((name, _hashable(self.normalizer(value))) for name, value in arguments.items()))
+
+    def record(self, call: FunctionCallContent) -> None:
+        self._approved[self.key(call)] = time.monotonic() + self.window
+
+    def is_approved(self, call: FunctionCallContent) -> bool:
+        key = self.key(call)
+        expires_at = self._approved.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._approved[key]
+            return False
+        return True
+
+
+class ApprovalStore:
+    """
+    Pending approval turns (requests, decisions made so far and the serialized thread),
+    kept in SQLite so they can be resumed later or from another process.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS pending_approvals ("
+            " turn_id TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def save(self, turn_id: str, payload: dict) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO pending_approvals (turn_id, payload, created_at) VALUES (?, ?, ?)",
+            (turn_id, json.dumps(payload), time.time()),
+        )
+        self._db.commit()
+
+    def load(self, turn_id: str) -> dict | None:
+        row = self._db.execute("SELECT payload FROM pending_approvals WHERE turn_id = ?", (turn_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, turn_id: str) -> None:
+        self._db.execute("DELETE FROM pending_approvals WHERE turn_id = ?", (turn_id,))
+        self._db.commit()
+
+    def pending_turns(self) -> list[str]:
+        return [row[0] for row in self._db.execute("SELECT turn_id FROM pending_approvals ORDER BY created_at")]
+
+    def close(self) -> None:
+        self._db.close()
+
+
+@dataclass
+class ApprovalResult:
+    """
+    Outcome of a run or resume: the agent's response, and the requests still waiting
+    for a human decision (resume them with `turn_id`).
+    """
+    response: AgentRunResponse
+    thread: AgentThread
+    turn_id: str | None = None
+    pending: list[FunctionApprovalRequestContent] = field(default_factory=list)
+    auto_approved: int = 0
+
+
+class ResumableApprovals:
+    """
+    Runs an agent whose tools need approval and resumes it from stored thread state
+    once the approvals arrive.
+    """
+
+    def __init__(self, agent: AgentProtocol, store: ApprovalStore | None = None, policy: ApprovalPolicyCache | None = None):
+        self.agent = agent
+        self.store = store or ApprovalStore()
+        self.policy = policy
+
+    async def run(self, messages: Any, *, thread: AgentThread | None = None, **kwargs: Any) -> ApprovalResult:
+        """
+        Run the agent on a thread; stop and store the turn if tool calls need approval.
+        """
+        thread = thread or self.agent.get_new_thread()
+        response = await self.agent.run(messages, thread=thread, **kwargs)
+        return await self._settle(response, thread, auto_approved=0, **kwargs)
+
+    async def resume(self, turn_id: str, approved: bool | dict[str, bool], **kwargs: Any) -> ApprovalResult:
+        """
+        Answer the pending requests of a stored turn and continue the run from its thread.
+        `approved` is one decision for every request, or a dict keyed by request id.
+        """
+        payload = self.store.load(turn_id)
+        if payload is None:
+            raise KeyError(f"No pending approvals for turn {turn_id!r}.")
+        requests = [FunctionApprovalRequestContent.from_dict(item) for item in payload["requests"]]
+        # Requests auto-approved when the turn was stored, plus the ones answered now
+        decisions: dict[str, bool] = dict(payload["decisions"])
+        answered = {
+            request.id: approved if isinstance(approved, bool) else approved[request.id]
+            for request in requests
+            if request.id not in decisions
+        }
+        decisions.update(answered)
+        if self.policy:
+            # Only human decisions start a policy window; auto-approvals do not extend it
+            for request in requests:
+                if answered.get(request.id):
+                    self.policy.record(request.function_call)
+        # Every request of the turn must be answered together
+        thread = await self.agent.deserialize_thread(payload["thread"])
+        result = await self._continue(requests, decisions, thread, auto_approved=0, **kwargs)
+        # Only now: if the resumed run fails, the turn can be resumed again
+        self.store.delete(turn_id)
+        return result
+
+    async def _continue(
+        self,
+        requests: list[FunctionApprovalRequestContent],
+        decisions: dict[str, bool],
+        thread: AgentThread,
+        auto_approved: int,
+        **kwargs: Any,
+    ) -> ApprovalResult:
+        # Only the approval responses are new; the thread supplies the conversation
+        answer = ChatMessage(role=Role.USER, contents=[request.create_response(decisions[request.id]) for request in requests])
+        response = await self.agent.run(answer, thread=thread, **kwargs)
+        return await self._settle(response, thread, auto_approved=auto_approved, **kwargs)
+
+    async def _settle(self, response: AgentRunResponse, thread: AgentThread, auto_approved: int, **kwargs: Any) -> ApprovalResult:
+        requests = [
+            request for request in response.user_input_requests if isinstance(request, FunctionApprovalRequestContent)
+        ]
+        if not requests:
+            return ApprovalResult(response, thread, auto_approved=auto_approved)
+
+        decisions = {}
+        if self.policy:
+            decisions = {request.id: True for request in requests if self.policy.is_approved(request.function_call)}
+        if len(decisions) == len(requests):
+            # Everything was approved recently: resume without asking
+            self.policy.auto_approved += len(requests)
+            return await self._continue(requests, decisions, thread, auto_approved=auto_approved + len(requests), **kwargs)
+
+        turn_id = uuid.uuid4().hex
+        self.store.save(turn_id, {
+            "requests": [request.to_dict() for request in requests],
+            "decisions": decisions,
+            "thread": await thread.serialize(),
+        })
+        pending = [request for request in requests if request.id not in decisions]
+        return ApprovalResult(response, thread, turn_id=turn_id, pending=pending, auto_approved=auto_approved + len(decisions))
@@ -0,0 +1,184 @@
+
+# =========================================
+# Local Intent Router for Conditional Workflow Hops
+# =========================================
+# agent_workflow.py ran Indian-Weather-Agent and then Indian-Tourist-Agent on every
+# input, so "What is the weather in Chennai?" also paid for a tourist recommendation
+# nobody asked for.
+#
+# IntentRouter classifies the input locally, with no model call, using a small weighted
+# keyword index over intents. Each intent names the executors it needs. A RouterExecutor
+# at the start of the workflow decides once per run, emits a HopSkippedEvent for every
+# routed executor the intent does not need, and the workflow's conditional / switch-case
+# edges read that decision:
+#
+#   router -> Indian-Weather-Agent -> (needs tourist) -> Indian-Tourist-Agent
+#                                  -> (default)       -> respond  (weather answer is the output)
+#
+# Ambiguous inputs (a tie, or no keyword at all) go to the intent that runs more
+# executors, so routing never drops a hop that might be needed. Counting HopSkippedEvents
+# gives the model calls saved per intent.
+#
+# Usage:
+#   router = RouterExecutor(IntentRouter([
+#       Intent("weather", (weather.id,), ("weather", "forecast")),
+#       Intent("recommendation", (weather.id, tourist.id), ("recommend", "where should")),
+#   ], default="recommendation"))
+#   builder = WorkflowBuilder().set_start_executor(router).add_edge(router, weather)
+#   builder.add_switch_case_edge_group(weather, [
+#       Case(condition=lambda _: router.needs(tourist.id), target=tourist),
+#       Default(target=RouteOutputExecutor()),
+#   ])
+# =========================================
+
+import re
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Never
+
+from agent_framework import (
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    AgentRunResponse,
+    ChatMessage,
+    Executor,
+    ExecutorEvent,
+    Role,
+    WorkflowContext,
+    handler,
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower())
+
+
+@dataclass(frozen=True)
+class Intent:
+    """
+    A kind of input, the executors it needs and the keywords (words or short phrases)
+    that signal it.
+    """
+    name: str
+    executors: tuple[str, ...]
+    keywords: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """
+    The intent chosen for one input, the executors it needs and the keywords that matched.
+    """
+    intent: str
+    executors: frozenset[str]
+    matched: tuple[str, ...] = ()
+    score: float = 0.0
+
+
+class IntentRouter:
+    """
+    Keyword-index classifier mapping an input to an Intent. A keyword scores its length in
+    words divided by the number of intents sharing it; the highest total wins.
+    """
+
+    def __init__(self, intents: Sequence[Intent], default: str):
+        self.intents = {intent.name: intent for intent in intents}
+        if default not in self.intents:
+            raise ValueError(f"Default intent {default!r} is not one of {sorted(self.intents)}.")
+        self.default = default
+        # Every executor some intent routes to; the others are not the router's concern
+        self.routed = frozenset(executor for intent in intents for executor in intent.executors)
+
+        owners: dict[tuple[str, ...], set[str]] = {}
+        for intent in intents:
+            for keyword in intent.keywords:
+                owners.setdefault(tuple(_tokens(keyword)), set()).add(intent.name)
+        # first token -> [(phrase tokens, intent, weight)]
+        self._index: dict[str, list[tuple[tuple[str, ...], str, float]]] = {}
+        for phrase, names in owners.items():
+            if phrase:
+                for name in names:
+                    self._index.setdefault(phrase[0], []).append((phrase, name, len(phrase) / len(names)))
+
+    def classify(self, text: str) -> RouteDecision:
+        tokens = _tokens(text)
+        scores: dict[str, float] = {}
+        matched: dict[str, list[str]] = {}
+        for position, token in enumerate(tokens):
+            for phrase, name, weight in self._index.get(token, ()):
+                if tuple(tokens[position:position + len(phrase)]) == phrase:
+                    scores[name] = scores.get(name, 0.0) + weight
+                    matched.setdefault(name, []).append(" ".join(phrase))
+
+        if scores:
+            # On a tie, prefer the intent that runs more executors
+            name = max(scores, key=lambda item: (scores[item], len(self.intents[item].executors)))
+        else:
+            name = self.default
+        return RouteDecision(
+            intent=name,
+            executors=frozenset(self.intents[name].executors),
+            matched=tuple(matched.get(name, ())),
+            score=scores.get(name, 0.0),
+        )
+
+
+class HopSkippedEvent(ExecutorEvent):
+    """
+    Workflow event emitted by the router for every executor the run's intent does not
+    need, i.e. one model call saved.
+    """
+
+    def __init__(self, executor_id: str, target_id: str, intent: str):
+        super().__init__(executor_id, {"target_id": target_id, "intent": intent})
+        self.target_id = target_id
+        self.intent = intent
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(target_id={self.target_id}, intent={self.intent})"
+
+
+class RouterExecutor(Executor):
+    """
+    Start executor that classifies the user prompt, records skipped hops and forwards the
+    prompt as an agent request. Keeps the current run's decision, so build one per
+    workflow (workflows are built per run anyway).
+    """
+
+    def __init__(self, router: IntentRouter, id: str = "router"):
+        super().__init__(id)
+        self.router = router
+        self.decision: RouteDecision | None = None
+
+    def needs(self, executor_id: str) -> bool:
+        """
+        Whether the current run's intent needs `executor_id`. Use it in edge conditions.
+        """
+        if self.decision is None or executor_id not in self.router.routed:
+            return True
+        return executor_id in self.decision.executors
+
+    @handler
+    async def route(self, prompt: str, ctx: WorkflowContext[AgentExecutorRequest]) -> None:
+        self.decision = self.router.classify(prompt)
+        for target_id in sorted(self.router.routed - self.decision.executors):
+            await ctx.add_event(HopSkippedEvent(self.id, target_id, self.decision.intent))
+        await ctx.send_message(
+            AgentExecutorRequest(messages=[ChatMessage(role=Role.USER, text=prompt)], should_respond=True)
+        )
+
+
+class RouteOutputExecutor(Executor):
+    """
+    End of a route that stops before the last agent: yields the agent response it
+    receives as the workflow output.
+    """
+
+    def __init__(self, id: str = "respond"):
+        super().__init__(id)
+
+    @handler
+    async def respond(self, response: AgentExecutorResponse, ctx: WorkflowContext[Never, AgentRunResponse]) -> None:
+        await ctx.yield_output(response.agent_run_response)
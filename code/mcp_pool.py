@@ -0,0 +1,335 @@
+
+# =========================================
+# Warm Pool of MCP stdio Tool Sessions
+# =========================================
+# MCPStdioTool starts a fresh server process (e.g. `docker run -i duckduckgo-mcp-server`)
+# and performs the MCP handshake plus tools/list every time it is entered. For a single
+# search that startup dwarfs the search itself.
+#
+# MCPStdioPool keeps `size` initialized sessions warm and leases one per agent run:
+#   - tools/list is fetched once per pool and shared by every session,
+#   - a session whose tool call failed is pinged on release and respawned if dead,
+#   - idle sessions are health-checked in the background and crashed ones replaced,
+# so a query only pays for its own tools/call request/response.
+#
+# Usage:
+#   async with MCPStdioPool(name="duckduckgo", command="docker",
+#                           args=["run", "-i", "duckduckgo-mcp-server:latest"], size=4) as pool:
+#       async with pool.lease() as search_tool:
+#           await agent.run("What is the capital of France?", tools=search_tool)
+#
+# Each session is opened and closed by its own owner task, because the MCP stdio client
+# runs an anyio task group that must be exited from the task that entered it.
+# =========================================
+
+import time
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from dataclasses import dataclass, asdict
+from functools import partial
+from typing import Any
+
+from mcp import ClientSession, types
+from pydantic import BaseModel
+from agent_framework import AIFunction, MCPStdioTool
+# Same helpers MCPTool.load_tools uses to turn an MCP tool into an AIFunction
+from agent_framework._mcp import _get_input_model_from_mcp_tool, _normalize_mcp_name
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    """
+    Counters for an MCP session pool.
+    """
+    spawned: int = 0
+    respawned: int = 0
+    spawn_failures: int = 0
+    leases: int = 0
+    lease_wait_ms: float = 0.0
+    schema_loads: int = 0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "lease_wait_ms": round(self.lease_wait_ms, 2)}
+
+
+class ToolSchemaCache:
+    """
+    One tools/list result (with the generated input models) shared by every session
+    of a pool, fetched once no matter how many sessions start concurrently.
+    """
+
+    def __init__(self, stats: PoolStats | None = None):
+        self.stats = stats or PoolStats()
+        self._tools: list[tuple[types.Tool, type[BaseModel]]] | None = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, session: ClientSession) -> list[tuple[types.Tool, type[BaseModel]]]:
+        if self._tools is None:
+            async with self._lock:
+                if self._tools is None:
+                    result = await session.list_tools()
+                    self._tools = [(tool, _get_input_model_from_mcp_tool(tool)) for tool in result.tools]
+                    self.stats.schema_loads += 1
+        return self._tools
+
+    def invalidate(self) -> None:
+        self._tools = None
+
+
+class PooledMCPStdioTool(MCPStdioTool):
+    """
+    MCPStdioTool that takes its tool list from a shared ToolSchemaCache and remembers
+    whether a tool call failed (so the pool can check the session before reusing it).
+    """
+
+    def __init__(self, *args: Any, schema_cache: ToolSchemaCache, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.schema_cache = schema_cache
+        self.failed = False
+
+    async def load_tools(self) -> None:
+        existing_names = {func.name for func in self._functions}
+        for tool, input_model in await self.schema_cache.get(self.session):
+            # ClientSession validates tool results against output schemas it learned from
+            # tools/list; seed them so the first call does not trigger another tools/list
+            output_schemas = getattr(self.session, "_tool_output_schemas", None)
+            if output_schemas is not None:
+                output_schemas.setdefault(tool.name, tool.outputSchema)
+            local_name = _normalize_mcp_name(tool.name)
+            if local_name in existing_names:
+                continue
+            self._functions.append(AIFunction(
+                func=partial(self.call_tool, tool.name),
+                name=local_name,
+                description=tool.description or "",
+                approval_mode=self._determine_approval_mode(local_name),
+                input_model=input_model,
+            ))
+            existing_names.add(local_name)
+
+    async def call_tool(self, tool_name: str, **kwargs: Any) -> list:
+        try:
+            return await super().call_tool(tool_name, **kwargs)
+        except Exception:
+            self.failed = True
+            raise
+
+    async def message_handler(self, message: Any) -> None:
+        # The server changed its tools: refetch the shared list instead of reusing it
+        if isinstance(message, types.ServerNotification) and message.root.method == "notifications/tools/list_changed":
+            self.schema_cache.invalidate()
+        await super().message_handler(message)
+
+
+class MCPStdioPool:
+    """
+    Keeps `size` warm MCP stdio sessions and leases them out one agent run at a time.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        command: str,
+        *,
+        args: list[str] | None = None,
+        env: dict[str, str] | None = None,
+        size: int = 2,
+        request_timeout: int = 30,
+        ping_timeout: float = 5.0,
+        health_interval: float | None = 30.0,
+        respawn_backoff: float = 1.0,
+        **tool_kwargs: Any,
+    ):
+        if size < 1:
+            raise ValueError("size must be at least 1.")
+        self.name = name
+        self.command = command
+        self.args = args or []
+        self.env = env
+        self.size = size
+        self.request_timeout = request_timeout
+        self.ping_timeout = ping_timeout
+        self.health_interval = health_interval
+        self.respawn_backoff = respawn_backoff
+        # Agents only use the tools, so skip the prompts/list round trip unless asked for
+        tool_kwargs.setdefault("load_prompts", False)
+        self.tool_kwargs = tool_kwargs
+        self.stats = PoolStats()
+        self.schema_cache = ToolSchemaCache(self.stats)
+        self._idle: asyncio.Queue[PooledMCPStdioTool] = asyncio.Queue()
+        self._owners: dict[PooledMCPStdioTool, tuple[asyncio.Task, asyncio.Event]] = {}
+        self._background: set[asyncio.Task] = set()
+        self._reaper: asyncio.Task | None = None
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self._closed = False
+
+    async def __aenter__(self) -> "MCPStdioPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """
+        Spawn all sessions concurrently and start the background health checks. If any
+        session fails to start, the others are closed and the error is raised.
+        """
+        async with self._start_lock:
+            if self._started:
+                return
+            results = await asyncio.gather(*(self._spawn() for _ in range(self.size)), return_exceptions=True)
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                # Close the sessions that did start rather than leak them; a later start() retries
+                await asyncio.gather(*(self._retire(tool) for tool in results if not isinstance(tool, BaseException)))
+                raise errors[0]
+            for tool in results:
+                self._idle.put_nowait(tool)
+            self._started = True
+            if self.health_interval:
+                self._reaper = asyncio.create_task(self._reap_forever(), name=f"{self.name}-mcp-reaper")
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[PooledMCPStdioTool]:
+        """
+        Borrow a warm session for one agent run; it goes back to the pool afterwards
+        (or is replaced, if it died while leased).
+        """
+        if self._closed:
+            raise RuntimeError("The MCP pool is closed.")
+        await self.start()
+        start = time.perf_counter()
+        tool = await self._idle.get()
+        self.stats.leases += 1
+        self.stats.lease_wait_ms += (time.perf_counter() - start) * 1000
+        try:
+            yield tool
+        finally:
+            await self._release(tool)
+
+    async def _release(self, tool: PooledMCPStdioTool) -> None:
+        if self._closed:
+            await self._retire(tool)
+            return
+        if tool.failed and not await self._is_alive(tool):
+            self._replace_in_background(tool)
+            return
+        tool.failed = False
+        self._idle.put_nowait(tool)
+
+    def _new_tool(self) -> PooledMCPStdioTool:
+        return PooledMCPStdioTool(
+            name=self.name,
+            command=self.command,
+            args=self.args,
+            env=self.env,
+            request_timeout=self.request_timeout,
+            schema_cache=self.schema_cache,
+            **self.tool_kwargs,
+        )
+
+    async def _spawn(self) -> PooledMCPStdioTool:
+        tool = self._new_tool()
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(self._hold(tool, ready, stop), name=f"{self.name}-mcp-session")
+        try:
+            await ready
+        except BaseException:
+            self.stats.spawn_failures += 1
+            raise
+        self._owners[tool] = (task, stop)
+        self.stats.spawned += 1
+        return tool
+
+    async def _hold(self, tool: PooledMCPStdioTool, ready: asyncio.Future, stop: asyncio.Event) -> None:
+        # Owner task: enters the session, keeps it open until asked to stop, then closes it
+        try:
+            async with tool:
+                ready.set_result(None)
+                await stop.wait()
+        except BaseException as exc:
+            if not ready.done():
+                ready.set_exception(exc)
+            elif not isinstance(exc, asyncio.CancelledError):
+                # Closing a session whose process already died can fail; nothing to recover
+                logger.debug("Error closing MCP session %s: %s", tool.name, exc)
+
+    async def _retire(self, tool: PooledMCPStdioTool) -> None:
+        owner = self._owners.pop(tool, None)
+        if owner is None:
+            return
+        task, stop = owner
+        stop.set()
+        with suppress(Exception):
+            await task
+
+    async def _is_alive(self, tool: PooledMCPStdioTool) -> bool:
+        if not tool.is_connected or tool.session is None:
+            return False
+        try:
+            await asyncio.wait_for(tool.session.send_ping(), self.ping_timeout)
+            return True
+        except Exception:
+            return False
+
+    def _replace_in_background(self, tool: PooledMCPStdioTool) -> None:
+        task = asyncio.create_task(self._replace(tool))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _replace(self, dead: PooledMCPStdioTool) -> None:
+        logger.warning("MCP session %s is not responding; respawning it.", dead.name)
+        await self._retire(dead)
+        delay = self.respawn_backoff
+        while not self._closed:
+            try:
+                tool = await self._spawn()
+            except Exception as exc:
+                logger.warning("Respawning MCP session %s failed (%s); retrying in %.1fs.", dead.name, exc, delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            self.stats.respawned += 1
+            self._idle.put_nowait(tool)
+            return
+
+    async def _reap_forever(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_interval)
+            await self.reap()
+
+    async def reap(self) -> int:
+        """
+        Ping every idle session and replace the ones that no longer answer.
+        Returns the number of sessions being replaced.
+        """
+        idle = []
+        while not self._idle.empty():
+            idle.append(self._idle.get_nowait())
+        alive = await asyncio.gather(*(self._is_alive(tool) for tool in idle))
+        for tool, ok in zip(idle, alive):
+            if ok:
+                self._idle.put_nowait(tool)
+            else:
+                self._replace_in_background(tool)
+        return alive.count(False)
+
+    async def close(self) -> None:
+        """
+        Stop the health checks and shut down every session, leased or idle.
+        """
+        self._closed = True
+        for task in [self._reaper, *self._background]:
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*[t for t in [self._reaper, *self._background] if t is not None], return_exceptions=True)
+        await asyncio.gather(*(self._retire(tool) for tool in list(self._owners)))
+        while not self._idle.empty():
+            self._idle.get_nowait()
@@ -0,0 +1,54 @@
+
+# =========================================
+# Local Stand-in Web Search MCP Server (stdio)
+# =========================================
+# A small Python MCP server with the same `search` tool shape as the DuckDuckGo MCP
+# server, returning canned results. It lets agent_mcp_workflow.py and mcp_pool.py run
+# without Docker or network access:
+#
+#   agent_mcp_server=local uv run python code/agent_mcp_workflow.py
+#
+# Run directly it speaks MCP over stdin/stdout (it is normally started by the client).
+# =========================================
+
+import os
+import time
+from typing import Annotated
+from pydantic import Field
+from mcp.server.fastmcp import FastMCP
+
+# Simulated process startup cost (seconds), to make warm-pool savings visible
+STARTUP_DELAY = float(os.getenv("agent_mcp_startup_delay", "0"))
+
+# Canned answers for a few well-known queries; anything else gets a generic result
+KNOWN_RESULTS = {
+    "capital of france": "Paris is the capital and most populous city of France.",
+    "capital of india": "New Delhi is the capital of India.",
+    "marina beach": "Marina Beach is a natural urban beach in Chennai, along the Bay of Bengal.",
+}
+
+server = FastMCP("local-search")
+
+
+@server.tool()
+def search(
+    query: Annotated[str, Field(description="The search query string")],
+    max_results: Annotated[int, Field(description="Maximum number of results to return")] = 5,
+) -> str:
+    """
+    Search the web (stand-in) and return formatted results.
+    """
+    normalized = query.casefold()
+    results = [text for key, text in KNOWN_RESULTS.items() if key in normalized]
+    if not results:
+        results = [f"No offline result for '{query}'. This is the local stand-in search server."]
+    lines = [f"Found {len(results[:max_results])} search results:"]
+    for index, text in enumerate(results[:max_results], start=1):
+        lines.append(f"{index}. {text}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if STARTUP_DELAY:
+        time.sleep(STARTUP_DELAY)
+    server.run()
@@ -0,0 +1,297 @@
+
+# =========================================
+# Latency Metrics: TTFT, Inter-token Gaps, Tool Time, Per-executor Wall Time
+# =========================================
+# When a run is slow, the total alone does not say whether the time went to the first
+# model token, to get_weather, to the MCP search or to the second workflow hop. The hooks
+# here record each of those into fixed-memory log-bucket histograms:
+#
+#   ttft_ms          run start -> first streamed model output     (agent)
+#   inter_token_ms   gap between consecutive streamed text chunks (agent)
+#   run_ms           whole agent.run / run_stream                 (agent)
+#   tool_ms          one tool invocation                          (tool)
+#   executor_ms      one workflow executor handler invocation     (executor)
+#
+# Usage:
+#   metrics = get_metrics()
+#   agent = client.create_agent(..., middleware=metrics.middleware())
+#   workflow = metrics.instrument_workflow(builder.build())
+#   metrics.subscribe(lambda name, labels, value_ms: ...)   # every observation, in-process
+#   metrics.write_prometheus("metrics.prom")                # or write_json("metrics.json")
+#
+# Recording is one dict lookup and a few additions per observation; nothing is sent
+# anywhere unless a subscriber or an export asks for it.
+# =========================================
+
+import os
+import json
+import math
+import time
+import tempfile
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+from agent_framework import (
+    AgentMiddleware,
+    AgentRunContext,
+    AgentRunResponseUpdate,
+    FunctionInvocationContext,
+    FunctionMiddleware,
+    TextContent,
+    Workflow,
+)
+
+Labels = tuple[tuple[str, str], ...]
+Subscriber = Callable[[str, dict[str, str], float], None]
+
+
+@dataclass
+class LatencyHistogram:
+    """
+    Fixed-memory latency histogram with logarithmic buckets (~5% resolution).
+    """
+    growth: float = 1.05
+    counts: dict[int, int] = field(default_factory=dict)
+    count: int = 0
+    total: float = 0.0
+    max_value: float = 0.0
+
+    def record(self, value_ms: float) -> None:
+        bucket = math.ceil(math.log(max(value_ms, 1e-3), self.growth))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        self.max_value = max(self.max_value, value_ms)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.growth ** bucket, self.max_value)
+        return self.max_value
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "max_ms": round(self.max_value, 2),
+        }
+
+
+def _write_atomically(path: str, text: str) -> None:
+    # Scrapers and readers never see a half-written file
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temp, path)
+
+
+class Metrics:
+    """
+    Latency histograms keyed by metric name and labels, with in-process subscribers and
+    Prometheus text / JSON export.
+    """
+
+    def __init__(self, growth: float = 1.05):
+        self.growth = growth
+        self._histograms: dict[tuple[str, Labels], LatencyHistogram] = {}
+        self._subscribers: list[Subscriber] = []
+
+    def observe(self, name: str, value_ms: float, labels: Labels = ()) -> None:
+        key = (name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = LatencyHistogram(self.growth)
+        histogram.record(value_ms)
+        if self._subscribers:
+            label_dict = dict(labels)
+            for subscriber in self._subscribers:
+                subscriber(name, label_dict, value_ms)
+
+    def subscribe(self, subscriber: Subscriber) -> Callable[[], None]:
+        """
+        Call `subscriber(name, labels, value_ms)` for every observation from now on.
+        Returns a function that unsubscribes it.
+        """
+        self._subscribers.append(subscriber)
+        return lambda: self._subscribers.remove(subscriber)
+
+    def histogram(self, name: str, **labels: str) -> LatencyHistogram | None:
+        return self._histograms.get((name, tuple(sorted(labels.items()))))
+
+    def reset(self) -> None:
+        self._histograms.clear()
+
+    # ---- hooks --------------------------------------------------------------
+
+    def middleware(self) -> list[Any]:
+        """
+        Agent and function middleware recording agent and tool latencies into this object.
+        """
+        return [RunMetricsMiddleware(self), ToolMetricsMiddleware(self)]
+
+    def instrument_workflow(self, workflow: Workflow) -> Workflow:
+        """
+        Record executor_ms, the wall time of every handler invocation, for each executor
+        of `workflow`. Returns the workflow.
+        """
+        for executor in workflow.executors.values():
+            # Wrap each executor once per Metrics, however often the workflow is instrumented
+            instrumented_by = getattr(executor, "_instrumented_by", ())
+            if any(metrics is self for metrics in instrumented_by):
+                continue
+            executor.execute = self._timed_execute(executor.id, executor.execute)
+            executor._instrumented_by = (*instrumented_by, self)
+        return workflow
+
+    def _timed_execute(self, executor_id: str, execute: Callable[..., Awaitable[None]]) -> Callable[..., Awaitable[None]]:
+        labels = (("executor", executor_id),)
+
+        async def timed_execute(*args: Any, **kwargs: Any) -> None:
+            start = time.perf_counter()
+            try:
+                await execute(*args, **kwargs)
+            finally:
+                self.observe("executor_ms", (time.perf_counter() - start) * 1000, labels)
+
+        return timed_execute
+
+    # ---- export -------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        report: dict[str, list[dict]] = {}
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            report.setdefault(name, []).append({"labels": dict(labels), **histogram.summary()})
+        return report
+
+    def to_prometheus(self, prefix: str = "agent_") -> str:
+        """
+        Prometheus text exposition: one summary per metric (p50/p95/p99, sum, count).
+        """
+        lines: list[str] = []
+        typed: set[str] = set()
+        for (name, labels), histogram in sorted(self._histograms.items()):
+            metric = prefix + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} summary")
+                typed.add(metric)
+            label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels)
+            for quantile in (0.5, 0.95, 0.99):
+                quantile_labels = ",".join(filter(None, (label_text, f'quantile="{quantile}"')))
+                lines.append(f"{metric}{{{quantile_labels}}} {histogram.percentile(quantile * 100):.3f}")
+            suffix = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{metric}_sum{suffix} {histogram.total:.3f}")
+            lines.append(f"{metric}_count{suffix} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "agent_") -> None:
+        """
+        Write the Prometheus text file (e.g. for node_exporter's textfile collector).
+        """
+        _write_atomically(path, self.to_prometheus(prefix))
+
+    def write_json(self, path: str) -> None:
+        _write_atomically(path, json.dumps(self.snapshot(), indent=2))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RunMetricsMiddleware(AgentMiddleware):
+    """
+    Agent middleware recording ttft_ms and inter_token_ms of streaming runs and
+    run_ms of every run, labelled with the agent name.
+
+    A streaming run's run_ms is recorded when its stream ends. The framework's stream
+    wrappers do not pass aclose() on, so when the caller stops reading early it is only
+    recorded once those wrappers are garbage collected (at the latest when the event loop
+    shuts down), and it then covers the time up to the last update the caller received.
+    """
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+
+    async def process(self, context: AgentRunContext, next: Callable[[AgentRunContext], Awaitable[None]]) -> None:
+        labels = (("agent", context.agent.name or "agent"),)
+        start = time.perf_counter()
+        if not context.is_streaming:
+            try:
+                await next(context)
+            finally:
+                self.metrics.observe("run_ms", (time.perf_counter() - start) * 1000, labels)
+            return
+        await next(context)
+        context.result = self._timed_stream(context.result, start, labels)
+
+    async def _timed_stream(
+        self, stream: AsyncIterable[AgentRunResponseUpdate], start: float, labels: Labels
+    ) -> AsyncIterator[AgentRunResponseUpdate]:
+        observe = self.metrics.observe
+        clock = time.perf_counter
+        first_output: float | None = None
+        last_text: float | None = None
+        delivered: float | None = None
+        closed = False
+        try:
+            async for update in stream:
+                now: float | None = None
+                for content in update.contents:
+                    is_text = isinstance(content, TextContent)
+                    if is_text and not content.text:
+                        # e.g. the role-only opening chunk: not a token
+                        continue
+                    now = now or clock()
+                    if first_output is None:
+                        first_output = now
+                        observe("ttft_ms", (now - start) * 1000, labels)
+                    if is_text:
+                        if last_text is not None:
+                            observe("inter_token_ms", (now - last_text) * 1000, labels)
+                        last_text = now
+                        # Text after e.g. a function call in the same update still counts
+                        break
+                delivered = clock()
+                yield update
+        except GeneratorExit:
+            closed = True
+            raise
+        finally:
+            # Closed before the end: time the run up to the last update the caller received,
+            # however late the close comes
+            end = delivered if closed and delivered is not None else clock()
+            observe("run_ms", (end - start) * 1000, labels)
+
+
+class ToolMetricsMiddleware(FunctionMiddleware):
+    """
+    Function middleware recording tool_ms of every tool invocation, labelled with the tool name.
+    """
+
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+
+    async def process(self, context: FunctionInvocationContext, next: Callable[[FunctionInvocationContext], Awaitable[None]]) -> None:
+        start = time.perf_counter()
+        try:
+            await next(context)
+        finally:
+            self.metrics.observe("tool_ms", (time.perf_counter() - start) * 1000, (("tool", context.function.name),))
+
+
+@lru_cache(maxsize=1)
+def get_metrics() -> Metrics:
+    """
+    The process-wide Metrics.
+    """
+    return Metrics()
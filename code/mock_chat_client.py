@@ -0,0 +1,175 @@
+
+# =========================================
+# Deterministic Local Mock Chat Client
+# =========================================
+# A drop-in replacement for AzureOpenAIChatClient that needs no credentials or network.
+# It replays scripted turns -- streamed text chunks, tool calls, or structured JSON --
+# with configurable first-token and per-token delays, so framework overhead can be
+# measured separately from Azure latency (see benchmarks/).
+#
+# Usage:
+#   client = MockChatClient([
+#       MockTurn(tool_calls=[("get_weather", {"location": "Chennai"})]),
+#       MockTurn(text="It is rainy in Chennai."),
+#   ], first_token_delay=0.2, token_delay=0.01)
+#   agent = client.create_agent(name="Indian-Agent", tools=get_weather)
+#
+# Turns are chosen by how many assistant messages follow the latest user message, so the
+# same client serves any number of concurrent runs deterministically: the first model
+# call of a run gets turn 0, the call after its tool results gets turn 1, and so on.
+# =========================================
+
+import json
+import asyncio
+from collections.abc import AsyncIterable, Callable, MutableSequence, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from pydantic import BaseModel
+from agent_framework import (
+    BaseChatClient,
+    ChatMessage,
+    ChatOptions,
+    ChatResponse,
+    ChatResponseUpdate,
+    Contents,
+    FunctionCallContent,
+    Role,
+    TextContent,
+    UsageContent,
+    UsageDetails,
+    use_chat_middleware,
+    use_function_invocation,
+)
+
+
+@dataclass
+class MockTurn:
+    """
+    One scripted model response: text, tool calls, or a structured (JSON) payload.
+    """
+    text: str | None = None
+    tool_calls: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+    structured: BaseModel | dict[str, Any] | None = None
+
+    def output_text(self) -> str:
+        if self.structured is not None:
+            payload = self.structured.model_dump() if isinstance(self.structured, BaseModel) else self.structured
+            return json.dumps(payload)
+        return self.text or ""
+
+
+def _split_chunks(text: str, chunk_size: int) -> list[str]:
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+@use_function_invocation
+@use_chat_middleware
+class MockChatClient(BaseChatClient):
+    """
+    Chat client that answers from a script of MockTurns instead of calling a model.
+    """
+
+    OTEL_PROVIDER_NAME = "mock"
+
+    def __init__(
+        self,
+        turns: Sequence[MockTurn] | Callable[[Sequence[ChatMessage]], MockTurn],
+        *,
+        first_token_delay: float = 0.0,
+        token_delay: float = 0.0,
+        chunk_size: int = 4,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        if not callable(turns) and not turns:
+            raise ValueError("MockChatClient needs at least one turn.")
+        self.turns = turns
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.chunk_size = chunk_size
+        self.call_count = 0
+
+    def select_turn(self, messages: Sequence[ChatMessage]) -> tuple[int, MockTurn]:
+        """
+        Pick the scripted turn for a model call (see the module header for the rule).
+        """
+        if callable(self.turns):
+            return 0, self.turns(messages)
+        index = 0
+        for message in reversed(messages):
+            if message.role == Role.USER:
+                break
+            if message.role == Role.ASSISTANT:
+                index += 1
+        return index, self.turns[min(index, len(self.turns) - 1)]
+
+    def _tool_call_contents(self, index: int, turn: MockTurn) -> list[Contents]:
+        return [
+            FunctionCallContent(call_id=f"call_{index}_{i}", name=name, arguments=json.dumps(arguments))
+            for i, (name, arguments) in enumerate(turn.tool_calls)
+        ]
+
+    def _usage(self, messages: Sequence[ChatMessage], chunks: list[str]) -> UsageDetails:
+        # Rough token counts: four characters per token, one token per streamed chunk
+        input_tokens = sum(len(message.text or "") for message in messages) // 4 + 1
+        return UsageDetails(
+            input_token_count=input_tokens,
+            output_token_count=len(chunks),
+            total_token_count=input_tokens + len(chunks),
+        )
+
+    async def _inner_get_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> ChatResponse:
+        self.call_count += 1
+        index, turn = self.select_turn(messages)
+        chunks = _split_chunks(turn.output_text(), self.chunk_size)
+        await asyncio.sleep(self.first_token_delay + self.token_delay * max(len(chunks) - 1, 0))
+        contents: list[Contents] = self._tool_call_contents(index, turn)
+        if chunks:
+            contents.append(TextContent(text="".join(chunks)))
+        response = ChatResponse(
+            messages=[ChatMessage(role=Role.ASSISTANT, contents=contents)],
+            response_id=f"mock-{self.call_count}",
+            model_id="mock",
+            usage_details=self._usage(messages, chunks),
+        )
+        # Like the real clients, parse structured output into response.value
+        if chat_options.response_format is not None and chunks:
+            response.try_parse_value(chat_options.response_format)
+        return response
+
+    async def _inner_get_streaming_response(
+        self,
+        *,
+        messages: MutableSequence[ChatMessage],
+        chat_options: ChatOptions,
+        **kwargs: Any,
+    ) -> AsyncIterable[ChatResponseUpdate]:
+        self.call_count += 1
+        response_id = f"mock-{self.call_count}"
+        index, turn = self.select_turn(messages)
+        chunks = _split_chunks(turn.output_text(), self.chunk_size)
+        if self.first_token_delay:
+            await asyncio.sleep(self.first_token_delay)
+        for position, chunk in enumerate(chunks):
+            if position and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            yield ChatResponseUpdate(
+                role=Role.ASSISTANT, contents=[TextContent(text=chunk)], response_id=response_id, model_id="mock"
+            )
+        if turn.tool_calls:
+            yield ChatResponseUpdate(
+                role=Role.ASSISTANT, contents=self._tool_call_contents(index, turn), response_id=response_id, model_id="mock"
+            )
+        yield ChatResponseUpdate(
+            role=Role.ASSISTANT, contents=[UsageContent(self._usage(messages, chunks))], response_id=response_id, model_id="mock"
+        )
+
+    def service_url(self) -> str:
+        return "mock://local"
@@ -0,0 +1,239 @@
+
+# =========================================
+# Pipelined Hand-off Between Agent Executors
+# =========================================
+# In a chained workflow (weather agent -> tourist agent) the downstream executor only
+# receives its message after the upstream agent has streamed its whole response, so
+# the two model calls run strictly one after the other.
+#
+# A pipelined edge lets the downstream agent start as soon as the fields it needs are
+# complete in the upstream's structured (JSON) stream:
+#   - the upstream PipelinedAgentExecutor parses its own stream incrementally
+#     (structured_stream.IncrementalJSONObjectParser),
+#   - once every required field is complete it starts the downstream agent early, with
+#     the upstream's input plus an assistant message holding just those fields as JSON,
+#   - the downstream PipelinedAgentExecutor picks that run up when the workflow delivers
+#     the upstream's response, instead of starting a new one.
+# The second model call therefore overlaps the tail of the first.
+#
+# Event ordering stays coherent for AgentRunUpdateEvent consumers: the early run's
+# updates are queued and only emitted once the downstream executor runs, so every
+# upstream update still arrives before the first downstream one.
+#
+# Usage:
+#   weather = PipelinedAgentExecutor(weather_agent)
+#   tourist = PipelinedAgentExecutor(tourist_agent)
+#   builder = WorkflowBuilder().set_start_executor(weather)
+#   add_pipelined_edge(builder, weather, tourist, required_fields=["name", "weather"])
+# =========================================
+
+import json
+import time
+import asyncio
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any
+
+from agent_framework import (
+    AgentExecutor,
+    AgentExecutorResponse,
+    AgentProtocol,
+    AgentRunEvent,
+    AgentRunResponse,
+    AgentRunResponseUpdate,
+    AgentRunUpdateEvent,
+    AgentThread,
+    ChatAgent,
+    ChatMessage,
+    ExecutorEvent,
+    FunctionApprovalResponseContent,
+    Role,
+    WorkflowBuilder,
+    WorkflowContext,
+)
+from structured_stream import IncrementalJSONObjectParser
+
+_END = object()
+
+
+class EarlyHandoffEvent(ExecutorEvent):
+    """
+    Workflow event emitted by an upstream executor when it starts its downstream agent
+    before finishing its own response.
+    """
+
+    def __init__(self, executor_id: str, target_id: str, fields: dict[str, Any], at: float):
+        super().__init__(executor_id, {"target_id": target_id, "fields": fields, "at": at})
+        self.target_id = target_id
+        self.fields = fields
+        self.at = at
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(executor_id={self.executor_id}, target_id={self.target_id})"
+
+
+class _EarlyRun:
+    """
+    A downstream agent run started ahead of its workflow message. Updates are queued
+    until the downstream executor consumes them.
+    """
+
+    def __init__(self, agent: AgentProtocol, messages: list[ChatMessage], thread: AgentThread):
+        self.messages = messages
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self.task = asyncio.create_task(self._pump(agent, thread))
+
+    async def _pump(self, agent: AgentProtocol, thread: AgentThread) -> None:
+        try:
+            async for update in agent.run_stream(self.messages, thread=thread):
+                self._queue.put_nowait(update)
+        finally:
+            self._queue.put_nowait(_END)
+
+    async def updates(self) -> AsyncIterator[AgentRunResponseUpdate]:
+        while (update := await self._queue.get()) is not _END:
+            yield update
+        # Re-raise the run's error, if any
+        await self.task
+
+    def cancel(self) -> None:
+        self.task.cancel()
+
+
+def _response_format(agent: AgentProtocol) -> Any:
+    return agent.chat_options.response_format if isinstance(agent, ChatAgent) else None
+
+
+class PipelinedAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that can hand its required structured fields to a downstream
+    PipelinedAgentExecutor mid-stream, and can pick up a run started early for it.
+    """
+
+    def __init__(self, agent: AgentProtocol, **kwargs: Any):
+        super().__init__(agent, **kwargs)
+        self._handoff_target: PipelinedAgentExecutor | None = None
+        self._required_fields: tuple[str, ...] = ()
+        self._handoff_when: Callable[[], bool] | None = None
+        self._early_run: _EarlyRun | None = None
+
+    def pipeline_to(
+        self,
+        target: "PipelinedAgentExecutor",
+        required_fields: Sequence[str],
+        when: Callable[[], bool] | None = None,
+    ) -> None:
+        """
+        Start `target` as soon as all `required_fields` are complete in this agent's output.
+        `when`, checked at the start of every run, can turn the early start off for that
+        run (e.g. when a conditional edge will not deliver to `target`).
+        """
+        if not required_fields:
+            raise ValueError("A pipelined edge needs at least one required field.")
+        self._handoff_target = target
+        self._required_fields = tuple(required_fields)
+        self._handoff_when = when
+
+    def start_early(self, messages: list[ChatMessage]) -> None:
+        """
+        Begin this executor's agent run before its workflow message arrives.
+        """
+        if self._early_run is not None:
+            self._early_run.cancel()
+        self._early_run = _EarlyRun(self._agent, messages, self._agent_thread)
+
+    # ---- upstream side -------------------------------------------------------
+
+    async def _stream_with_handoff(self, ctx: WorkflowContext, emit_updates: bool) -> AgentRunResponse:
+        hand_off = self._handoff_target is not None and (self._handoff_when is None or self._handoff_when())
+        parser = IncrementalJSONObjectParser() if hand_off else None
+        inputs = list(self._cache)
+        updates: list[AgentRunResponseUpdate] = []
+        handed_off = False
+        try:
+            async for update in self._agent.run_stream(self._cache, thread=self._agent_thread):
+                updates.append(update)
+                if emit_updates:
+                    await ctx.add_event(AgentRunUpdateEvent(self.id, update))
+                if parser is None or handed_off or not update.text:
+                    continue
+                parser.feed(update.text)
+                if all(field in parser.fields for field in self._required_fields):
+                    handed_off = True
+                    fields = {field: parser.fields[field] for field in self._required_fields}
+                    handoff = ChatMessage(role=Role.ASSISTANT, text=json.dumps(fields), author_name=self._agent.name)
+                    self._handoff_target.start_early(inputs + [handoff])
+                    await ctx.add_event(EarlyHandoffEvent(self.id, self._handoff_target.id, fields, time.perf_counter()))
+        except BaseException:
+            if handed_off:
+                self._handoff_target.discard_early_run()
+            raise
+        return AgentRunResponse.from_agent_run_response_updates(
+            updates, output_format_type=_response_format(self._agent)
+        )
+
+    async def _run_agent_streaming(self, ctx: WorkflowContext) -> AgentRunResponse | None:
+        response = await self._stream_with_handoff(ctx, emit_updates=True)
+        return await self._finish(ctx, response)
+
+    async def _run_agent(self, ctx: WorkflowContext) -> AgentRunResponse | None:
+        # The hand-off needs the token stream even when the workflow itself is not streaming
+        response = await self._stream_with_handoff(ctx, emit_updates=False)
+        await ctx.add_event(AgentRunEvent(self.id, response))
+        return await self._finish(ctx, response)
+
+    async def _finish(self, ctx: WorkflowContext, response: AgentRunResponse) -> AgentRunResponse | None:
+        # Same user-input (approval) handling as AgentExecutor
+        if response.user_input_requests:
+            if self._handoff_target:
+                self._handoff_target.discard_early_run()
+            for user_input_request in response.user_input_requests:
+                self._pending_agent_requests[user_input_request.id] = user_input_request
+                await ctx.request_info(user_input_request, FunctionApprovalResponseContent)
+            return None
+        return response
+
+    # ---- downstream side -----------------------------------------------------
+
+    def discard_early_run(self) -> None:
+        if self._early_run is not None:
+            self._early_run.cancel()
+            self._early_run = None
+
+    async def _run_agent_and_emit(self, ctx: WorkflowContext) -> None:
+        early, self._early_run = self._early_run, None
+        if early is None:
+            await super()._run_agent_and_emit(ctx)
+            return
+
+        # Emit the early run's queued updates now, after every upstream update
+        updates: list[AgentRunResponseUpdate] = []
+        async for update in early.updates():
+            updates.append(update)
+            if ctx.is_streaming():
+                await ctx.add_event(AgentRunUpdateEvent(self.id, update))
+        response = AgentRunResponse.from_agent_run_response_updates(
+            updates, output_format_type=_response_format(self._agent)
+        )
+        if not ctx.is_streaming():
+            await ctx.add_event(AgentRunEvent(self.id, response))
+        if await self._finish(ctx, response) is None:
+            return
+        if self._output_response:
+            await ctx.yield_output(response)
+        full_conversation = list(early.messages) + list(response.messages)
+        await ctx.send_message(AgentExecutorResponse(self.id, response, full_conversation=full_conversation))
+        self._cache.clear()
+
+
+def add_pipelined_edge(
+    builder: WorkflowBuilder,
+    source: PipelinedAgentExecutor,
+    target: PipelinedAgentExecutor,
+    required_fields: Sequence[str],
+) -> WorkflowBuilder:
+    """
+    Add an edge from `source` to `target` that starts `target` as soon as
+    `required_fields` are complete in `source`'s structured output.
+    """
+    source.pipeline_to(target, required_fields)
+    return builder.add_edge(source, target)
@@ -0,0 +1,378 @@
+
+# =========================================
+# Client-side Rate Limiting and Adaptive Concurrency
+# =========================================
+# Bulk traffic (batch_runner.py, fan-out workflows) used to send model calls as fast as
+# the asyncio concurrency allowed. Past the deployment's quota Azure answers 429, and
+# uncoordinated per-request retries turn that into a retry storm.
+#
+# RateLimiter is shared by every agent that talks to one deployment:
+#   - token buckets for requests/min and tokens/min (a request reserves its estimated
+#     prompt + output tokens and is reconciled with the real usage afterwards),
+#   - Retry-After (and retry-after-ms) from a 429 pauses *all* requests until then,
+#   - AIMD adaptive concurrency: +1 in-flight slot per window of successful calls,
+#     halved on a 429 -- at most once per window, so the limit converges on the quota
+#     instead of collapsing or oscillating,
+#   - metrics: queue depth, in-flight calls, the current limit, achieved RPM / TPM.
+#
+# RateLimitMiddleware applies it to every model call as chat middleware and retries
+# throttled calls (streaming calls only before their first update).
+#
+# Usage:
+#   limiter = RateLimiter(rpm=600, tpm=90_000)
+#   agent = get_chat_client().create_agent(..., middleware=[RateLimitMiddleware(limiter)])
+#   print(limiter.snapshot())
+#
+# The OpenAI SDK also retries 429s by itself; set agent_openai_max_retries=0 so the
+# limiter sees every 429.
+# =========================================
+
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from collections.abc import AsyncIterable, Awaitable, Callable, Sequence
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from agent_framework import ChatContext, ChatMessage, ChatMiddleware, ChatOptions, ChatResponseUpdate, UsageContent
+from token_memory import TokenCounter, default_token_counter
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` per second up to `capacity`. reserve() may go into
+    debt and returns how long the caller has to wait for its reservation.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        self._refill()
+        self.tokens -= amount
+        return max(-self.tokens / self.rate, 0.0)
+
+    def adjust(self, amount: float) -> None:
+        # Give back (positive) or take (negative) tokens once the real cost is known
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+@dataclass
+class LimiterStats:
+    """
+    Counters describing the traffic that went through a RateLimiter.
+    """
+    requests: int = 0
+    completed: int = 0
+    throttled: int = 0
+    retries: int = 0
+    gave_up: int = 0
+    decreases: int = 0
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    return _rate_limit_error(exc) is not None
+
+
+def _rate_limit_error(exc: BaseException) -> BaseException | None:
+    # The framework wraps the SDK's RateLimitError (ServiceResponseException.inner_exception)
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if getattr(exc, "status_code", None) == 429:
+            return exc
+        exc = getattr(exc, "inner_exception", None) or exc.__cause__ or exc.__context__
+    return None
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """
+    The Retry-After of a 429 error (retry-after-ms, seconds or an HTTP date), if sent.
+    """
+    error = _rate_limit_error(exc)
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            value = headers["retry-after"]
+            try:
+                return float(value)
+            except ValueError:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+class RateLimiter:
+    """
+    Shared RPM/TPM token buckets, Retry-After pauses and AIMD concurrency for the model
+    calls of one deployment.
+    """
+
+    def __init__(
+        self,
+        rpm: float | None = None,
+        tpm: float | None = None,
+        *,
+        burst_seconds: float = 10.0,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 256,
+        decrease_factor: float = 0.5,
+        max_retries: int = 6,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        output_tokens: int = 500,
+        counter: TokenCounter | None = None,
+    ):
+        # Azure enforces quotas over short windows, so the buckets only hold `burst_seconds` worth
+        self.rpm_bucket = TokenBucket(rpm / 60, max(rpm / 60 * burst_seconds, 1)) if rpm else None
+        self.tpm_bucket = TokenBucket(tpm / 60, max(tpm / 60 * burst_seconds, 1)) if tpm else None
+        self.concurrency = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.output_tokens = output_tokens
+        self.counter = counter or default_token_counter()
+        self.stats = LimiterStats()
+        self.in_flight = 0
+        self.waiting = 0
+        self.paused_until = 0.0
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        # (finished at, tokens) of the calls completed in the last minute
+        self._completions: deque[tuple[float, int]] = deque()
+
+    # ---- admission ----------------------------------------------------------
+
+    def estimate_tokens(self, messages: Sequence[ChatMessage], chat_options: ChatOptions | None = None) -> int:
+        prompt = sum(self.counter.count_message(message) for message in messages)
+        max_tokens = chat_options.max_tokens if chat_options is not None else None
+        return prompt + (max_tokens or self.output_tokens)
+
+    async def acquire(self, tokens: int) -> float:
+        """
+        Wait for the buckets, any Retry-After pause and a concurrency slot. Returns the
+        admission time, to hand back to release() or throttled().
+        """
+        self.waiting += 1
+        try:
+            delay = 0.0
+            if self.rpm_bucket is not None:
+                delay = self.rpm_bucket.reserve(1)
+            if self.tpm_bucket is not None:
+                delay = max(delay, self.tpm_bucket.reserve(tokens))
+            if delay:
+                await asyncio.sleep(delay)
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+                    continue
+                if self.in_flight < int(self.concurrency):
+                    break
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                await waiter
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.stats.requests += 1
+        return time.monotonic()
+
+    def _free_slot(self) -> None:
+        self.in_flight -= 1
+        for _ in range(max(int(self.concurrency) - self.in_flight, 0)):
+            while self._waiters and self._waiters[0].done():
+                self._waiters.popleft()
+            if not self._waiters:
+                break
+            self._waiters.popleft().set_result(None)
+
+    def abandon(self) -> None:
+        """
+        A call was cancelled before it finished: free its slot without adapting.
+        """
+        self._free_slot()
+
+    def release(self, admitted: float, reserved: int, used: int | None = None) -> None:
+        """
+        A call finished successfully: reconcile its tokens and grow the concurrency limit.
+        """
+        self._free_slot()
+        used = reserved if used is None else used
+        if self.tpm_bucket is not None:
+            self.tpm_bucket.adjust(reserved - used)
+        self.stats.completed += 1
+        self._completions.append((time.monotonic(), used))
+        # Additive increase: about one more slot per `concurrency` successful calls
+        self.concurrency = min(self.concurrency + 1 / self.concurrency, self.max_concurrency)
+
+    def throttled(self, admitted: float, reserved: int, exc: BaseException, attempt: int) -> float | None:
+        """
+        A call failed. For a 429 within the retry budget, return how long to wait before
+        retrying; otherwise None (the error should be raised).
+        """
+        self._free_slot()
+        if not is_rate_limited(exc):
+            return None
+        self.stats.throttled += 1
+        # A throttled call used no quota: give its reservation back
+        if self.rpm_bucket is not None:
+            self.rpm_bucket.adjust(1)
+        if self.tpm_bucket is not None:
+            self.tpm_bucket.adjust(reserved)
+        # Multiplicative decrease, once per window: calls admitted before the last
+        # decrease were sent at the old limit and say nothing about the new one
+        if admitted >= self._last_decrease:
+            self.concurrency = max(self.concurrency * self.decrease_factor, self.min_concurrency)
+            self._last_decrease = time.monotonic()
+            self.stats.decreases += 1
+        retry_after = retry_after_seconds(exc)
+        if retry_after is not None:
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        if attempt >= self.max_retries:
+            self.stats.gave_up += 1
+            return None
+        self.stats.retries += 1
+        # Full-jitter exponential backoff on top of any Retry-After pause
+        backoff = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+        return (retry_after or 0.0) + backoff
+
+    # ---- metrics ------------------------------------------------------------
+
+    def _recent_completions(self) -> deque[tuple[float, int]]:
+        cutoff = time.monotonic() - 60
+        while self._completions and self._completions[0][0] < cutoff:
+            self._completions.popleft()
+        return self._completions
+
+    @property
+    def queue_depth(self) -> int:
+        return self.waiting
+
+    def achieved_rpm(self) -> int:
+        return len(self._recent_completions())
+
+    def achieved_tpm(self) -> int:
+        return sum(tokens for _, tokens in self._recent_completions())
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            **asdict(self.stats),
+            "queue_depth": self.queue_depth,
+            "in_flight": self.in_flight,
+            "concurrency_limit": round(self.concurrency, 2),
+            "achieved_rpm": self.achieved_rpm(),
+            "achieved_tpm": self.achieved_tpm(),
+        }
+
+
+def _used_tokens(usage: Any) -> int | None:
+    if usage is None:
+        return None
+    return usage.total_token_count or (usage.input_token_count or 0) + (usage.output_token_count or 0) or None
+
+
+class RateLimitMiddleware(ChatMiddleware):
+    """
+    Chat middleware that admits every model call through a RateLimiter and retries
+    calls throttled with 429.
+    """
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+
+    async def process(self, context: ChatContext, next: Callable[[ChatContext], Awaitable[None]]) -> None:
+        reserved = self.limiter.estimate_tokens(context.messages, context.chat_options)
+        if context.is_streaming:
+            # Admission happens when the caller starts reading the stream
+            context.result = self._stream(context, next, reserved)
+            return
+        attempt = 0
+        while True:
+            admitted = await self.limiter.acquire(reserved)
+            try:
+                await next(context)
+            except Exception as exc:
+                delay = self.limiter.throttled(admitted, reserved, exc, attempt)
+                if delay is None:
+                    raise
+                logger.debug("Model call throttled; retrying in %.2fs.", delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled while waiting for the model
+                self.limiter.abandon()
+                raise
+            if context.result is None:
+                # A later middleware ended the call without a response: nothing to adapt to
+                self.limiter.abandon()
+                return
+            self.limiter.release(admitted, reserved, _used_tokens(context.result.usage_details))
+            return
+
+    async def _stream(
+        self, context: ChatContext, next: Callable[[ChatContext], Awaitable[None]], reserved: int
+    ) -> AsyncIterable[ChatResponseUpdate]:
+        attempt = 0
+        while True:
+            admitted = await self.limiter.acquire(reserved)
+            started = False
+            settled = False
+            finished = False
+            used = None
+            try:
+                # context.result still holds this generator until the model call replaces it
+                context.result = None
+                await next(context)
+                if context.result is None:
+                    # A later middleware ended the call without a response
+                    return
+                async for update in context.result:
+                    started = True
+                    for content in update.contents:
+                        if isinstance(content, UsageContent):
+                            used = _used_tokens(content.details)
+                    yield update
+                finished = True
+            except Exception as exc:
+                settled = True
+                # Updates already yielded cannot be taken back, so only retry before the first one
+                delay = self.limiter.throttled(admitted, reserved, exc, self.limiter.max_retries if started else attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            finally:
+                if finished:
+                    self.limiter.release(admitted, reserved, used)
+                elif not settled:
+                    # No response, or the caller stopped reading early or was cancelled:
+                    # free the slot without counting the call as a success
+                    self.limiter.abandon()
+            return
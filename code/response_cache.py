@@ -0,0 +1,218 @@
+
+# =========================================
+# Persistent Prompt/Response Cache for agent.run and run_stream
+# =========================================
+# Many queries repeat exactly ("What is the capital of India?") and each repeat costs a
+# full model round trip. ResponseCacheMiddleware is an opt-in chat middleware that keys
+# every model call on a stable hash of the instructions, the message list, the tool
+# schemas and the response_format, and stores the result in a local SQLite file with
+# size-based (least recently used) eviction.
+#
+# Responses are stored as the list of ChatResponseUpdate objects the model produced, so a
+# cache hit on run_stream replays the same TextContent / FunctionCallContent stream and
+# streaming consumers work unchanged; a hit on run rebuilds the ChatResponse from them.
+#
+# Usage:
+#   cache = ResponseCache("agent_cache.sqlite3", max_bytes=64 * 1024 * 1024)
+#   agent = get_chat_client().create_agent(..., middleware=[ResponseCacheMiddleware(cache)])
+#
+# The example scripts enable it when the agent_response_cache environment variable
+# points at a cache file.
+# =========================================
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+from collections.abc import AsyncIterable, Awaitable, Callable, Sequence
+from typing import Any
+
+from pydantic import BaseModel
+from agent_framework import AIFunction, ChatContext, ChatMiddleware, ChatResponse, ChatResponseUpdate
+
+# Message fields that change between otherwise identical calls and must not affect the key
+_VOLATILE_MESSAGE_FIELDS = {"message_id", "additional_properties", "raw_representation"}
+# Chat options that change the model output and therefore belong in the key
+_KEYED_OPTIONS = ("model_id", "temperature", "top_p", "seed", "max_tokens", "stop", "frequency_penalty", "presence_penalty")
+
+
+class ResponseCache:
+    """
+    SQLite-backed store of serialized model responses with size-based LRU eviction.
+    """
+
+    def __init__(self, path: str = "agent_response_cache.sqlite3", *, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self._db.commit()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> list[dict] | None:
+        """
+        Return the stored updates for `key`, or None on a miss.
+        """
+        row = self._db.execute("SELECT payload FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._db.commit()
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, updates: list[dict]) -> None:
+        """
+        Store the updates for `key`, evicting least recently used entries beyond `max_bytes`.
+        """
+        payload = zlib.compress(json.dumps(updates, separators=(",", ":")).encode())
+        if len(payload) > self.max_bytes:
+            return
+        previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, payload, len(payload), time.time()),
+        )
+        self._total_bytes += len(payload) - (previous[0] if previous else 0)
+        self._evict()
+        self._db.commit()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            oldest = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if oldest is None:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (oldest[0],))
+            self._total_bytes -= oldest[1]
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM responses")
+        self._db.commit()
+        self._total_bytes = 0
+
+    def close(self) -> None:
+        self._db.close()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+def _tool_schema(tool: Any) -> Any:
+    if isinstance(tool, AIFunction):
+        return tool.to_json_schema_spec()
+    if isinstance(tool, dict):
+        return tool
+    if hasattr(tool, "to_dict"):
+        return tool.to_dict()
+    return getattr(tool, "name", repr(tool))
+
+
+def _response_format_schema(response_format: Any) -> Any:
+    if isinstance(response_format, type) and issubclass(response_format, BaseModel):
+        return {"name": response_format.__name__, "schema": response_format.model_json_schema()}
+    return response_format
+
+
+def cache_key(messages: Sequence[Any], chat_options: Any) -> str:
+    """
+    Stable hash of everything that determines the model output for one call:
+    instructions, messages, tool schemas, response_format and sampling options.
+    """
+    tools = chat_options.tools or []
+    payload = {
+        "instructions": chat_options.instructions,
+        "messages": [
+            {k: v for k, v in message.to_dict().items() if k not in _VOLATILE_MESSAGE_FIELDS}
+            for message in messages
+        ],
+        "tools": [_tool_schema(tool) for tool in (tools if isinstance(tools, list) else [tools])],
+        "tool_choice": str(chat_options.tool_choice),
+        "response_format": _response_format_schema(chat_options.response_format),
+        "options": {name: getattr(chat_options, name, None) for name in _KEYED_OPTIONS},
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _response_to_updates(response: ChatResponse) -> list[dict]:
+    # Store non-streaming responses in the same update form as streamed ones
+    updates = [
+        ChatResponseUpdate(
+            role=message.role,
+            contents=message.contents,
+            author_name=message.author_name,
+            message_id=message.message_id,
+            response_id=response.response_id,
+            model_id=response.model_id,
+        ).to_dict()
+        for message in response.messages
+    ]
+    if updates and response.finish_reason:
+        updates[-1]["finish_reason"] = response.finish_reason.to_dict()
+    return updates
+
+
+class ResponseCacheMiddleware(ChatMiddleware):
+    """
+    Chat middleware that serves repeated model calls from a ResponseCache.
+    """
+
+    def __init__(self, cache: ResponseCache):
+        self.cache = cache
+
+    async def process(self, context: ChatContext, next: Callable[[ChatContext], Awaitable[None]]) -> None:
+        key = cache_key(context.messages, context.chat_options)
+        cached = self.cache.get(key)
+        if cached is not None:
+            updates = [ChatResponseUpdate.from_dict(update) for update in cached]
+            if context.is_streaming:
+                context.result = self._replay(updates)
+            else:
+                context.result = ChatResponse.from_chat_response_updates(
+                    updates, output_format_type=context.chat_options.response_format
+                )
+            # Skip the model call entirely
+            context.terminate = True
+            return
+
+        await next(context)
+        if context.is_streaming:
+            context.result = self._record(key, context.result)
+        elif context.result is not None:
+            self.cache.put(key, _response_to_updates(context.result))
+
+    async def _replay(self, updates: list[ChatResponseUpdate]) -> AsyncIterable[ChatResponseUpdate]:
+        for update in updates:
+            yield update
+
+    async def _record(self, key: str, stream: AsyncIterable[ChatResponseUpdate]) -> AsyncIterable[ChatResponseUpdate]:
+        # Pass updates through as they arrive; only a fully consumed stream is cached
+        updates: list[dict] = []
+        async for update in stream:
+            updates.append(update.to_dict())
+            yield update
+        self.cache.put(key, updates)
+
+
+def response_cache_middleware_from_env() -> list[ResponseCacheMiddleware]:
+    """
+    Return the cache middleware when the agent_response_cache environment variable is set,
+    otherwise an empty list (the cache is opt-in).
+    """
+    path = os.getenv("agent_response_cache")
+    if not path:
+        return []
+    max_bytes = int(os.getenv("agent_response_cache_max_bytes", 64 * 1024 * 1024))
+    return [ResponseCacheMiddleware(ResponseCache(path, max_bytes=max_bytes))]
@@ -0,0 +1,208 @@
+
+# =========================================
+# Process-wide Tool / Response Format Schema Registry
+# =========================================
+# create_agent(tools=get_weather, response_format=CityInfo) wraps get_weather with
+# ai_function(), which inspects its Annotated/Field signature and builds a new pydantic
+# input model (and its compiled validator) every time. Then every request converts each
+# tool to a JSON schema again (model_json_schema) and CityInfo to a strict response_format
+# schema again (type_to_response_format_param). With short-lived agents per request, this
+# is repeated work on identical inputs.
+#
+# SchemaRegistry builds each of these once per process, keyed on the identity of the
+# function or pydantic model:
+#   - tool(func): an AIFunction on the cached declaration (name, description, input model
+#     and so its validator); each call still returns a new AIFunction, so invocation
+#     counters stay per agent,
+#   - json_schema(model) / response_format(model): the cached request schemas (copies).
+#
+# SchemaCachingMixin makes a chat client's create_agent() use the registry, and
+# SchemaCachedAzureOpenAIChatClient (what client_factory.get_chat_client() returns) also
+# uses it when preparing every request, so the examples need no changes.
+#
+# Usage:
+#   registry = get_schema_registry()
+#   agent = client.create_agent(name=..., tools=registry.tools([get_weather]))
+#   print(registry.stats)
+#
+# Entries are weakly keyed and hold no reference to their key (a tool entry keeps the
+# name, description and input model, not the function), so a function or model class
+# that goes away takes its entries with it; per-request closures do not accumulate.
+# Bound methods and other tools that are not plain functions are not cached.
+# =========================================
+
+import copy
+import inspect
+from collections.abc import Callable, MutableMapping, MutableSequence, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from pydantic import BaseModel
+from openai.lib._parsing._completions import type_to_response_format_param
+from agent_framework import AIFunction, ChatMessage, ChatOptions, ToolProtocol, ai_function
+from agent_framework.azure import AzureOpenAIChatClient
+
+
+@dataclass(frozen=True)
+class ToolDeclaration:
+    """
+    What ai_function() derives from a function's signature, without the function itself.
+    """
+    name: str
+    description: str
+    input_model: type[BaseModel]
+
+
+@dataclass
+class SchemaStats:
+    """
+    Registry hits and misses; a miss is the one time a declaration or schema is built.
+    """
+    tool_hits: int = 0
+    tool_misses: int = 0
+    schema_hits: int = 0
+    schema_misses: int = 0
+    format_hits: int = 0
+    format_misses: int = 0
+
+
+class SchemaRegistry:
+    """
+    Cache of tool declarations and request schemas keyed on function / model identity.
+    """
+
+    def __init__(self):
+        self._tools: WeakKeyDictionary[Callable[..., Any], ToolDeclaration] = WeakKeyDictionary()
+        self._schemas: WeakKeyDictionary[type[BaseModel], dict] = WeakKeyDictionary()
+        self._formats: WeakKeyDictionary[type[BaseModel], dict] = WeakKeyDictionary()
+        self.stats = SchemaStats()
+
+    def tool(self, func: Any) -> Any:
+        """
+        AIFunction for a plain function, built on its registered declaration. AIFunctions,
+        other tool types and methods are returned unchanged.
+        """
+        if isinstance(func, (ToolProtocol, MutableMapping)) or not callable(func) or inspect.ismethod(func):
+            return func
+        try:
+            declaration = self._tools.get(func)
+        except TypeError:
+            # Not weakly referenceable (e.g. a builtin): nothing to key the cache on
+            return func
+        if declaration is None:
+            self.stats.tool_misses += 1
+            template = ai_function(func)
+            # Keep only the declaration: the AIFunction holds `func`, which would keep its
+            # own weak key alive
+            declaration = self._tools[func] = ToolDeclaration(template.name, template.description, template.input_model)
+        else:
+            self.stats.tool_hits += 1
+        return AIFunction(
+            name=declaration.name,
+            description=declaration.description,
+            additional_properties={},
+            func=func,
+            input_model=declaration.input_model,
+        )
+
+    def tools(self, tools: Any) -> Any:
+        """
+        `tools` as create_agent accepts them (one tool or a sequence), with every plain
+        function replaced by its registered AIFunction.
+        """
+        if tools is None or isinstance(tools, (ToolProtocol, MutableMapping)):
+            return tools
+        if not isinstance(tools, Sequence):
+            return self.tool(tools)
+        return [self.tool(tool) for tool in tools]
+
+    def json_schema(self, model: type[BaseModel]) -> dict:
+        """
+        model.model_json_schema(), built once per model.
+        """
+        schema = self._schemas.get(model)
+        if schema is None:
+            self.stats.schema_misses += 1
+            schema = self._schemas[model] = model.model_json_schema()
+        else:
+            self.stats.schema_hits += 1
+        # The request builder owns what it gets; the cached schema must stay intact
+        return copy.deepcopy(schema)
+
+    def response_format(self, model: type[BaseModel]) -> dict:
+        """
+        The strict json_schema response_format parameter for `model`, built once per model.
+        """
+        param = self._formats.get(model)
+        if param is None:
+            self.stats.format_misses += 1
+            param = self._formats[model] = type_to_response_format_param(model)
+        else:
+            self.stats.format_hits += 1
+        return copy.deepcopy(param)
+
+    def clear(self) -> None:
+        self._tools.clear()
+        self._schemas.clear()
+        self._formats.clear()
+
+
+@lru_cache(maxsize=1)
+def get_schema_registry() -> SchemaRegistry:
+    """
+    The process-wide SchemaRegistry.
+    """
+    return SchemaRegistry()
+
+
+class SchemaCachingMixin:
+    """
+    Mixin for chat clients: create_agent() takes its tool declarations from the registry.
+    """
+
+    def create_agent(self, *, tools: Any = None, **kwargs: Any) -> Any:
+        return super().create_agent(tools=get_schema_registry().tools(tools), **kwargs)
+
+
+class SchemaCachedAzureOpenAIChatClient(SchemaCachingMixin, AzureOpenAIChatClient):
+    """
+    AzureOpenAIChatClient that also takes the tool and response_format schemas of each
+    request from the registry.
+    """
+
+    def _chat_to_tool_spec(self, tools: Sequence[ToolProtocol | MutableMapping[str, Any]]) -> list[dict[str, Any]]:
+        registry = get_schema_registry()
+        specs: list[dict[str, Any]] = []
+        for tool in tools:
+            # Subclasses that describe themselves differently keep their own spec
+            if (
+                isinstance(tool, AIFunction)
+                and type(tool).to_json_schema_spec is AIFunction.to_json_schema_spec
+                and type(tool).parameters is AIFunction.parameters
+            ):
+                specs.append({
+                    "type": "function",
+                    "function": {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "parameters": registry.json_schema(tool.input_model),
+                    },
+                })
+            else:
+                specs.extend(super()._chat_to_tool_spec([tool]))
+        return specs
+
+    def _prepare_options(self, messages: MutableSequence[ChatMessage], chat_options: ChatOptions) -> dict[str, Any]:
+        response_format = chat_options.response_format
+        if not (isinstance(response_format, type) and issubclass(response_format, BaseModel)):
+            return super()._prepare_options(messages, chat_options)
+        # Hide the model from the base class so it does not build the schema again
+        chat_options.response_format = None
+        try:
+            options = super()._prepare_options(messages, chat_options)
+        finally:
+            chat_options.response_format = response_format
+        options["response_format"] = get_schema_registry().response_format(response_format)
+        return options
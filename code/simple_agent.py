@@ -1,7 +1,7 @@
 
-import os
 import asyncio
-from agent_framework.azure import AzureOpenAIResponsesClient
+from client_factory import get_responses_client
+from response_cache import response_cache_middleware_from_env
 
 # =============================
 # Agent Configuration Constants
@@ -19,25 +19,12 @@ async def simple_agent():
     """
     Main function to run the agent and print the response to a sample query.
     """
-    # Load Azure OpenAI configuration from environment variables
-    endpoint = os.getenv("azure_endpoint")
-    api_key = os.getenv("azure_apikey")
-    deployment_name = os.getenv("azure_deployment")
-    api_version = os.getenv("azure_version")
-
-    # Validate required environment variables
-    if not all([endpoint, api_key, deployment_name, api_version]):
-        raise EnvironmentError("Missing one or more required Azure OpenAI environment variables.")
-
-    # Create the agent with specified name and instructions
-    agent = AzureOpenAIResponsesClient(
-        endpoint=endpoint,
-        deployment_name=deployment_name,
-        api_version=api_version,
-        api_key=api_key
-    ).create_agent(
+    # Create the agent on the shared, pooled responses client with specified name and instructions
+    agent = get_responses_client().create_agent(
         name=AGENT_NAME,
         instructions=AGENT_INSTRUCTIONS,
+        # Opt-in response cache (set agent_response_cache=<file> to enable)
+        middleware=response_cache_middleware_from_env(),
     )
 
     # Run a sample query and print the result
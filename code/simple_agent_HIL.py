@@ -1,8 +1,9 @@
 
-import os
 import asyncio
-from agent_framework.azure import AzureOpenAIChatClient
-from agent_framework import ChatMessage,Role, ai_function, TextContent, FunctionCallContent, FunctionResultContent,FunctionApprovalRequestContent
+from client_factory import get_chat_client
+from agent_framework import ai_function, TextContent, FunctionCallContent, FunctionResultContent,FunctionApprovalRequestContent
+from hil_approvals import ApprovalPolicyCache, ResumableApprovals
+from token_memory import token_budget_store_factory
 from typing import Annotated
 from pydantic import Field
 
@@ -30,36 +31,12 @@ def get_weather(location: Annotated[str, Field(description="The location to get
 
 
 
-async def hil_example():
+def print_contents(response):
     """
-    Main function to run the agent with Human-in-the-Loop (HIL) tool support and stream the response to a sample query.
-    Demonstrates how human approval is required before executing certain functions.
+    Print the text, function call/result and approval request contents of a response.
     """
-    # Load Azure OpenAI configuration from environment variables
-    endpoint = os.getenv("azure_endpoint")
-    api_key = os.getenv("azure_apikey")
-    deployment_name = os.getenv("azure_deployment")
-    api_version = os.getenv("azure_version")
-
-    # Validate required environment variables
-    if not all([endpoint, api_key, deployment_name, api_version]):
-        raise EnvironmentError("Missing one or more required Azure OpenAI environment variables.")
-
-    # Create the agent with specified name, instructions, and tool(s)
-    agent = AzureOpenAIChatClient(
-        endpoint=endpoint,
-        deployment_name=deployment_name,
-        api_version=api_version,
-        api_key=api_key
-    ).create_agent(
-        name=AGENT_NAME,
-        instructions=AGENT_INSTRUCTIONS,
-        tools=get_weather
-    )
-
-    # Stream agent responses and handle different content types
-    async for update in agent.run_stream("What is the weather in Chennai?"):
-        for content in update.contents:
+    for message in response.messages:
+        for content in message.contents:
             # Print text content from the agent
             if isinstance(content, TextContent):
                 print(f"[TextContent] {content.text}")
@@ -76,28 +53,55 @@ async def hil_example():
                 print(f"[FunctionApprovalRequestContent] call : {content.function_call.call_id}")
                 print(f"[FunctionApprovalRequestContent] args : {content.function_call.arguments}")
 
+
+async def hil_example():
+    """
+    Main function to run the agent with Human-in-the-Loop (HIL) tool support for a sample query.
+    Demonstrates how human approval is required before executing certain functions, and how
+    the run resumes from its stored thread once the approval arrives.
+    """
+    # Create the agent on the shared, pooled chat client with specified name, instructions, and tool(s).
+    # Threads keep their history under a token budget (older turns are summarized).
+    agent = get_chat_client().create_agent(
+        name=AGENT_NAME,
+        instructions=AGENT_INSTRUCTIONS,
+        tools=get_weather,
+        chat_message_store_factory=token_budget_store_factory(max_tokens=2000)
+    )
+
+    # Pending approvals are stored with the thread state; identical calls approved in the
+    # last 10 minutes are approved automatically
+    approvals = ResumableApprovals(agent, policy=ApprovalPolicyCache(window=600))
+
+    result = await approvals.run("What is the weather in Chennai?")
+    print_contents(result.response)
+
     # If the agent requests user input for approval, handle it here
-    if update.user_input_requests:
-        for user_input_need in update.user_input_requests:
+    while result.pending:
+        for user_input_need in result.pending:
             print(f"Function : {user_input_need.function_call.name}")
             print(f"args : {user_input_need.function_call.arguments}")
 
         # Simulate user approval (Human-in-the-Loop)
         user_approval = True
-        approval_message = ChatMessage(role=Role.USER, contents=[user_input_need.create_response(user_approval)])
 
-        # Run the agent with the approval message and print the final result
-        final_result = await agent.run([
-            "what is the current weather in chennai ?",
-            ChatMessage(role=Role.ASSISTANT, contents=[user_input_need]),
-            approval_message
-        ])
-        print(final_result)
+        # Resume the stored run: the approval is added to the stored thread, no history is rebuilt
+        result = await approvals.resume(result.turn_id, approved=user_approval)
+    print(result.response)
+
+    # Asking again on the same thread: the identical get_weather call is auto-approved
+    result = await approvals.run("Is it still the same weather in chennai?", thread=result.thread)
+    print(f"Auto-approved calls: {result.auto_approved}")
+    print(result.response)
+
+    # Token accounting of the thread's memory for the last turn
+    report = result.thread.message_store.last_report
+    print(f"History tokens: {report.full_history_tokens}, sent: {report.sent_tokens}, saved: {report.saved_tokens}")
 
 
 
 
 
-# Entry point: run the agent with Human-in-the-Loop tool and stream response asynchronously
+# Entry point: run the agent with Human-in-the-Loop tool asynchronously
 if __name__ == "__main__":
     asyncio.run(hil_example())
\ No newline at end of file
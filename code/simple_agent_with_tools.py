@@ -1,7 +1,7 @@
 
-import os
 import asyncio
-from agent_framework.azure import AzureOpenAIChatClient
+from hedged_client import get_hedged_chat_client
+from tool_cache import cached_tool
 from typing import Annotated
 from pydantic import Field
 
@@ -15,6 +15,9 @@ AGENT_INSTRUCTIONS = (
 )
 
 
+# Cache weather lookups per normalized location, so repeated tool calls
+# (e.g. from batch_runner.py) hit the backend at most once per 5 minutes
+@cached_tool(ttl=300, maxsize=1024)
 def get_weather(location: Annotated[str, Field(description="The location to get weather for")]) -> str:
     """
     Tool function to get weather information for a given location.
@@ -29,23 +32,9 @@ async def simple_agent_with_tools():
     """
     Main function to run the agent with tool support and print the response to a sample query.
     """
-    # Load Azure OpenAI configuration from environment variables
-    endpoint = os.getenv("azure_endpoint")
-    api_key = os.getenv("azure_apikey")
-    deployment_name = os.getenv("azure_deployment")
-    api_version = os.getenv("azure_version")
-
-    # Validate required environment variables
-    if not all([endpoint, api_key, deployment_name, api_version]):
-        raise EnvironmentError("Missing one or more required Azure OpenAI environment variables.")
-
-    # Create the agent with specified name, instructions, and tool(s)
-    agent = AzureOpenAIChatClient(
-        endpoint=endpoint,
-        deployment_name=deployment_name,
-        api_version=api_version,
-        api_key=api_key
-    ).create_agent(
+    # Create the agent on the shared, pooled chat client with specified name, instructions, and tool(s).
+    # Set agent_hedge_deployments to hedge slow calls to other deployments (see hedged_client.py).
+    agent = get_hedged_chat_client().create_agent(
         name=AGENT_NAME,
         instructions=AGENT_INSTRUCTIONS,
         tools=get_weather
@@ -1,7 +1,8 @@
 
-import os
 import asyncio
-from agent_framework.azure import AzureOpenAIChatClient
+from client_factory import get_chat_client
+from response_cache import response_cache_middleware_from_env
+from tool_executor import ToolExecutor
 from agent_framework import TextContent, FunctionCallContent, FunctionResultContent
 from typing import Annotated
 from pydantic import Field
@@ -29,32 +30,24 @@ async def simple_agent_with_tools_stream():
     """
     Main function to run the agent with tool support and stream the response to a sample query.
     """
-    # Load Azure OpenAI configuration from environment variables
-    endpoint = os.getenv("azure_endpoint")
-    api_key = os.getenv("azure_apikey")
-    deployment_name = os.getenv("azure_deployment")
-    api_version = os.getenv("azure_version")
+    # Sync tools run on a thread pool (max 4 concurrent get_weather calls, 10s timeout),
+    # so the parallel calls of one turn overlap instead of blocking the event loop
+    tool_executor = ToolExecutor(max_threads=8)
 
-    # Validate required environment variables
-    if not all([endpoint, api_key, deployment_name, api_version]):
-        raise EnvironmentError("Missing one or more required Azure OpenAI environment variables.")
-
-    # Create the agent with specified name, instructions, and tool(s)
-    agent = AzureOpenAIChatClient(
-        endpoint=endpoint,
-        deployment_name=deployment_name,
-        api_version=api_version,
-        api_key=api_key
-    ).create_agent(
+    # Create the agent on the shared, pooled chat client with specified name, instructions, and tool(s)
+    agent = get_chat_client().create_agent(
         name=AGENT_NAME,
         instructions=AGENT_INSTRUCTIONS,
-        tools=get_weather
+        # Opt-in response cache (set agent_response_cache=<file> to enable);
+        # the latency middleware adds latency_ms to every streamed function result
+        middleware=[*response_cache_middleware_from_env(), tool_executor.latency_middleware()],
+        tools=tool_executor.wrap(get_weather, concurrency={"get_weather": 4}, timeouts={"get_weather": 10})
     )
 
     # Run a sample query and stream the result
 
     print("Streaming response:")
-    async for update in agent.run_stream("What is the weather in Chennai?"):
+    async for update in agent.run_stream("What is the weather in Chennai, Delhi and Mumbai?"):
         # Each update may contain multiple content types
         for content in update.contents:
             # Use direct isinstance checks for content types
@@ -65,7 +58,8 @@ async def simple_agent_with_tools_stream():
                 print(f"Arguments: {content.arguments}", flush=True)
                 print(f"Call ID: {content.call_id}", flush=True)
             elif isinstance(content, FunctionResultContent):
-                print(f"\n[Function Result] {content.result}\n", flush=True)
+                latency = (content.additional_properties or {}).get("latency_ms")
+                print(f"\n[Function Result] {content.result} ({latency} ms)\n", flush=True)
             else:
                 # Fallback for unknown types
                 if getattr(content, "type", None) == "text":
@@ -75,6 +69,8 @@ async def simple_agent_with_tools_stream():
                 elif getattr(content, "type", None) == "functionResult":
                     print(f"\n[Function Result] {content.result}\n", flush=True)
 
+    tool_executor.shutdown()
+
 if __name__ == "__main__":
     # Entry point: run the agent with tools and stream response asynchronously
     asyncio.run(simple_agent_with_tools_stream())
\ No newline at end of file
@@ -0,0 +1,237 @@
+
+# =========================================
+# Local Stand-in Azure OpenAI Server
+# =========================================
+# A tiny HTTP/1.1 keep-alive server that answers Azure OpenAI chat completion
+# requests (streaming and non-streaming) with a canned reply. It lets the shared
+# client factory and other networking helpers be exercised without credentials.
+#
+# Usage:
+#   uv run python code/stand_in_server.py --port 8089
+#   azure_endpoint=http://127.0.0.1:8089 azure_apikey=test azure_deployment=test \
+#   azure_version=2024-10-21 uv run python code/simple_agent_with_tools.py
+#
+# Latency can be injected to exercise timeouts and hedging: --first-token-delay delays
+# every response, and --slow-every N adds --slow-delay to every Nth request.
+#
+# --rate-limit N answers with 429 (and Retry-After) once more than N requests arrived
+# in the last --rate-window seconds, like an Azure deployment over its quota.
+# =========================================
+
+import re
+import json
+import time
+import asyncio
+import math
+import argparse
+from collections import deque
+from dataclasses import dataclass, field
+
+
+@dataclass
+class StandInStats:
+    """
+    Counters describing the traffic the stand-in server has seen.
+    """
+    connections: int = 0
+    requests: int = 0
+    # Requests that got the injected slow delay
+    slowed: int = 0
+    # Streams the client closed before they were complete (e.g. a cancelled hedge)
+    aborted_streams: int = 0
+    # Requests rejected with 429 by the rate limit
+    throttled: int = 0
+
+
+@dataclass
+class StandInServer:
+    """
+    Minimal OpenAI-compatible chat completions server for local testing.
+    """
+    reply: str = "This is a stand-in response."
+    host: str = "127.0.0.1"
+    port: int = 0
+    first_token_delay: float = 0.0
+    slow_every: int = 0
+    slow_delay: float = 0.0
+    token_delay: float = 0.0
+    rate_limit: int = 0
+    rate_window: float = 60.0
+    stats: StandInStats = field(default_factory=StandInStats)
+    _server: asyncio.AbstractServer | None = None
+    _accepted: deque = field(default_factory=deque)
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "StandInServer":
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        # Pick up the real port when an ephemeral one (0) was requested
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Drop idle keep-alive connections so wait_closed() does not block on them
+            self._server.close_clients()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "StandInServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        try:
+            # Serve requests on this connection until the client closes it (keep-alive)
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                self.stats.requests += 1
+                await self._handle_request(method, path, headers, body, writer)
+        except (ConnectionResetError, BrokenPipeError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, method: str, path: str, headers: dict, body: bytes, writer: asyncio.StreamWriter) -> None:
+        if method != "POST" or "/chat/completions" not in path:
+            await self._write_json(writer, 404, {"error": {"message": f"Unknown route {path}"}})
+            return
+        retry_after = self._retry_after()
+        if retry_after is not None:
+            self.stats.throttled += 1
+            headers = {"Retry-After": math.ceil(retry_after), "retry-after-ms": int(retry_after * 1000)}
+            error = {"error": {"code": "429", "message": "Rate limit is exceeded. Try again later."}}
+            await self._write_json(writer, 429, error, headers)
+            return
+        payload = json.loads(body or b"{}")
+        model = payload.get("model", "stand-in")
+        await asyncio.sleep(self._delay())
+        if payload.get("stream"):
+            include_usage = bool((payload.get("stream_options") or {}).get("include_usage"))
+            await self._write_stream(writer, model, include_usage)
+        else:
+            await self._write_json(writer, 200, self._completion(model))
+
+    def _retry_after(self) -> float | None:
+        # Sliding-window request quota; returns the seconds until a slot frees up when exceeded
+        if not self.rate_limit:
+            return None
+        now = time.monotonic()
+        while self._accepted and self._accepted[0] <= now - self.rate_window:
+            self._accepted.popleft()
+        if len(self._accepted) >= self.rate_limit:
+            return self._accepted[0] + self.rate_window - now
+        self._accepted.append(now)
+        return None
+
+    def _delay(self) -> float:
+        # Time to first token for the current request, including the injected slow delay
+        delay = self.first_token_delay
+        if self.slow_every and self.stats.requests % self.slow_every == 0:
+            self.stats.slowed += 1
+            delay += self.slow_delay
+        return delay
+
+    def _completion(self, model: str) -> dict:
+        return {
+            "id": "chatcmpl-stand-in",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": self.reply},
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    def _chunk(self, model: str, delta: dict, finish_reason: str | None = None) -> dict:
+        return {
+            "id": "chatcmpl-stand-in",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    async def _write_json(self, writer: asyncio.StreamWriter, status: int, payload: dict, extra_headers: dict | None = None) -> None:
+        body = json.dumps(payload).encode()
+        head = [f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}", "Content-Type: application/json", f"Content-Length: {len(body)}"]
+        head += [f"{name}: {value}" for name, value in (extra_headers or {}).items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + body)
+        await writer.drain()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, model: str, include_usage: bool = False) -> None:
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        events = [self._chunk(model, {"role": "assistant", "content": ""})]
+        # Stream the reply word by word, keeping the trailing whitespace with each word
+        events += [self._chunk(model, {"content": token}) for token in re.findall(r"\S+\s*", self.reply)]
+        events.append(self._chunk(model, {}, finish_reason="stop"))
+        if include_usage:
+            events.append({**self._chunk(model, {}), "choices": [], "usage": self._completion(model)["usage"]})
+        try:
+            for position, event in enumerate(events):
+                if position > 1 and self.token_delay:
+                    await asyncio.sleep(self.token_delay)
+                self._write_chunk(writer, f"data: {json.dumps(event)}\n\n".encode())
+                await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            self.stats.aborted_streams += 1
+            raise
+        self._write_chunk(writer, b"data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    @staticmethod
+    def _write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+        writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+async def serve(host: str, port: int, reply: str, **delays: float) -> None:
+    """
+    Run the stand-in server until interrupted.
+    """
+    server = await StandInServer(reply=reply, host=host, port=port, **delays).start()
+    print(f"Stand-in Azure OpenAI server listening on {server.endpoint}")
+    await asyncio.Event().wait()
+
+
+# Entry point: run the stand-in server from the command line
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in Azure OpenAI chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--reply", default="This is a stand-in response.")
+    parser.add_argument("--first-token-delay", type=float, default=0.0, help="Seconds before every response starts.")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed words.")
+    parser.add_argument("--slow-every", type=int, default=0, help="Slow down every Nth request (0 = never).")
+    parser.add_argument("--slow-delay", type=float, default=0.0, help="Extra seconds for the slowed requests.")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests allowed per rate window (0 = unlimited).")
+    parser.add_argument("--rate-window", type=float, default=60.0, help="Rate limit window in seconds.")
+    args = parser.parse_args()
+    asyncio.run(serve(
+        args.host,
+        args.port,
+        args.reply,
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+        slow_every=args.slow_every,
+        slow_delay=args.slow_delay,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+    ))
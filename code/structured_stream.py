@@ -0,0 +1,210 @@
+
+# =========================================
+# Incremental Structured Output for Streaming Runs
+# =========================================
+# With response_format=CityInfo the result is only usable once the whole JSON document
+# has arrived and been parsed. For large structured responses the first fields are
+# often complete long before the last token.
+#
+# IncrementalJSONObjectParser scans each streamed chunk once (tracking nesting depth,
+# strings and escapes) and decodes a top-level field as soon as its value is complete,
+# by running json.loads on just that value's slice. The buffer is never re-parsed, and
+# text already scanned is dropped so it only holds the field currently being streamed.
+#
+# stream_structured() wraps agent.run_stream and yields typed partial snapshots:
+#
+#   async for city in stream_structured(agent.run_stream(query, response_format=CityInfo), CityInfo):
+#       print(city.model_fields_set, city)   # e.g. {'name'} name='Chennai' weather=None
+#
+# Every snapshot is built with model_construct (fields validated one by one); the last
+# one is the fully validated model.
+# =========================================
+
+import re
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from functools import lru_cache
+from typing import Any, TypeVar
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+_WHITESPACE = " \t\r\n"
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class IncrementalJSONObjectParser:
+    """
+    Streaming scanner for one JSON object that reports each top-level field as soon
+    as its value is complete. Every character is looked at once.
+    """
+
+    def __init__(self):
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self._buffer = ""
+        self._consumed = 0  # characters already dropped from the front of the buffer
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key: str | None = None
+        self._token_start: int | None = None  # start of the current top-level key or value
+        self._expect = "key"  # what comes next at depth 1: "key", "value" or "separator"
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        """
+        Add a chunk of the JSON text; return the (key, value) pairs completed by it.
+        """
+        completed: list[tuple[str, Any]] = []
+        if self.done:
+            return completed
+        self._compact()
+        self._buffer += chunk
+        buffer = self._buffer
+        pos = self._pos
+        while pos < len(buffer):
+            if self._in_string:
+                # Jump straight to the next quote or backslash instead of walking the string
+                if self._escaped:
+                    self._escaped = False
+                    pos += 1
+                    continue
+                match = _STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                pos = match.start()
+                if buffer[pos] == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._end_string(pos, completed)
+                pos += 1
+                continue
+
+            char = buffer[pos]
+            if self._depth == 0:
+                # Skip anything before the object (e.g. a ```json fence)
+                if char == "{":
+                    self._depth = 1
+                pos += 1
+                continue
+
+            if self._depth == 1 and self._expect == "value" and self._token_start is None and char not in _WHITESPACE:
+                self._token_start = pos
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._token_start = pos
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 1:
+                    # A nested object/array value just closed
+                    self._complete_value(pos + 1, completed)
+                elif self._depth == 0:
+                    self._complete_scalar(pos, completed)
+                    self.done = True
+                    self._pos = pos + 1
+                    return completed
+            elif self._depth == 1:
+                if char == ":":
+                    self._expect = "value"
+                elif char == ",":
+                    self._complete_scalar(pos, completed)
+                    self._expect = "key"
+                elif char in _WHITESPACE and self._expect == "value" and self._token_start is not None:
+                    self._complete_scalar(pos, completed)
+            pos += 1
+        self._pos = pos
+        return completed
+
+    def _compact(self) -> None:
+        # Drop text that is already scanned and not part of an unfinished key or value,
+        # so the buffer only ever holds the current token
+        keep_from = self._pos if self._token_start is None else self._token_start
+        if keep_from:
+            self._consumed += keep_from
+            self._buffer = self._buffer[keep_from:]
+            self._pos -= keep_from
+            if self._token_start is not None:
+                self._token_start -= keep_from
+
+    def _end_string(self, pos: int, completed: list[tuple[str, Any]]) -> None:
+        if self._expect == "key":
+            self._key = json.loads(self._buffer[self._token_start:pos + 1])
+            self._token_start = None
+        else:
+            self._complete_value(pos + 1, completed)
+
+    def _complete_scalar(self, end: int, completed: list[tuple[str, Any]]) -> None:
+        # Numbers, true/false/null end at the next separator rather than a closing char
+        if self._expect == "value" and self._token_start is not None:
+            self._complete_value(end, completed)
+
+    def _complete_value(self, end: int, completed: list[tuple[str, Any]]) -> None:
+        raw = self._buffer[self._token_start:end]
+        self._token_start = None
+        self._expect = "separator"
+        if self._key is None:
+            return
+        value = json.loads(raw)
+        self.fields[self._key] = value
+        completed.append((self._key, value))
+        self._key = None
+
+    @property
+    def consumed(self) -> int:
+        """
+        Number of characters scanned so far.
+        """
+        return self._consumed + self._pos
+
+
+@lru_cache(maxsize=None)
+def _field_adapters(model: type[BaseModel]) -> dict[str, tuple[str, TypeAdapter]]:
+    # JSON key (alias or name) -> (field name, adapter for that field's type)
+    adapters = {}
+    for name, info in model.model_fields.items():
+        adapter = TypeAdapter(info.annotation)
+        adapters[info.alias or name] = (name, adapter)
+        adapters.setdefault(name, (name, adapter))
+    return adapters
+
+
+def partial_model(model: type[T], fields: dict[str, Any]) -> T:
+    """
+    Build a partial instance of `model` from the fields completed so far, validating
+    each field on its own. Fields that fail validation keep their raw JSON value.
+    """
+    adapters = _field_adapters(model)
+    values = {}
+    for key, raw in fields.items():
+        if key not in adapters:
+            continue
+        name, adapter = adapters[key]
+        try:
+            values[name] = adapter.validate_python(raw)
+        except ValidationError:
+            values[name] = raw
+    return model.model_construct(**values)
+
+
+async def stream_structured(updates: AsyncIterable[Any], model: type[T]) -> AsyncIterator[T]:
+    """
+    Consume a run_stream update stream and yield a partial `model` snapshot every time a
+    top-level field completes, then the fully validated model at the end.
+    """
+    parser = IncrementalJSONObjectParser()
+    async for update in updates:
+        text = getattr(update, "text", None)
+        if not text or parser.done:
+            continue
+        if parser.feed(text):
+            yield partial_model(model, parser.fields)
+    if parser.done:
+        yield model.model_validate(parser.fields)
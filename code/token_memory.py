@@ -0,0 +1,317 @@
+
+# =========================================
+# Token-budgeted Conversation Memory
+# =========================================
+# A thread's default ChatMessageStore keeps every message, so each turn of a long session
+# (the HIL flow, chained workflow messages) sends a bigger prompt than the last and
+# token cost and latency grow linearly.
+#
+# TokenBudgetMessageStore is a drop-in message store for agents built with create_agent:
+#   - every message is token-counted once, when it is added (cached tokenizer: tiktoken
+#     when installed, otherwise a ~4 characters per token estimate),
+#   - the most recent `keep_turns` turns are always sent verbatim (sliding window),
+#   - when the history exceeds `max_tokens`, the oldest whole turns are folded into a
+#     running summary -- a turn (user message plus the assistant, tool-call and
+#     tool-result messages that follow it) is never split, so call/result pairs stay intact,
+#   - every list_messages() call records a MemoryReport with the tokens saved.
+#
+# Usage:
+#   agent = get_chat_client().create_agent(
+#       ..., chat_message_store_factory=token_budget_store_factory(max_tokens=2000))
+#   thread = agent.get_new_thread()
+#   ...
+#   print(thread.message_store.last_report)
+#
+# The summary travels with the thread (serialize / deserialize_thread) as a marked
+# system message, so resumed threads keep it.
+# =========================================
+
+import json
+import logging
+from functools import lru_cache, partial
+from collections.abc import Awaitable, Callable, MutableMapping, Sequence
+from dataclasses import dataclass
+from textwrap import shorten
+from typing import Any
+
+from agent_framework import (
+    ChatMessage,
+    FunctionApprovalRequestContent,
+    FunctionApprovalResponseContent,
+    FunctionCallContent,
+    FunctionResultContent,
+    Role,
+    TextContent,
+)
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character-based estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Per-message framing tokens added by the chat completions format
+MESSAGE_OVERHEAD_TOKENS = 4
+# Marks the summary message inside serialized thread state
+SUMMARY_MARKER = "token_memory_summary"
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+Summarizer = Callable[[str | None, list[ChatMessage]], Awaitable[str]]
+
+
+class TokenCounter:
+    """
+    Counts tokens with tiktoken when available (else ~4 characters per token), caching
+    the count of every distinct text it has seen.
+    """
+
+    def __init__(self, encoding: str = "o200k_base", cache_size: int = 8192):
+        self.encoding = tiktoken.get_encoding(encoding) if tiktoken else None
+        self.count_text = lru_cache(maxsize=cache_size)(self._count_text)
+
+    def _count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+    def count_message(self, message: ChatMessage) -> int:
+        return MESSAGE_OVERHEAD_TOKENS + sum(self.count_text(_content_text(content)) for content in message.contents)
+
+
+@lru_cache(maxsize=None)
+def default_token_counter(encoding: str = "o200k_base") -> TokenCounter:
+    """
+    Process-wide TokenCounter, so the tokenizer is loaded once.
+    """
+    return TokenCounter(encoding)
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, TextContent):
+        return content.text or ""
+    if isinstance(content, FunctionCallContent):
+        arguments = content.arguments if isinstance(content.arguments, str) else json.dumps(content.arguments or {})
+        return f"{content.name}{arguments}"
+    if isinstance(content, FunctionResultContent):
+        return content.result if isinstance(content.result, str) else json.dumps(content.result, default=str)
+    if isinstance(content, (FunctionApprovalRequestContent, FunctionApprovalResponseContent)):
+        return _content_text(content.function_call)
+    return ""
+
+
+def _starts_turn(message: ChatMessage) -> bool:
+    # A new user prompt starts a turn; approval responses and tool results do not
+    return message.role == Role.USER and not any(
+        isinstance(content, (FunctionResultContent, FunctionApprovalResponseContent)) for content in message.contents
+    )
+
+
+async def extractive_summary(previous: str | None, messages: list[ChatMessage], *, max_chars: int = 2000) -> str:
+    """
+    Summarizer that needs no model call: one shortened line per user prompt, answer and
+    tool call, appended to the previous summary (oldest lines dropped past `max_chars`).
+    """
+    lines = previous.splitlines() if previous else []
+    for message in messages:
+        for content in message.contents:
+            if isinstance(content, TextContent) and content.text and content.text.strip():
+                speaker = "User" if message.role == Role.USER else "Assistant"
+                lines.append(f"{speaker}: {shorten(content.text, 200, placeholder=' ...')}")
+            elif isinstance(content, FunctionResultContent):
+                lines.append(f"Tool result: {shorten(_content_text(content), 200, placeholder=' ...')}")
+            elif isinstance(content, FunctionCallContent):
+                lines.append(f"Called {shorten(_content_text(content), 200, placeholder=' ...')}")
+    while lines and sum(len(line) + 1 for line in lines) > max_chars:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+def chat_client_summarizer(chat_client: Any, *, max_words: int = 150) -> Summarizer:
+    """
+    Summarizer that asks a chat client to fold the old turns into the running summary.
+    """
+
+    async def summarize(previous: str | None, messages: list[ChatMessage]) -> str:
+        transcript = await extractive_summary(None, messages, max_chars=16000)
+        prompt = (
+            f"Update the running summary of a conversation in at most {max_words} words. "
+            "Keep names, places, decisions and tool results that later turns may need.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew turns:\n{transcript}"
+        )
+        response = await chat_client.get_response([ChatMessage(role=Role.USER, text=prompt)])
+        return response.text.strip()
+
+    return summarize
+
+
+@dataclass
+class MemoryReport:
+    """
+    Token accounting for one list_messages() call (one agent turn).
+    """
+    full_history_tokens: int
+    sent_tokens: int
+    summarized_turns: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.full_history_tokens - self.sent_tokens
+
+
+class TokenBudgetMessageStore:
+    """
+    Chat message store that keeps the history under a token budget with a sliding
+    window of recent turns and a running summary of older ones.
+    """
+
+    def __init__(
+        self,
+        messages: Sequence[ChatMessage] | None = None,
+        *,
+        max_tokens: int = 4000,
+        keep_turns: int = 2,
+        summary_max_tokens: int | None = None,
+        summarizer: Summarizer | None = None,
+        counter: TokenCounter | None = None,
+    ):
+        if keep_turns < 0:
+            raise ValueError("keep_turns must be 0 or more.")
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        # By default the running summary may use up to a quarter of the budget
+        self.summary_max_tokens = summary_max_tokens or max_tokens // 4
+        self.summarizer = summarizer or partial(extractive_summary, max_chars=self.summary_max_tokens * 4)
+        self.counter = counter or default_token_counter()
+        self.summary: str | None = None
+        self.summarized_turns = 0
+        self.reports: list[MemoryReport] = []
+        self._messages: list[ChatMessage] = []
+        self._tokens: list[int] = []
+        self._summary_tokens = 0
+        # Tokens of the messages folded into the summary, to report what the full history would cost
+        self._summarized_tokens = 0
+        if messages:
+            self._append(messages)
+
+    def _append(self, messages: Sequence[ChatMessage]) -> None:
+        for message in messages:
+            properties = message.additional_properties or {}
+            if properties.get(SUMMARY_MARKER):
+                # Summary restored from serialized thread state: the raw summary, not the
+                # message text, which already carries the prefix
+                summary = properties.get("summary")
+                if summary is None:
+                    summary = message.text.removeprefix(SUMMARY_PREFIX)
+                self._set_summary(summary)
+                self.summarized_turns = properties.get("summarized_turns", 0)
+                self._summarized_tokens = properties.get("summarized_tokens", 0)
+                continue
+            self._messages.append(message)
+            self._tokens.append(self.counter.count_message(message))
+
+    def _set_summary(self, summary: str | None) -> None:
+        self.summary = summary or None
+        self._summary_tokens = self.counter.count_message(self._summary_message()) if self.summary else 0
+
+    def _summary_message(self, **properties: Any) -> ChatMessage:
+        return ChatMessage(
+            role=Role.SYSTEM,
+            text=f"{SUMMARY_PREFIX}{self.summary}",
+            additional_properties={SUMMARY_MARKER: True, **properties},
+        )
+
+    @property
+    def sent_tokens(self) -> int:
+        return self._summary_tokens + sum(self._tokens)
+
+    @property
+    def full_history_tokens(self) -> int:
+        return self._summarized_tokens + sum(self._tokens)
+
+    async def add_messages(self, messages: Sequence[ChatMessage], **kwargs: Any) -> None:
+        self._append(messages)
+        if self.sent_tokens > self.max_tokens:
+            await self._compact()
+
+    async def _compact(self) -> None:
+        starts = [index for index, message in enumerate(self._messages) if _starts_turn(message)]
+        if self.keep_turns:
+            # The last `keep_turns` turns are never summarized
+            protected_from = starts[-self.keep_turns] if len(starts) >= self.keep_turns else 0
+            boundaries = starts
+        else:
+            # No sliding window: every complete turn may be summarized
+            protected_from = len(self._messages)
+            boundaries = [*starts, len(self._messages)]
+        cut = 0
+        remaining = self.sent_tokens
+        for start in boundaries:
+            if start == 0 or start > protected_from:
+                continue
+            remaining -= sum(self._tokens[cut:start])
+            cut = start
+            if remaining <= self.max_tokens:
+                break
+        if cut == 0:
+            return
+
+        old = self._messages[:cut]
+        turns = sum(1 for message in old if _starts_turn(message))
+        summary = await self.summarizer(self.summary, old)
+        self._summarized_tokens += sum(self._tokens[:cut])
+        del self._messages[:cut]
+        del self._tokens[:cut]
+        self._set_summary(summary)
+        self.summarized_turns += turns
+        logger.debug("Summarized %d turns; history is now %d tokens.", turns, self.sent_tokens)
+
+    async def list_messages(self) -> list[ChatMessage]:
+        self.reports.append(MemoryReport(
+            full_history_tokens=self.full_history_tokens,
+            sent_tokens=self.sent_tokens,
+            summarized_turns=self.summarized_turns,
+        ))
+        if self.summary:
+            return [self._summary_message(), *self._messages]
+        return list(self._messages)
+
+    @property
+    def last_report(self) -> MemoryReport | None:
+        return self.reports[-1] if self.reports else None
+
+    async def serialize(self, **kwargs: Any) -> dict[str, Any]:
+        messages = list(self._messages)
+        if self.summary:
+            summary = self._summary_message(
+                summary=self.summary,
+                summarized_turns=self.summarized_turns,
+                summarized_tokens=self._summarized_tokens,
+            )
+            messages.insert(0, summary)
+        return {"messages": [message.to_dict() for message in messages]}
+
+    async def update_from_state(self, serialized_store_state: MutableMapping[str, Any], **kwargs: Any) -> None:
+        if not serialized_store_state:
+            return
+        self._messages.clear()
+        self._tokens.clear()
+        self._summarized_tokens = 0
+        self.summarized_turns = 0
+        self._set_summary(None)
+        self._append([ChatMessage.from_dict(message) for message in serialized_store_state.get("messages", [])])
+
+    @classmethod
+    async def deserialize(cls, serialized_store_state: MutableMapping[str, Any], **kwargs: Any) -> "TokenBudgetMessageStore":
+        store = cls(**kwargs)
+        await store.update_from_state(serialized_store_state)
+        return store
+
+
+def token_budget_store_factory(**options: Any) -> Callable[[], TokenBudgetMessageStore]:
+    """
+    Factory for create_agent(chat_message_store_factory=...): one store per thread.
+    """
+    return lambda: TokenBudgetMessageStore(**options)
@@ -0,0 +1,213 @@
+
+# =========================================
+# TTL/LRU Cache with Single-flight for Tool Functions
+# =========================================
+# Tools such as get_weather run once per model tool call; behind a real API the same
+# location would be fetched many times a minute under load. `cached_tool` wraps a tool
+# function with:
+#   - a TTL and a size-bounded LRU eviction policy,
+#   - normalized argument keys (" Chennai" and "chennai" share one entry),
+#   - single-flight coalescing (N concurrent calls for one key -> one backend call; the
+#     fetch is its own task, so a cancelled caller does not fail the others),
+#   - sync tools run on a thread pool, never on the event loop,
+#   - hit/miss/coalesced counters for sizing the cache.
+#
+# It composes with @ai_function; apply the cache first so the framework still sees the
+# original signature:
+#
+#   @ai_function(approval_mode="never_require")
+#   @cached_tool(ttl=300, maxsize=1024)
+#   def get_weather(location: Annotated[str, Field(description="...")]) -> str: ...
+# =========================================
+
+import json
+import time
+import asyncio
+import inspect
+import functools
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Hashable
+
+
+@dataclass
+class CacheStats:
+    """
+    Counters for a cached tool.
+    """
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "hit_ratio": round(self.hit_ratio, 4)}
+
+
+def normalize_argument(value: Any) -> Any:
+    """
+    Normalize a tool argument for cache keys: strings are trimmed, whitespace-collapsed
+    and case-folded so "Chennai", " chennai" and "CHENNAI " share one entry.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    return value
+
+
+def _hashable(value: Any) -> Hashable:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        # Lists/dicts from JSON arguments: use a canonical JSON string instead
+        return json.dumps(value, sort_keys=True, default=repr)
+
+
+class ToolCache:
+    """
+    TTL + LRU cache with single-flight de-duplication in front of one tool function.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        *,
+        ttl: float = 300.0,
+        maxsize: int = 1024,
+        normalizer: Callable[[Any], Any] = normalize_argument,
+        executor: Executor | None = None,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.func = func
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.normalizer = normalizer
+        # Thread pool for sync tools (None: the event loop's default executor)
+        self.executor = executor
+        self.stats = CacheStats()
+        self._signature = inspect.signature(func)
+        self._is_async = inspect.iscoroutinefunction(inspect.unwrap(func)) or inspect.iscoroutinefunction(func)
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def make_key(self, *args: Any, **kwargs: Any) -> Hashable:
+        """
+        Build the normalized cache key for a call, with defaults applied.
+        """
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        return tuple((name, _hashable(self.normalizer(value))) for name, value in bound.arguments.items())
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def call(self, *args: Any, **kwargs: Any) -> Any:
+        """
+        Return the cached result for these arguments, calling the tool at most once per key
+        no matter how many callers ask for it concurrently.
+        """
+        key = self.make_key(*args, **kwargs)
+        found, value = self._lookup(key)
+        if found:
+            self.stats.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats.misses += 1
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, args, kwargs))
+            task.add_done_callback(_retrieve_exception)
+        else:
+            # Someone is already fetching this key; wait for their result
+            self.stats.coalesced += 1
+        # Shielded: a cancelled caller stops waiting, but the fetch goes on for the others
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: Hashable, args: tuple, kwargs: dict[str, Any]) -> Any:
+        try:
+            if self._is_async:
+                result = await self.func(*args, **kwargs)
+            else:
+                # Keep context variables (e.g. tracing) visible inside the thread
+                context = contextvars.copy_context()
+                call = functools.partial(context.run, self.func, *args, **kwargs)
+                result = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+                if inspect.isawaitable(result):
+                    result = await result
+            # Errors are shared with coalesced waiters but never cached
+            self._store(key, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drop every cached entry (counters are kept).
+        """
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Mark the error as retrieved when every caller had stopped waiting
+    if not task.cancelled():
+        task.exception()
+
+
+def cached_tool(
+    func: Callable[..., Any] | None = None,
+    *,
+    ttl: float = 300.0,
+    maxsize: int = 1024,
+    normalizer: Callable[[Any], Any] = normalize_argument,
+    executor: Executor | None = None,
+):
+    """
+    Decorate a tool function with a TTL/LRU cache and single-flight coalescing.
+
+    The wrapped function is async and keeps the original signature (via functools.wraps),
+    so it can be passed straight to `tools=` or decorated with @ai_function. The cache is
+    reachable as `wrapper.cache` and its counters as `wrapper.cache_stats`. A sync `func`
+    runs on `executor` (ToolExecutor.wrap() supplies its own thread pool when unset).
+    """
+
+    def decorator(f: Callable[..., Any]):
+        cache = ToolCache(f, ttl=ttl, maxsize=maxsize, normalizer=normalizer, executor=executor)
+
+        @functools.wraps(f)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await cache.call(*args, **kwargs)
+
+        wrapper.cache = cache
+        wrapper.cache_stats = cache.stats
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator(func) if func else decorator
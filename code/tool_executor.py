@@ -0,0 +1,291 @@
+
+# =========================================
+# Thread/Process-offloaded Tool Execution
+# =========================================
+# The framework already runs the FunctionCallContent items of one model turn with
+# asyncio.gather, but a plain synchronous tool such as get_weather runs on the event
+# loop itself: five parallel calls run one after the other, and every other in-flight
+# agent stalls while they do.
+#
+# ToolExecutor wraps an agent's tools so that:
+#   - sync tools run on a bounded thread pool (or a process pool for CPU-bound tools),
+#     so parallel calls from one turn really overlap,
+#   - each tool has its own concurrency limit and timeout,
+#   - every call's latency is recorded by tool_call_id; tool_latency_middleware() adds it
+#     to the streamed FunctionResultContent as additional_properties["latency_ms"].
+#
+# Usage:
+#   tools = ToolExecutor(max_threads=16)
+#   agent = get_chat_client().create_agent(
+#       ..., tools=tools.wrap([get_weather]), middleware=[tools.latency_middleware()])
+#
+# Process-pool tools must be module-level functions (they are looked up by name in the
+# worker process). A timed-out thread cannot be interrupted; its result is discarded, and
+# it keeps its slot of the tool's concurrency limit until it finishes.
+# =========================================
+
+import time
+import asyncio
+import inspect
+import importlib
+import contextvars
+from collections import OrderedDict
+from collections.abc import AsyncIterable, Awaitable, Callable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from functools import partial
+from typing import Any
+
+from agent_framework import (
+    AgentMiddleware,
+    AgentRunContext,
+    AgentRunResponseUpdate,
+    AIFunction,
+    FunctionResultContent,
+    ai_function,
+)
+from tool_cache import ToolCache
+
+
+class ToolTimeoutError(TimeoutError):
+    """
+    A tool call did not finish within its timeout.
+    """
+
+
+@dataclass
+class ToolStats:
+    """
+    Per-tool call counters and latency totals (milliseconds).
+    """
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "total_ms": round(self.total_ms, 2), "max_ms": round(self.max_ms, 2), "mean_ms": round(self.mean_ms, 2)}
+
+
+def _call_by_reference(module: str, qualname: str, kwargs: dict[str, Any]) -> Any:
+    # Runs in the worker process: look the function up by name and call the original
+    # (undecorated) function, since decorated wrappers are not picklable
+    target: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    if isinstance(target, AIFunction):
+        target = target.func
+    return inspect.unwrap(target)(**kwargs)
+
+
+class OffloadedFunction(AIFunction):
+    """
+    AIFunction that runs its (sync) function on an executor under a concurrency limit and
+    timeout, and reports each call's latency to its ToolExecutor.
+    """
+
+    def __init__(self, tool: AIFunction, owner: "ToolExecutor", *, process: bool, max_concurrency: int, timeout: float | None):
+        self.original = tool
+        self.owner = owner
+        self.process = process
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._is_async = inspect.iscoroutinefunction(inspect.unwrap(tool.func)) or inspect.iscoroutinefunction(tool.func)
+        if process:
+            if self._is_async:
+                raise ValueError(f"Tool {tool.name!r} is async; only sync tools can run in a process pool.")
+            if "<" in tool.func.__qualname__:
+                raise ValueError(f"Tool {tool.name!r} must be a module-level function to run in a process pool.")
+        super().__init__(
+            name=tool.name,
+            description=tool.description,
+            approval_mode=tool.approval_mode,
+            max_invocations=tool.max_invocations,
+            max_invocation_exceptions=tool.max_invocation_exceptions,
+            additional_properties=tool.additional_properties,
+            input_model=tool.input_model,
+            func=self._run,
+        )
+
+    async def _run(self, **kwargs: Any) -> Any:
+        await self._semaphore.acquire()
+        if self._is_async:
+            # wait_for cancels a timed-out coroutine, so the slot is free once it returns
+            try:
+                return await self._wait(self.original.func(**kwargs))
+            finally:
+                self._semaphore.release()
+        try:
+            loop = asyncio.get_running_loop()
+            if self.process:
+                func = self.original.func
+                job = partial(_call_by_reference, func.__module__, func.__qualname__, kwargs)
+                call = loop.run_in_executor(self.owner.process_pool, job)
+            else:
+                # Keep context variables (e.g. tracing) visible inside the thread
+                context = contextvars.copy_context()
+                call = loop.run_in_executor(self.owner.thread_pool, partial(context.run, self.original.func, **kwargs))
+        except BaseException:
+            self._semaphore.release()
+            raise
+        # A timed-out job keeps running in its thread or process: it holds its slot until it
+        # really finishes, so stuck calls cannot push the tool past its limit
+        call.add_done_callback(self._job_done)
+        return await self._wait(asyncio.shield(call))
+
+    async def _wait(self, call: Awaitable[Any]) -> Any:
+        try:
+            return await asyncio.wait_for(call, self.timeout)
+        except TimeoutError as exc:
+            self.owner.stats_for(self.name).timeouts += 1
+            raise ToolTimeoutError(f"Tool {self.name!r} timed out after {self.timeout}s.") from exc
+
+    def _job_done(self, future: asyncio.Future) -> None:
+        self._semaphore.release()
+        if not future.cancelled():
+            # Mark the error of a job nobody waits for anymore as retrieved
+            future.exception()
+
+    async def invoke(self, *, arguments: Any = None, **kwargs: Any) -> Any:
+        tool_call_id = kwargs.get("tool_call_id")
+        start = time.perf_counter()
+        failed = False
+        try:
+            return await super().invoke(arguments=arguments, **kwargs)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.owner.record(self.name, tool_call_id, (time.perf_counter() - start) * 1000, failed)
+
+
+class ToolExecutor:
+    """
+    Shared thread/process pools and per-tool limits for an agent's tools.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_threads: int = 16,
+        max_processes: int | None = None,
+        default_concurrency: int = 8,
+        default_timeout: float | None = 30.0,
+        max_tracked_calls: int = 4096,
+    ):
+        self.max_threads = max_threads
+        self.max_processes = max_processes
+        self.default_concurrency = default_concurrency
+        self.default_timeout = default_timeout
+        self.max_tracked_calls = max_tracked_calls
+        self.stats: dict[str, ToolStats] = {}
+        self.latencies: OrderedDict[str, float] = OrderedDict()
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+
+    @property
+    def thread_pool(self) -> Executor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.max_threads, thread_name_prefix="agent-tool")
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> Executor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_processes)
+        return self._process_pool
+
+    def wrap(
+        self,
+        tools: Callable[..., Any] | AIFunction | Sequence[Callable[..., Any] | AIFunction],
+        *,
+        processes: Sequence[str] = (),
+        concurrency: dict[str, int] | None = None,
+        timeouts: dict[str, float | None] | None = None,
+    ) -> list[Any]:
+        """
+        Return the tools with every Python function tool offloaded. Tools named in
+        `processes` run in the process pool; `concurrency` and `timeouts` override the
+        defaults per tool name. Other tool types (MCP, hosted) are returned unchanged.
+        """
+        tools = tools if isinstance(tools, Sequence) else [tools]
+        wrapped = []
+        for tool in tools:
+            if isinstance(tool, OffloadedFunction):
+                wrapped.append(tool)
+                continue
+            if not isinstance(tool, AIFunction):
+                if not callable(tool) or not inspect.isroutine(inspect.unwrap(tool)):
+                    wrapped.append(tool)
+                    continue
+                tool = ai_function(tool)
+            cache = getattr(tool.func, "cache", None)
+            if isinstance(cache, ToolCache) and cache.executor is None:
+                # A cached sync tool is async on the outside: run its misses on this pool
+                cache.executor = self.thread_pool
+            wrapped.append(OffloadedFunction(
+                tool,
+                self,
+                process=tool.name in processes,
+                max_concurrency=(concurrency or {}).get(tool.name, self.default_concurrency),
+                timeout=(timeouts or {}).get(tool.name, self.default_timeout),
+            ))
+        return wrapped
+
+    def stats_for(self, name: str) -> ToolStats:
+        return self.stats.setdefault(name, ToolStats())
+
+    def record(self, name: str, tool_call_id: str | None, elapsed_ms: float, failed: bool) -> None:
+        stats = self.stats_for(name)
+        stats.calls += 1
+        stats.failures += int(failed)
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        if tool_call_id:
+            self.latencies[tool_call_id] = elapsed_ms
+            while len(self.latencies) > self.max_tracked_calls:
+                self.latencies.popitem(last=False)
+
+    def latency_middleware(self) -> "ToolLatencyMiddleware":
+        return ToolLatencyMiddleware(self)
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in (self._thread_pool, self._process_pool):
+            if pool is not None:
+                pool.shutdown(wait=wait)
+        self._thread_pool = self._process_pool = None
+
+
+class ToolLatencyMiddleware(AgentMiddleware):
+    """
+    Agent middleware that adds `latency_ms` to the additional_properties of every
+    FunctionResultContent produced by tools of a ToolExecutor.
+    """
+
+    def __init__(self, executor: ToolExecutor):
+        self.executor = executor
+
+    def _annotate(self, contents: Sequence[Any]) -> None:
+        for content in contents:
+            if isinstance(content, FunctionResultContent) and content.call_id in self.executor.latencies:
+                if content.additional_properties is None:
+                    content.additional_properties = {}
+                content.additional_properties["latency_ms"] = round(self.executor.latencies[content.call_id], 2)
+
+    async def process(self, context: AgentRunContext, next: Callable[[AgentRunContext], Awaitable[None]]) -> None:
+        await next(context)
+        if context.is_streaming:
+            context.result = self._annotate_stream(context.result)
+        elif context.result is not None:
+            for message in context.result.messages:
+                self._annotate(message.contents)
+
+    async def _annotate_stream(self, stream: AsyncIterable[AgentRunResponseUpdate]) -> AsyncIterable[AgentRunResponseUpdate]:
+        async for update in stream:
+            self._annotate(update.contents)
+            yield update
@@ -0,0 +1,246 @@
+
+# =========================================
+# Durable Per-executor Workflow Checkpoints
+# =========================================
+# If agent_workflow.py fails at Indian-Tourist-Agent, running it again calls
+# Indian-Weather-Agent from scratch: a second paid model call for an output we already had.
+#
+# ExecutorCheckpointStore keeps every agent executor's output in SQLite, keyed by the
+# workflow run id, the executor id and a fingerprint of the executor's input messages.
+# Writes are incremental -- one row per executor, committed as soon as that executor
+# sends its response -- instead of a snapshot of the whole workflow state per superstep
+# (which is what the framework's own checkpointing stores).
+#
+# A CheckpointMixin executor run under checkpoint_run(run_id) first looks for its record:
+#   - found: the stored response is replayed (ExecutorReplayedEvent, then the usual
+#     AgentRunUpdateEvent / AgentRunEvent and output) and sent downstream, no model call,
+#   - not found: the agent runs as usual and its response is recorded.
+# Running the same workflow again with the same run id therefore skips every executor that
+# already completed. A changed input gives a different fingerprint, so it is never replayed.
+#
+# Usage:
+#   store = ExecutorCheckpointStore("workflow_checkpoints.sqlite3")
+#   weather = CheckpointedAgentExecutor(weather_agent, checkpoints=store)
+#   ...
+#   with checkpoint_run("run-42"):
+#       async for event in workflow.run_stream("I am currently at Marina Beach"):
+#           ...
+# =========================================
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from agent_framework import (
+    AgentExecutor,
+    AgentExecutorResponse,
+    AgentRunEvent,
+    AgentRunResponse,
+    AgentRunResponseUpdate,
+    AgentRunUpdateEvent,
+    ChatAgent,
+    ChatMessage,
+    ExecutorEvent,
+    WorkflowContext,
+)
+from pipelined_edges import PipelinedAgentExecutor
+from response_cache import _VOLATILE_MESSAGE_FIELDS
+
+# Workflow run id of the current checkpoint_run() block (inherited by the executor tasks)
+_current_run_id: ContextVar[str | None] = ContextVar("workflow_checkpoint_run_id", default=None)
+
+
+@contextmanager
+def checkpoint_run(run_id: str) -> Iterator[str]:
+    """
+    Run the workflows started inside this block under `run_id`, so checkpointing
+    executors record and replay their outputs for it.
+    """
+    token = _current_run_id.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _current_run_id.reset(token)
+
+
+def current_run_id() -> str | None:
+    return _current_run_id.get()
+
+
+def input_fingerprint(messages: Sequence[ChatMessage]) -> str:
+    """
+    Stable hash of an executor's input messages (ids and other volatile fields ignored).
+    """
+    payload = [
+        {k: v for k, v in message.to_dict().items() if k not in _VOLATILE_MESSAGE_FIELDS}
+        for message in messages
+    ]
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ExecutorCheckpointStore:
+    """
+    SQLite store of executor outputs, one row per (run id, executor id, input fingerprint).
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        if path != ":memory:":
+            # Each record is its own small transaction; WAL keeps those commits cheap
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS executor_outputs ("
+            " run_id TEXT NOT NULL, executor_id TEXT NOT NULL, fingerprint TEXT NOT NULL,"
+            " payload TEXT NOT NULL, created_at REAL NOT NULL,"
+            " PRIMARY KEY (run_id, executor_id, fingerprint))"
+        )
+        self._db.commit()
+
+    def save(self, run_id: str, executor_id: str, fingerprint: str, payload: dict) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO executor_outputs (run_id, executor_id, fingerprint, payload, created_at)"
+            " VALUES (?, ?, ?, ?, ?)",
+            (run_id, executor_id, fingerprint, json.dumps(payload), time.time()),
+        )
+        self._db.commit()
+
+    def load(self, run_id: str, executor_id: str, fingerprint: str) -> dict | None:
+        row = self._db.execute(
+            "SELECT payload FROM executor_outputs WHERE run_id = ? AND executor_id = ? AND fingerprint = ?",
+            (run_id, executor_id, fingerprint),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def completed(self, run_id: str) -> list[str]:
+        """
+        Ids of the executors with a recorded output for `run_id`, in completion order.
+        """
+        rows = self._db.execute(
+            "SELECT executor_id FROM executor_outputs WHERE run_id = ? ORDER BY created_at", (run_id,)
+        )
+        return [row[0] for row in rows]
+
+    def delete_run(self, run_id: str) -> None:
+        self._db.execute("DELETE FROM executor_outputs WHERE run_id = ?", (run_id,))
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class ExecutorReplayedEvent(ExecutorEvent):
+    """
+    Workflow event emitted when an executor's output is replayed from a checkpoint
+    instead of running its agent.
+    """
+
+    def __init__(self, executor_id: str, run_id: str):
+        super().__init__(executor_id, {"run_id": run_id})
+        self.run_id = run_id
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(executor_id={self.executor_id}, run_id={self.run_id})"
+
+
+class _RecordingContext:
+    """
+    WorkflowContext wrapper that reports the AgentExecutorResponse an executor sends.
+    """
+
+    def __init__(self, ctx: WorkflowContext, on_response: Callable[[AgentExecutorResponse], None]):
+        self._ctx = ctx
+        self._on_response = on_response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._ctx, name)
+
+    async def send_message(self, message: Any, *args: Any, **kwargs: Any) -> None:
+        if isinstance(message, AgentExecutorResponse):
+            self._on_response(message)
+        await self._ctx.send_message(message, *args, **kwargs)
+
+
+class CheckpointMixin:
+    """
+    Mixin for AgentExecutor subclasses: record each completed agent run in an
+    ExecutorCheckpointStore and replay it when the same run id is resumed.
+    """
+
+    def __init__(self, *args: Any, checkpoints: ExecutorCheckpointStore | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkpoints = checkpoints
+
+    async def _run_agent_and_emit(self, ctx: WorkflowContext) -> None:
+        run_id = current_run_id()
+        if self.checkpoints is None or run_id is None:
+            await super()._run_agent_and_emit(ctx)
+            return
+
+        fingerprint = input_fingerprint(self._cache)
+        record = self.checkpoints.load(run_id, self.id, fingerprint)
+        if record is not None:
+            await self._replay(ctx, run_id, record)
+            return
+
+        def save(message: AgentExecutorResponse) -> None:
+            self.checkpoints.save(run_id, self.id, fingerprint, {
+                "response": message.agent_run_response.to_dict(),
+                "full_conversation": [item.to_dict() for item in message.full_conversation or []],
+            })
+
+        await super()._run_agent_and_emit(_RecordingContext(ctx, save))
+
+    async def _replay(self, ctx: WorkflowContext, run_id: str, record: dict) -> None:
+        if isinstance(self, PipelinedAgentExecutor):
+            # An upstream may already have started this agent early; its output is known
+            self.discard_early_run()
+        response = AgentRunResponse.from_dict(record["response"])
+        if isinstance(self._agent, ChatAgent) and self._agent.chat_options.response_format is not None:
+            response.try_parse_value(self._agent.chat_options.response_format)
+        full_conversation = [ChatMessage.from_dict(item) for item in record["full_conversation"]]
+
+        await ctx.add_event(ExecutorReplayedEvent(self.id, run_id))
+        if ctx.is_streaming():
+            for message in response.messages:
+                update = AgentRunResponseUpdate(
+                    contents=message.contents, role=message.role, author_name=message.author_name
+                )
+                await ctx.add_event(AgentRunUpdateEvent(self.id, update))
+        else:
+            await ctx.add_event(AgentRunEvent(self.id, response))
+
+        # Keep the agent's thread as it would be after a real run
+        await self._agent_thread.on_new_messages([*self._cache, *response.messages])
+        if self._output_response:
+            await ctx.yield_output(response)
+        await ctx.send_message(AgentExecutorResponse(self.id, response, full_conversation=full_conversation))
+        self._cache.clear()
+
+
+class CheckpointedAgentExecutor(CheckpointMixin, AgentExecutor):
+    """
+    AgentExecutor whose completed runs are recorded and replayed per workflow run id.
+    """
+
+
+class CheckpointedPipelinedAgentExecutor(CheckpointMixin, PipelinedAgentExecutor):
+    """
+    PipelinedAgentExecutor whose completed runs are recorded and replayed per workflow run id.
+    """
+
+
+def checkpoint_store_from_env() -> ExecutorCheckpointStore | None:
+    """
+    Return a store on the file named by the agent_workflow_checkpoints environment
+    variable, or None when it is not set (checkpointing is opt-in).
+    """
+    path = os.getenv("agent_workflow_checkpoints")
+    return ExecutorCheckpointStore(path) if path else None
@@ -0,0 +1,125 @@
+
+# =========================================
+# Concurrent Fan-out / Fan-in Workflow Helpers
+# =========================================
+# The chained workflow in agent_workflow.py runs its agents one after the other, so the
+# wall-clock time is the sum of every model call. When branches are independent they can
+# run concurrently on the same input: a broadcaster fans the prompt out to every branch,
+# the workflow runner executes the branches in the same superstep, and a fan-in
+# aggregator merges their structured outputs once all of them have finished.
+#
+# End-to-end latency is then close to the slowest branch instead of the sum.
+# Every branch reports its own wall time as a BranchTimingEvent.
+# =========================================
+
+import json
+import time
+from collections.abc import Sequence
+from typing import Any, Never
+
+from agent_framework import (
+    AgentExecutor,
+    AgentExecutorRequest,
+    AgentExecutorResponse,
+    ChatMessage,
+    Executor,
+    ExecutorEvent,
+    Role,
+    Workflow,
+    WorkflowBuilder,
+    WorkflowContext,
+    handler,
+)
+
+
+class BranchTimingEvent(ExecutorEvent):
+    """
+    Workflow event carrying the wall time of one branch (executor) run.
+    """
+
+    def __init__(self, executor_id: str, started_at: float, elapsed_ms: float):
+        super().__init__(executor_id, {"started_at": started_at, "elapsed_ms": elapsed_ms})
+        self.started_at = started_at
+        self.elapsed_ms = elapsed_ms
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(executor_id={self.executor_id}, elapsed_ms={self.elapsed_ms:.1f})"
+
+
+class TimedAgentExecutor(AgentExecutor):
+    """
+    AgentExecutor that emits a BranchTimingEvent after every agent run.
+    """
+
+    async def _run_agent_and_emit(self, ctx: WorkflowContext) -> None:
+        started_at = time.time()
+        start = time.perf_counter()
+        await super()._run_agent_and_emit(ctx)
+        await ctx.add_event(BranchTimingEvent(self.id, started_at, (time.perf_counter() - start) * 1000))
+
+
+class InputBroadcaster(Executor):
+    """
+    Start executor that turns the user prompt into one request for every fan-out branch.
+    """
+
+    def __init__(self, id: str = "broadcast"):
+        super().__init__(id)
+
+    @handler
+    async def broadcast(self, prompt: str, ctx: WorkflowContext[AgentExecutorRequest]) -> None:
+        await ctx.send_message(
+            AgentExecutorRequest(messages=[ChatMessage(role=Role.USER, text=prompt)], should_respond=True)
+        )
+
+
+def parse_structured_output(response: AgentExecutorResponse) -> Any:
+    """
+    Return a branch's structured output: the parsed response_format value when present,
+    otherwise its text decoded as JSON, otherwise the raw text.
+    """
+    run_response = response.agent_run_response
+    value = getattr(run_response, "value", None)
+    if value is not None:
+        return value.model_dump() if hasattr(value, "model_dump") else value
+    try:
+        return json.loads(run_response.text)
+    except (TypeError, ValueError):
+        return run_response.text
+
+
+class StructuredFanIn(Executor):
+    """
+    Fan-in aggregator that merges every branch's structured output into one dict
+    keyed by executor id, and yields it as the workflow output.
+    """
+
+    def __init__(self, id: str = "aggregate"):
+        super().__init__(id)
+
+    @handler
+    async def aggregate(self, responses: list[AgentExecutorResponse], ctx: WorkflowContext[Never, dict]) -> None:
+        await ctx.yield_output({response.executor_id: parse_structured_output(response) for response in responses})
+
+
+def build_fan_out_workflow(
+    branches: Sequence[AgentExecutor],
+    *,
+    broadcaster: Executor | None = None,
+    aggregator: Executor | None = None,
+) -> Workflow:
+    """
+    Build a workflow that runs `branches` concurrently on the same prompt and merges
+    their outputs with a fan-in aggregator.
+    """
+    if len(branches) < 2:
+        raise ValueError("A fan-out workflow needs at least two branches.")
+    broadcaster = broadcaster or InputBroadcaster()
+    aggregator = aggregator or StructuredFanIn()
+    return (
+        WorkflowBuilder()
+        .set_start_executor(broadcaster)
+        .add_fan_out_edges(broadcaster, list(branches))
+        .add_fan_in_edges(list(branches), aggregator)
+        .build()
+    )
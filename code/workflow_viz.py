@@ -0,0 +1,124 @@
+
+# =========================================
+# Content-addressed, Background Workflow Visualization
+# =========================================
+# agent_workflow.py used to call WorkflowViz(workflow).save_svg(...) on every run, so
+# each run started a graphviz subprocess before the first token was even requested.
+#
+# render_workflow_svg() hashes the workflow graph (its DOT source, which is cheap to
+# build) and records the digest in the SVG it writes. When the file on disk already has
+# the same digest, the topology is unchanged and nothing is rendered. Otherwise the
+# render runs on a worker thread: the call returns immediately with a Future and the
+# workflow can start streaming. Rendering problems (e.g. missing graphviz executables)
+# are logged, never raised into the run.
+#
+# Usage:
+#   render_workflow_svg(workflow, "docs/agent_workflow.svg")       # fire and forget
+#   render_workflow_svg(workflow, "docs/agent_workflow.svg").result()   # wait for it
+#
+# Set agent_workflow_viz=off (or 0 / false / no) to skip visualization entirely, e.g. in
+# production. Pending renders finish before the interpreter exits.
+# =========================================
+
+import os
+import re
+import hashlib
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from agent_framework import Workflow, WorkflowViz
+
+logger = logging.getLogger(__name__)
+
+_DIGEST_COMMENT = "<!-- workflow-digest: {} -->\n"
+_DIGEST_PATTERN = re.compile(rb"<!-- workflow-digest: ([0-9a-f]+) -->")
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+# (path, digest) of renders finished or in flight in this process
+_renders: dict[tuple[str, str], Future] = {}
+
+
+def viz_enabled() -> bool:
+    return os.getenv("agent_workflow_viz", "on").strip().lower() not in {"0", "off", "false", "no"}
+
+
+def workflow_digest(workflow: Workflow) -> str:
+    """
+    Hash of the workflow graph: the same executors and edges give the same digest.
+    """
+    return hashlib.sha256(WorkflowViz(workflow).to_digraph().encode()).hexdigest()[:16]
+
+
+def rendered_digest(path: str | Path) -> str | None:
+    """
+    Digest recorded in an SVG written by render_workflow_svg(), or None.
+    """
+    try:
+        with open(path, "rb") as file:
+            head = file.read(1024)
+    except OSError:
+        return None
+    match = _DIGEST_PATTERN.search(head)
+    return match.group(1).decode() if match else None
+
+
+def _render(workflow: Workflow, path: Path, digest: str) -> str:
+    rendered = Path(WorkflowViz(workflow).export(format="svg"))
+    try:
+        svg = rendered.read_text(encoding="utf-8")
+    finally:
+        rendered.unlink(missing_ok=True)
+    # Record the digest right after the XML declaration
+    prolog, newline, body = svg.partition("\n")
+    if not prolog.startswith("<?xml"):
+        prolog, newline, body = "", "", svg
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=path.parent, suffix=".svg.tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        file.write(prolog + newline + _DIGEST_COMMENT.format(digest) + body)
+    # Readers see the old or the new diagram, never a partial one
+    os.replace(temp, path)
+    logger.info("Rendered workflow %s to %s", digest, path)
+    return str(path)
+
+
+def _on_done(key: tuple[str, str], future: Future) -> None:
+    if future.cancelled() or future.exception() is not None:
+        logger.warning("Workflow visualization failed: %s", None if future.cancelled() else future.exception())
+        # Let the next call try again
+        with _lock:
+            _renders.pop(key, None)
+
+
+def render_workflow_svg(workflow: Workflow, path: str | Path) -> Future:
+    """
+    Render `workflow` to the SVG at `path` on a worker thread, unless visualization is
+    disabled or the file already shows this topology. The Future resolves to the path
+    (None when nothing was rendered).
+    """
+    global _executor
+    path = Path(path)
+    skipped: Future = Future()
+    if not viz_enabled():
+        skipped.set_result(None)
+        return skipped
+
+    digest = workflow_digest(workflow)
+    key = (str(path.resolve()), digest)
+    with _lock:
+        if key in _renders:
+            return _renders[key]
+        if rendered_digest(path) == digest:
+            skipped.set_result(None)
+            _renders[key] = skipped
+            return skipped
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workflow-viz")
+        future = _renders[key] = _executor.submit(_render, workflow, path, digest)
+    future.add_done_callback(partial(_on_done, key))
+    return future
@@ -0,0 +1,139 @@
+import asyncio
+import json
+
+import pytest
+from starlette.testclient import TestClient
+
+from agent_server import AgentServer
+from metrics import Metrics
+from mock_chat_client import MockChatClient, MockTurn
+
+
+class FailingAgent:
+    """
+    Agent whose runs raise `error`, as a bug or a tool timeout inside the run would.
+    """
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    def get_new_thread(self):
+        return None
+
+    async def run(self, message, thread=None):
+        raise self.error
+
+    async def run_stream(self, message, thread=None):
+        raise self.error
+        yield
+
+
+def _events(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(":"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.fixture
+def server() -> AgentServer:
+    agent = MockChatClient([MockTurn(text="It is sunny in Chennai.")]).create_agent(name="Indian-Agent")
+    return AgentServer(
+        {
+            "indian-agent": agent,
+            "broken": FailingAgent(KeyError("internal")),
+            "timeout": FailingAgent(TimeoutError("Tool 'get_weather' timed out after 10s.")),
+        },
+        metrics=Metrics(),
+    )
+
+
+def test_run_stream_and_resume_thread(server):
+    client = TestClient(server.app())
+    first = _events(client.post("/agents/indian-agent/run_stream", json={"message": "Weather?"}).text)
+    assert [name for name, _ in first] == ["update"] * (len(first) - 1) + ["done"]
+    assert "".join(data["text"] for name, data in first if name == "update") == "It is sunny in Chennai."
+
+    thread = first[-1][1]["thread"]
+    response = client.post("/agents/indian-agent/run", json={"message": "And tomorrow?", "thread": thread})
+    assert response.status_code == 200
+    assert len(response.json()["thread"]["chat_message_store_state"]["messages"]) == 4
+
+
+@pytest.mark.parametrize("thread", [{"bogus": 1}, {"chat_message_store_state": {"messages": [{"contents": []}]}}])
+@pytest.mark.parametrize("route", ["run", "run_stream"])
+def test_malformed_thread_state_is_a_bad_request(server, route, thread):
+    client = TestClient(server.app())
+    response = client.post(f"/agents/indian-agent/{route}", json={"message": "Weather?", "thread": thread})
+    assert response.status_code == 400
+    assert "thread" in response.json()["error"]
+    assert server.stats.active == 0
+    assert server.stats.failed == 0
+
+
+def test_unknown_agent_and_bad_body(server):
+    client = TestClient(server.app())
+    assert client.post("/agents/nobody/run", json={"message": "hi"}).status_code == 404
+    assert client.post("/agents/indian-agent/run", json={"text": "hi"}).status_code == 400
+
+
+def test_errors_inside_a_run_are_not_reported_as_client_errors(server):
+    client = TestClient(server.app(), raise_server_exceptions=False)
+    response = client.post("/agents/broken/run", json={"message": "hi"})
+    assert response.status_code == 500
+    assert server.stats.failed == 1
+    assert server.stats.active == 0
+
+
+def test_timeout_inside_a_streamed_run_is_an_error_event(server):
+    client = TestClient(server.app())
+    events = _events(client.post("/agents/timeout/run_stream", json={"message": "hi"}).text)
+    assert events == [("error", {"error": "Tool 'get_weather' timed out after 10s."})]
+    assert server.stats.slow_clients == 0
+    assert server.stats.failed == 1
+
+
+def test_admission_control_rejects_above_max_streams(server):
+    server.max_streams = 0
+    response = TestClient(server.app()).post("/agents/indian-agent/run", json={"message": "hi"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def _sse_stream(server: AgentServer, events):
+    async def read():
+        stream = server._sse(events)
+        chunks = [await anext(stream)]
+        # Stop reading long enough for the run to fill the buffer and give up on us
+        await asyncio.sleep(0.3)
+        chunks += [chunk async for chunk in stream]
+        return _events(b"".join(chunks).decode())
+
+    return asyncio.run(read())
+
+
+def test_slow_client_gets_a_terminal_error_event():
+    async def updates():
+        for index in range(10):
+            yield "update", {"text": str(index)}
+        yield "done", {}
+
+    server = AgentServer(buffer_size=1, slow_client_timeout=0.05, metrics=Metrics())
+    events = _sse_stream(server, updates())
+    assert events[0] == ("update", {"text": "0"})
+    assert events[-1] == ("error", {"error": "Client read too slowly; the run was cancelled."})
+    assert "done" not in [name for name, _ in events]
+    assert (server.stats.slow_clients, server.stats.disconnected, server.stats.failed) == (1, 1, 0)
+
+
+def test_failed_run_with_a_slow_client_does_not_block_on_the_error_event():
+    async def updates():
+        yield "update", {"text": "0"}
+        yield "update", {"text": "1"}
+        raise KeyError("internal")
+
+    server = AgentServer(buffer_size=1, slow_client_timeout=0.05, metrics=Metrics())
+    events = _sse_stream(server, updates())
+    assert events[-1] == ("error", {"error": "Client read too slowly; the run was cancelled."})
+    assert (server.stats.failed, server.stats.slow_clients, server.stats.disconnected) == (1, 1, 1)
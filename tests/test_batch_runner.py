@@ -0,0 +1,28 @@
+import asyncio
+import io
+import json
+
+import pytest
+from agent_cli import build_parser
+from batch_runner import run_batch
+from mock_chat_client import MockChatClient, MockTurn
+
+
+def test_every_prompt_gets_one_result_line():
+    agent = MockChatClient([MockTurn(text="It is sunny.")]).create_agent(name="Indian-Agent")
+    source = io.StringIO('{"id": "a", "prompt": "Weather in Chennai?"}\n"Weather in Delhi?"\n\n[1]\nnot json\n')
+    sink = io.StringIO()
+    summary = asyncio.run(run_batch(agent, source, sink, concurrency=2))
+    results = {result["id"]: result for result in map(json.loads, sink.getvalue().splitlines())}
+    assert results["a"]["response"] == results[2]["response"] == "It is sunny."
+    assert "error" in results[4] and "error" in results[5]
+    assert (summary.succeeded, summary.failed) == (2, 2)
+
+
+def test_concurrency_below_one_is_rejected():
+    agent = MockChatClient([MockTurn(text="It is sunny.")]).create_agent(name="Indian-Agent")
+    with pytest.raises(ValueError, match="concurrency"):
+        asyncio.run(run_batch(agent, io.StringIO('"Weather?"\n'), io.StringIO(), concurrency=0))
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["batch", "--concurrency", "0"])
+    assert build_parser().parse_args(["batch", "--concurrency", "4"]).concurrency == 4
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+import client_factory
+from client_factory import AzureConfig, PoolSettings, connection_stats, get_chat_client, get_http_client
+from stand_in_server import StandInServer
+
+
+def _config(endpoint: str) -> AzureConfig:
+    return AzureConfig(endpoint=endpoint, api_key="test", deployment_name="test", api_version="2024-10-21")
+
+
+def test_agents_share_one_keep_alive_pool():
+    async def scenario():
+        async with StandInServer(reply="It is sunny in Chennai.") as server:
+            config = _config(server.endpoint)
+            weather = get_chat_client(config).create_agent(name="Indian-Weather-Agent")
+            tourist = get_chat_client(config).create_agent(name="Indian-Tourist-Agent")
+            assert weather.chat_client is tourist.chat_client
+
+            reused = []
+            for agent in (weather, tourist, weather):
+                assert (await agent.run("Weather?")).text == "It is sunny in Chennai."
+                reused.append(connection_stats(config).reused_connections)
+            stats = connection_stats(config)
+            await client_factory.aclose_clients()
+            return reused, stats, server.stats
+
+    reused, stats, server_stats = asyncio.run(scenario())
+    # Every hop after the first reuses the connection the first one opened
+    assert reused == [0, 1, 2]
+    assert (stats.requests, stats.new_connections) == (3, 1)
+    assert server_stats.connections == 1
+
+
+def test_conflicting_pool_settings_are_rejected():
+    async def scenario():
+        config = _config("http://127.0.0.1:9")
+        small = PoolSettings(max_connections=2, http2=False)
+        client = get_http_client(config, small)
+        assert get_http_client(config) is client
+        assert get_http_client(config, PoolSettings(max_connections=2, http2=False)) is client
+        with pytest.raises(ValueError, match="pool settings"):
+            get_http_client(config, PoolSettings(max_connections=4, http2=False))
+        await client_factory.aclose_clients()
+        # A closed client can be recreated with new settings
+        assert get_http_client(config, PoolSettings(max_connections=4, http2=False)) is not client
+        await client_factory.aclose_clients()
+
+    asyncio.run(scenario())
@@ -0,0 +1,91 @@
+import asyncio
+import socket
+import time
+
+import pytest
+import client_factory
+from client_factory import AzureConfig
+from hedged_client import hedged_chat_client
+from stand_in_server import StandInServer
+
+SLOW = "The primary deployment answered."
+FAST = "The secondary deployment answered."
+
+
+@pytest.fixture(autouse=True)
+def no_sdk_retries(monkeypatch):
+    # Every failure should reach the hedged client instead of being retried by the SDK
+    monkeypatch.setenv("agent_openai_max_retries", "0")
+    client_factory.load_pool_settings.cache_clear()
+    yield
+    client_factory.load_pool_settings.cache_clear()
+
+
+def _config(endpoint: str) -> AzureConfig:
+    return AzureConfig(endpoint=endpoint, api_key="test", deployment_name="test", api_version="2024-10-21")
+
+
+def _closed_port_endpoint() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def _hedged(primary: str, secondary: str, **options):
+    options.setdefault("max_hedge_rate", 1.0)
+    return hedged_chat_client([_config(primary), _config(secondary)], **options)
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_slow_primary_is_hedged_to_the_secondary(streaming):
+    async def scenario():
+        async with StandInServer(reply=SLOW, first_token_delay=2.0) as slow, StandInServer(reply=FAST) as fast:
+            client = _hedged(slow.endpoint, fast.endpoint, initial_threshold=0.2)
+            agent = client.create_agent(name="Indian-Agent")
+            start = time.perf_counter()
+            if streaming:
+                text = "".join([update.text async for update in agent.run_stream("Weather?")])
+            else:
+                text = (await agent.run("Weather?")).text
+            elapsed = time.perf_counter() - start
+            await client_factory.aclose_clients()
+            return client, text, elapsed, slow.stats.requests, fast.stats.requests
+
+    client, text, elapsed, slow_requests, fast_requests = asyncio.run(scenario())
+    assert text == FAST
+    assert (slow_requests, fast_requests) == (1, 1)
+    assert (client.stats.requests, client.stats.hedged, client.stats.hedge_wins) == (1, 1, 1)
+    # The primary was cancelled instead of being waited for
+    assert client.stats.cancelled == 1
+    assert elapsed < 1.5
+    # The hedge's own latency is recorded, not the threshold it waited on first
+    tracker = client.ttft if streaming else client.latency
+    assert max(tracker._samples) < 0.2
+
+
+def test_fast_primary_is_not_hedged():
+    async def scenario():
+        async with StandInServer(reply=SLOW) as primary, StandInServer(reply=FAST) as secondary:
+            client = _hedged(primary.endpoint, secondary.endpoint, initial_threshold=1.0)
+            text = (await client.create_agent(name="Indian-Agent").run("Weather?")).text
+            await client_factory.aclose_clients()
+            return client, text, secondary.stats.requests
+
+    client, text, secondary_requests = asyncio.run(scenario())
+    assert text == SLOW
+    assert secondary_requests == 0
+    assert (client.stats.hedged, client.stats.cancelled) == (0, 0)
+
+
+def test_primary_error_before_the_first_token_fails_over():
+    async def scenario():
+        async with StandInServer(reply=FAST) as secondary:
+            # No hedging by time: only the failure may move the call to the secondary
+            client = _hedged(_closed_port_endpoint(), secondary.endpoint, initial_threshold=30)
+            text = "".join([update.text async for update in client.create_agent(name="Indian-Agent").run_stream("Weather?")])
+            await client_factory.aclose_clients()
+            return client, text
+
+    client, text = asyncio.run(scenario())
+    assert text == FAST
+    assert (client.stats.failovers, client.stats.hedged, client.stats.hedge_wins) == (1, 0, 1)
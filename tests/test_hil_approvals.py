@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+from agent_framework import FunctionCallContent, ai_function
+from hil_approvals import ApprovalPolicyCache, ResumableApprovals
+from mock_chat_client import MockChatClient, MockTurn
+
+
+@ai_function(approval_mode="always_require")
+def get_weather(location: str) -> str:
+    return f"The weather in {location} is sunny."
+
+
+def _agent():
+    client = MockChatClient([
+        MockTurn(tool_calls=[("get_weather", {"location": "Chennai"}), ("get_weather", {"location": "Delhi"})]),
+        MockTurn(text="Sunny in both cities."),
+    ])
+    return client.create_agent(name="Indian-Agent", tools=get_weather)
+
+
+class FlakyAgent:
+    """
+    Delegates to `agent`, but the first resumed run fails.
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.runs = 0
+
+    def get_new_thread(self):
+        return self.agent.get_new_thread()
+
+    async def deserialize_thread(self, state):
+        return await self.agent.deserialize_thread(state)
+
+    async def run(self, messages, **kwargs):
+        self.runs += 1
+        if self.runs == 2:
+            raise ConnectionError("upstream reset")
+        return await self.agent.run(messages, **kwargs)
+
+
+def test_resume_continues_the_stored_turn():
+    async def scenario():
+        approvals = ResumableApprovals(_agent())
+        result = await approvals.run("What is the weather in Chennai and Delhi?")
+        assert len(result.pending) == 2
+        resumed = await approvals.resume(result.turn_id, approved=True)
+        assert resumed.response.text == "Sunny in both cities."
+        assert approvals.store.pending_turns() == []
+
+    asyncio.run(scenario())
+
+
+def test_auto_approvals_do_not_extend_the_policy_window():
+    async def scenario():
+        policy = ApprovalPolicyCache(window=600)
+        chennai = policy.key(FunctionCallContent(call_id="0", name="get_weather", arguments={"location": "Chennai"}))
+        expires_at = time.monotonic() + 5
+        policy._approved[chennai] = expires_at
+
+        approvals = ResumableApprovals(_agent(), policy=policy)
+        result = await approvals.run("What is the weather in Chennai and Delhi?")
+        assert [request.function_call.parse_arguments() for request in result.pending] == [{"location": "Delhi"}]
+        assert result.auto_approved == 1
+
+        await approvals.resume(result.turn_id, approved=True)
+        assert policy._approved[chennai] == expires_at
+        assert len(policy._approved) == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_resume_keeps_the_turn_for_a_retry():
+    async def scenario():
+        approvals = ResumableApprovals(FlakyAgent(_agent()))
+        result = await approvals.run("What is the weather in Chennai and Delhi?")
+        with pytest.raises(ConnectionError):
+            await approvals.resume(result.turn_id, approved=True)
+        assert approvals.store.pending_turns() == [result.turn_id]
+
+        resumed = await approvals.resume(result.turn_id, approved=True)
+        assert resumed.response.text == "Sunny in both cities."
+        assert approvals.store.pending_turns() == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import signal
+import sys
+from pathlib import Path
+
+import pytest
+from mcp import ClientSession
+from mcp_pool import MCPStdioPool
+
+SERVER = str(Path(__file__).resolve().parents[1] / "code" / "mcp_search_server.py")
+
+
+def _pool(**kwargs) -> MCPStdioPool:
+    kwargs.setdefault("health_interval", None)
+    return MCPStdioPool(name="local-search", command=sys.executable, args=[SERVER], **kwargs)
+
+
+async def _search(tool, query: str) -> str:
+    (search,) = tool.functions
+    result = await search.invoke(arguments=search.input_model(query=query))
+    return "".join(content.text for content in result)
+
+
+def _server_pids() -> list[int]:
+    # Child processes of this test running the stand-in server (Linux only)
+    pids = []
+    if not Path("/proc").is_dir():
+        return pids
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            cmdline = (entry / "cmdline").read_bytes()
+        except OSError:
+            continue
+        parent = int(stat.rsplit(")", 1)[1].split()[1])
+        if parent == os.getpid() and SERVER.encode() in cmdline:
+            pids.append(int(entry.name))
+    return pids
+
+
+def test_lease_reuses_a_warm_session():
+    async def scenario():
+        async with _pool(size=1) as pool:
+            async with pool.lease() as first:
+                assert "Paris" in await _search(first, "capital of France")
+            async with pool.lease() as second:
+                assert "New Delhi" in await _search(second, "capital of India")
+            assert second is first
+            return pool.stats
+
+    stats = asyncio.run(scenario())
+    assert (stats.spawned, stats.leases, stats.respawned) == (1, 2, 0)
+
+
+def test_tools_list_runs_once_per_pool(monkeypatch):
+    calls = []
+    list_tools = ClientSession.list_tools
+
+    async def counting_list_tools(self, *args, **kwargs):
+        calls.append(self)
+        return await list_tools(self, *args, **kwargs)
+
+    monkeypatch.setattr(ClientSession, "list_tools", counting_list_tools)
+
+    async def scenario():
+        async with _pool(size=3) as pool:
+            async def use():
+                async with pool.lease() as tool:
+                    return await _search(tool, "Marina Beach")
+
+            results = await asyncio.gather(*(use() for _ in range(6)))
+            assert all("Chennai" in result for result in results)
+            return pool.stats
+
+    stats = asyncio.run(scenario())
+    assert stats.spawned == 3
+    assert stats.schema_loads == 1
+    assert len(calls) == 1
+
+
+@pytest.mark.skipif(not Path("/proc").is_dir(), reason="needs /proc to find the server process")
+def test_killed_session_is_respawned():
+    async def scenario():
+        async with _pool(size=1, respawn_backoff=0.1) as pool:
+            async with pool.lease() as first:
+                pass
+            (pid,) = _server_pids()
+            os.kill(pid, signal.SIGKILL)
+            await asyncio.sleep(0.2)
+            assert await pool.reap() == 1
+            async with pool.lease() as second:
+                assert second is not first
+                assert "Paris" in await _search(second, "capital of France")
+            assert _server_pids() != [pid]
+            return pool.stats
+
+    stats = asyncio.run(scenario())
+    assert (stats.spawned, stats.respawned) == (2, 1)
+
+
+def test_failed_startup_closes_the_started_sessions_and_can_be_retried():
+    async def scenario():
+        pool = _pool(size=2)
+        new_tool = pool._new_tool
+        spawned = []
+
+        def failing_second_tool():
+            tool = new_tool()
+            spawned.append(tool)
+            if len(spawned) == 2:
+                tool.args = ["-c", "import sys; sys.exit(1)"]
+            return tool
+
+        pool._new_tool = failing_second_tool
+        with pytest.raises(Exception):
+            await pool.start()
+        assert pool._owners == {}
+        assert pool._idle.empty()
+        assert _server_pids() == []
+
+        pool._new_tool = new_tool
+        try:
+            async with pool.lease() as tool:
+                assert "Paris" in await _search(tool, "capital of France")
+        finally:
+            await pool.close()
+        return pool.stats
+
+    stats = asyncio.run(scenario())
+    assert stats.spawn_failures == 1
+    assert stats.spawned == 3
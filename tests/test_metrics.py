@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+from agent_framework import AgentExecutor, AgentRunResponseUpdate, FunctionCallContent, Role, TextContent, WorkflowBuilder
+from metrics import Metrics, RunMetricsMiddleware
+from mock_chat_client import MockChatClient, MockTurn
+
+ANSWER = "It is sunny in Chennai today."
+
+
+def _count(metrics: Metrics, name: str, **labels: str) -> int:
+    histogram = metrics.histogram(name, **labels)
+    return histogram.count if histogram else 0
+
+
+def test_every_run_is_recorded():
+    async def scenario():
+        metrics = Metrics()
+        agent = MockChatClient([MockTurn(text=ANSWER)]).create_agent(name="Indian-Agent", middleware=metrics.middleware())
+        await agent.run("Weather?")
+        for _ in range(2):
+            async for _ in agent.run_stream("Weather?"):
+                pass
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert _count(metrics, "run_ms", agent="Indian-Agent") == 3
+    assert _count(metrics, "ttft_ms", agent="Indian-Agent") == 2
+    assert _count(metrics, "inter_token_ms", agent="Indian-Agent") > 0
+
+
+def test_stream_closed_early_is_timed_to_its_last_update():
+    async def updates():
+        for word in ANSWER.split():
+            yield AgentRunResponseUpdate(role=Role.ASSISTANT, contents=[TextContent(text=word)])
+
+    async def scenario():
+        metrics = Metrics()
+        stream = RunMetricsMiddleware(metrics)._timed_stream(updates(), time.perf_counter(), ())
+        async for _ in stream:
+            break
+        assert _count(metrics, "run_ms") == 0
+        await asyncio.sleep(0.2)
+        await stream.aclose()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert _count(metrics, "run_ms") == 1
+    assert metrics.histogram("run_ms").max_value < 200
+
+
+def test_text_after_a_function_call_in_the_same_update_is_a_token():
+    async def updates():
+        for word in ANSWER.split():
+            call = FunctionCallContent(call_id=word, name="get_weather", arguments={"location": "Chennai"})
+            yield AgentRunResponseUpdate(role=Role.ASSISTANT, contents=[call, TextContent(text=word)])
+
+    async def scenario():
+        metrics = Metrics()
+        async for _ in RunMetricsMiddleware(metrics)._timed_stream(updates(), time.perf_counter(), ()):
+            pass
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    assert _count(metrics, "ttft_ms") == 1
+    assert _count(metrics, "inter_token_ms") == len(ANSWER.split()) - 1
+
+
+def test_workflow_can_be_instrumented_by_several_metrics():
+    async def scenario():
+        client = MockChatClient([MockTurn(text=ANSWER)])
+        first = AgentExecutor(client.create_agent(name="first"), id="first")
+        second = AgentExecutor(client.create_agent(name="second"), id="second")
+        workflow = WorkflowBuilder().set_start_executor(first).add_edge(first, second).build()
+        metrics, other = Metrics(), Metrics()
+        metrics.instrument_workflow(workflow)
+        other.instrument_workflow(metrics.instrument_workflow(workflow))
+        await workflow.run("Weather?")
+        return metrics, other
+
+    metrics, other = asyncio.run(scenario())
+    for recorded in (metrics, other):
+        assert _count(recorded, "executor_ms", executor="first") == 1
+        assert _count(recorded, "executor_ms", executor="second") == 1
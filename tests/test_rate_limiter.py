@@ -0,0 +1,130 @@
+import asyncio
+
+import httpx
+from agent_framework import ChatContext, ChatMessage, ChatOptions, Role
+from mock_chat_client import MockChatClient, MockTurn
+from rate_limiter import RateLimiter, RateLimitMiddleware, retry_after_seconds
+
+
+class Throttled(Exception):
+    status_code = 429
+
+    def __init__(self, headers: dict[str, str]):
+        super().__init__("Too Many Requests")
+        self.response = httpx.Response(429, headers=headers)
+
+
+def _agent(limiter: RateLimiter):
+    client = MockChatClient([MockTurn(text="It is sunny in Chennai today.")])
+    return client.create_agent(name="Indian-Agent", middleware=[RateLimitMiddleware(limiter)])
+
+
+def _context(client=None, is_streaming: bool = False) -> ChatContext:
+    return ChatContext(
+        chat_client=client,
+        messages=[ChatMessage(role=Role.USER, text="Weather?")],
+        chat_options=ChatOptions(),
+        is_streaming=is_streaming,
+    )
+
+
+def test_completed_calls_grow_the_limit():
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=4)
+        agent = _agent(limiter)
+        await agent.run("Weather?")
+        async for _ in agent.run_stream("Weather?"):
+            pass
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.stats.completed == 2
+    assert limiter.concurrency > 4
+    assert limiter.in_flight == 0
+
+
+def test_stream_closed_early_frees_its_slot_without_growing_the_limit():
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=4)
+        stream = _agent(limiter).run_stream("Weather?")
+        async for _ in stream:
+            break
+        await stream.aclose()
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.stats.completed == 0
+    assert limiter.concurrency == 4
+
+
+def test_cancelled_stream_frees_its_slot_without_growing_the_limit():
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=4)
+        agent = MockChatClient([MockTurn(text="It is sunny in Chennai today.")], token_delay=0.05).create_agent(
+            name="Indian-Agent", middleware=[RateLimitMiddleware(limiter)]
+        )
+
+        async def consume():
+            async for _ in agent.run_stream("Weather?"):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.02)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.stats.completed == 0
+    assert limiter.concurrency == 4
+
+
+def test_call_ended_without_a_result_frees_its_slot():
+    async def end_without_result(context: ChatContext) -> None:
+        context.terminate = True
+
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=4)
+        middleware = RateLimitMiddleware(limiter)
+        await middleware.process(_context(), end_without_result)
+        context = _context(is_streaming=True)
+        await middleware.process(context, end_without_result)
+        assert [update async for update in context.result] == []
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert limiter.in_flight == 0
+    assert limiter.concurrency == 4
+
+
+def test_throttled_call_is_retried_and_halves_the_limit():
+    attempts = []
+
+    async def scenario():
+        limiter = RateLimiter(initial_concurrency=4, base_backoff=0)
+        client = MockChatClient([MockTurn(text="It is sunny in Chennai today.")])
+
+        async def flaky(context: ChatContext) -> None:
+            attempts.append(context)
+            if len(attempts) == 1:
+                raise Throttled({"retry-after-ms": "10"})
+            context.result = await client.get_response(context.messages)
+
+        context = _context(client)
+        await RateLimitMiddleware(limiter).process(context, flaky)
+        assert context.result.text == "It is sunny in Chennai today."
+        return limiter
+
+    limiter = asyncio.run(scenario())
+    assert len(attempts) == 2
+    assert (limiter.stats.throttled, limiter.stats.retries, limiter.stats.decreases) == (1, 1, 1)
+    assert limiter.in_flight == 0
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(Throttled({"retry-after-ms": "1500"})) == 1.5
+    assert retry_after_seconds(Throttled({"retry-after": "2"})) == 2.0
+    assert retry_after_seconds(Throttled({})) is None
+    assert retry_after_seconds(ValueError("not a 429")) is None
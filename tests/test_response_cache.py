@@ -0,0 +1,98 @@
+import asyncio
+import itertools
+
+from agent_framework import ChatMessage, ChatOptions, Role
+from mock_chat_client import MockChatClient, MockTurn
+import response_cache
+from response_cache import ResponseCache, ResponseCacheMiddleware, cache_key
+
+ANSWER = "The capital of India is New Delhi."
+
+
+def _agent(cache: ResponseCache, instructions: str = "You are a helpful assistant."):
+    client = MockChatClient([MockTurn(text=ANSWER)])
+    agent = client.create_agent(name="Indian-Agent", instructions=instructions, middleware=[ResponseCacheMiddleware(cache)])
+    return client, agent
+
+
+def test_repeated_run_is_served_from_the_cache(tmp_path):
+    async def scenario():
+        cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+        client, agent = _agent(cache)
+        first = await agent.run("What is the capital of India?")
+        second = await agent.run("What is the capital of India?")
+        assert first.text == second.text == ANSWER
+        assert client.call_count == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    asyncio.run(scenario())
+
+
+def test_stream_hit_replays_the_updates(tmp_path):
+    async def scenario():
+        cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+        client, agent = _agent(cache)
+        streamed = [update.text async for update in agent.run_stream("What is the capital of India?")]
+        replayed = [update.text async for update in agent.run_stream("What is the capital of India?")]
+        assert replayed == streamed
+        assert "".join(replayed) == ANSWER
+        assert client.call_count == 1
+        # Streamed and non-streaming calls share entries
+        assert (await agent.run("What is the capital of India?")).text == ANSWER
+        assert client.call_count == 1
+
+    asyncio.run(scenario())
+
+
+def test_stream_closed_early_is_not_cached(tmp_path):
+    async def scenario():
+        cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+        client, agent = _agent(cache)
+        stream = agent.run_stream("What is the capital of India?")
+        async for _ in stream:
+            break
+        await stream.aclose()
+        assert cache.total_bytes == 0
+        assert (await agent.run("What is the capital of India?")).text == ANSWER
+        assert client.call_count == 2
+
+    asyncio.run(scenario())
+
+
+def test_cache_survives_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def run_once() -> int:
+        cache = ResponseCache(path)
+        client, agent = _agent(cache)
+        assert (await agent.run("What is the capital of India?")).text == ANSWER
+        cache.close()
+        return client.call_count
+
+    assert asyncio.run(run_once()) == 1
+    assert asyncio.run(run_once()) == 0
+
+
+def test_key_covers_instructions_and_options_but_not_message_ids():
+    messages = [ChatMessage(role=Role.USER, text="What is the capital of India?", message_id="a")]
+    same = [ChatMessage(role=Role.USER, text="What is the capital of India?", message_id="b")]
+    options = ChatOptions(instructions="Be brief.")
+    assert cache_key(messages, options) == cache_key(same, options)
+    assert cache_key(messages, options) != cache_key(messages, ChatOptions(instructions="Be verbose."))
+    assert cache_key(messages, options) != cache_key(messages, ChatOptions(instructions="Be brief.", temperature=0.2))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(response_cache.time, "time", lambda: next(clock))
+    cache = ResponseCache(str(tmp_path / "cache.sqlite3"))
+    entry = [{"contents": [{"type": "text", "text": "It is sunny in Chennai."}]}]
+    cache.put("a", entry)
+    size = cache.total_bytes
+    cache.max_bytes = 2 * size
+    cache.put("b", entry)
+    assert cache.get("a") == entry
+    cache.put("c", entry)
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == entry
+    assert cache.total_bytes == 2 * size
@@ -0,0 +1,43 @@
+import gc
+import weakref
+from typing import Annotated
+
+from pydantic import Field
+from schema_registry import SchemaRegistry
+
+
+def get_weather(location: Annotated[str, Field(description="The location to get weather for")]) -> str:
+    """
+    Get the weather for a location.
+    """
+    return f"The weather in {location} is sunny."
+
+
+def test_declaration_is_built_once_per_function():
+    registry = SchemaRegistry()
+    first, second = registry.tool(get_weather), registry.tool(get_weather)
+    assert first is not second
+    assert first.input_model is second.input_model
+    assert (registry.stats.tool_misses, registry.stats.tool_hits) == (1, 1)
+
+
+def test_entries_do_not_keep_their_function_alive():
+    registry = SchemaRegistry()
+
+    def make_tool():
+        def lookup(location: str) -> str:
+            return location
+        return lookup
+
+    func = make_tool()
+    registry.tool(func)
+    alive = weakref.ref(func)
+    del func
+    gc.collect()
+    assert alive() is None
+    assert len(registry._tools) == 0
+
+    for _ in range(50):
+        registry.tool(make_tool())
+    gc.collect()
+    assert len(registry._tools) == 0
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import pytest
+from pydantic import BaseModel, Field
+from mock_chat_client import MockChatClient, MockTurn
+from structured_stream import IncrementalJSONObjectParser, partial_model, stream_structured
+
+DOCUMENT = json.dumps({
+    "name": "Chen\"nai\\",
+    "population": 11_503_293,
+    "coastal": True,
+    "mayor": None,
+    "temperature": -1.5e1,
+    "districts": ["North", {"name": "South}", "zones": [1, 2]}],
+    "nested": {"a": {"b": "]"}},
+    "weather": "rainy",
+}, indent=2)
+
+
+class CityInfo(BaseModel):
+    name: str | None = None
+    population: int | None = None
+    weather: str | None = Field(default=None, alias="forecast")
+
+
+def _feed(parser: IncrementalJSONObjectParser, text: str, size: int) -> list[tuple[str, object]]:
+    completed = []
+    for i in range(0, len(text), size):
+        completed += parser.feed(text[i:i + size])
+    return completed
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(DOCUMENT)])
+def test_fields_match_json_loads_for_any_chunking(size):
+    parser = IncrementalJSONObjectParser()
+    completed = _feed(parser, DOCUMENT, size)
+    assert parser.done
+    assert parser.fields == json.loads(DOCUMENT)
+    assert [key for key, _ in completed] == list(json.loads(DOCUMENT))
+    assert parser.consumed == len(DOCUMENT)
+
+
+def test_field_is_reported_as_soon_as_it_completes():
+    parser = IncrementalJSONObjectParser()
+    assert parser.feed('```json\n{"name": "Chen') == []
+    assert parser.feed('nai", "population": 115') == [("name", "Chennai")]
+    assert parser.feed('03293,') == [("population", 11503293)]
+    assert parser.feed(' "weather": "rainy"}\n```') == [("weather", "rainy")]
+    assert parser.done
+    # Text after the object is ignored
+    assert parser.feed('{"name": "Delhi"}') == []
+    assert parser.fields["name"] == "Chennai"
+
+
+def test_buffer_only_holds_the_current_token():
+    parser = IncrementalJSONObjectParser()
+    parser.feed('{"name": "' + "x" * 1000 + '", "weather": "ra')
+    parser.feed("i")
+    assert len(parser._buffer) <= len('"rai')
+
+
+def test_partial_model_validates_fields_one_by_one():
+    city = partial_model(CityInfo, {"name": "Chennai", "population": "many", "forecast": "rainy", "extra": 1})
+    assert city.name == "Chennai"
+    assert city.population == "many"
+    assert city.weather == "rainy"
+    assert city.model_fields_set == {"name", "population", "weather"}
+
+
+def test_stream_structured_yields_snapshots_then_the_validated_model():
+    async def scenario():
+        client = MockChatClient(
+            [MockTurn(structured={"name": "Chennai", "population": 11503293, "forecast": "rainy"})], chunk_size=5
+        )
+        agent = client.create_agent(name="Indian-Agent")
+        return [city async for city in stream_structured(agent.run_stream("Tell me about Chennai"), CityInfo)]
+
+    snapshots = asyncio.run(scenario())
+    assert [sorted(city.model_fields_set) for city in snapshots[:-1]] == [
+        ["name"], ["name", "population"], ["name", "population", "weather"],
+    ]
+    assert snapshots[-1] == CityInfo(name="Chennai", population=11503293, forecast="rainy")
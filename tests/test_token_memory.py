@@ -0,0 +1,65 @@
+import asyncio
+
+from agent_framework import ChatMessage, Role
+from token_memory import SUMMARY_PREFIX, TokenBudgetMessageStore
+
+
+def _turns(count: int) -> list[ChatMessage]:
+    messages = []
+    for index in range(count):
+        messages.append(ChatMessage(role=Role.USER, text=f"Question {index} about the weather in Chennai " * 5))
+        messages.append(ChatMessage(role=Role.ASSISTANT, text=f"Answer {index}: sunny for the next two days " * 5))
+    return messages
+
+
+def test_summary_survives_serialize_round_trips_unchanged():
+    async def scenario():
+        store = TokenBudgetMessageStore(max_tokens=400, keep_turns=1)
+        await store.add_messages(_turns(6))
+        assert store.summary
+        summary, tokens = store.summary, store.sent_tokens
+
+        for _ in range(3):
+            store = await TokenBudgetMessageStore.deserialize(await store.serialize(), max_tokens=400, keep_turns=1)
+
+        assert store.summary == summary
+        assert store.sent_tokens == tokens
+        sent = await store.list_messages()
+        assert sent[0].text.count(SUMMARY_PREFIX) == 1
+
+    asyncio.run(scenario())
+
+
+def test_summary_from_state_without_raw_summary_is_not_prefixed_twice():
+    async def scenario():
+        store = TokenBudgetMessageStore(max_tokens=400, keep_turns=1)
+        await store.add_messages(_turns(6))
+        state = await store.serialize()
+        # State written before the raw summary was recorded
+        del state["messages"][0]["additional_properties"]["summary"]
+
+        restored = await TokenBudgetMessageStore.deserialize(state, max_tokens=400, keep_turns=1)
+        assert restored.summary == store.summary
+
+    asyncio.run(scenario())
+
+
+def test_keep_turns_zero_compacts_every_turn():
+    async def scenario():
+        store = TokenBudgetMessageStore(max_tokens=100, keep_turns=0)
+        await store.add_messages(_turns(4))
+        assert store.summarized_turns > 0
+        assert store.sent_tokens <= store.full_history_tokens
+
+    asyncio.run(scenario())
+
+
+def test_recent_turns_are_kept_verbatim():
+    async def scenario():
+        store = TokenBudgetMessageStore(max_tokens=400, keep_turns=2)
+        messages = _turns(6)
+        await store.add_messages(messages)
+        sent = await store.list_messages()
+        assert [message.text for message in sent[-4:]] == [message.text for message in messages[-4:]]
+
+    asyncio.run(scenario())
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+from tool_cache import ToolCache, cached_tool
+from tool_executor import ToolExecutor
+
+
+def test_concurrent_calls_are_coalesced_and_normalized():
+    calls = []
+
+    async def get_weather(location: str) -> str:
+        calls.append(location)
+        await asyncio.sleep(0.01)
+        return f"sunny in {location}"
+
+    async def scenario():
+        cache = ToolCache(get_weather)
+        results = await asyncio.gather(*(cache.call(name) for name in ("Chennai", " chennai", "CHENNAI ")))
+        assert results == ["sunny in Chennai"] * 3
+        assert await cache.call("chennai") == "sunny in Chennai"
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert calls == ["Chennai"]
+    assert (cache.stats.misses, cache.stats.coalesced, cache.stats.hits) == (1, 2, 1)
+
+
+def test_cancelled_leader_does_not_fail_coalesced_waiters():
+    async def scenario():
+        gate = asyncio.Event()
+
+        async def get_weather(location: str) -> str:
+            await gate.wait()
+            return f"sunny in {location}"
+
+        cache = ToolCache(get_weather)
+        leader = asyncio.create_task(cache.call("Chennai"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.call("Chennai"))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        gate.set()
+        assert await waiter == "sunny in Chennai"
+        # The fetch completed for the waiter, so the result is cached
+        assert await cache.call("Chennai") == "sunny in Chennai"
+        assert cache.stats.hits == 1
+
+    asyncio.run(scenario())
+
+
+def test_errors_are_shared_but_not_cached():
+    attempts = []
+
+    async def flaky(location: str) -> str:
+        attempts.append(location)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("backend down")
+        return "ok"
+
+    async def scenario():
+        cache = ToolCache(flaky)
+        results = await asyncio.gather(cache.call("Chennai"), cache.call("Chennai"), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await cache.call("Chennai") == "ok"
+
+    asyncio.run(scenario())
+    assert len(attempts) == 2
+
+
+def test_sync_tool_runs_off_the_event_loop():
+    threads = []
+
+    @cached_tool(ttl=60)
+    def get_weather(location: str) -> str:
+        threads.append(threading.current_thread())
+        return f"sunny in {location}"
+
+    assert asyncio.run(get_weather("Chennai")) == "sunny in Chennai"
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_tool_executor_lends_its_thread_pool_to_cached_tools():
+    @cached_tool(ttl=60)
+    def get_weather(location: str) -> str:
+        return threading.current_thread().name
+
+    executor = ToolExecutor(max_threads=2)
+    try:
+        (tool,) = executor.wrap(get_weather)
+        assert get_weather.cache.executor is executor.thread_pool
+        assert asyncio.run(tool.invoke(arguments=tool.input_model(location="Chennai"))).startswith("agent-tool")
+    finally:
+        executor.shutdown()
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+import pytest
+from tool_executor import ToolExecutor, ToolTimeoutError
+
+
+def test_parallel_sync_calls_overlap_on_the_thread_pool():
+    running = []
+    both_running = threading.Barrier(2, timeout=2)
+
+    def get_weather(location: str) -> str:
+        running.append(location)
+        both_running.wait()
+        return f"sunny in {location}"
+
+    async def scenario():
+        (tool,) = executor.wrap(get_weather)
+        return await asyncio.gather(*(tool.invoke(arguments=tool.input_model(location=name)) for name in ("Chennai", "Delhi")))
+
+    executor = ToolExecutor(max_threads=2)
+    try:
+        assert asyncio.run(scenario()) == ["sunny in Chennai", "sunny in Delhi"]
+    finally:
+        executor.shutdown()
+    assert executor.stats["get_weather"].calls == 2
+
+
+def test_timed_out_call_keeps_its_slot_until_the_thread_finishes():
+    release = threading.Event()
+
+    def get_weather(location: str) -> str:
+        release.wait(5)
+        return f"sunny in {location}"
+
+    async def scenario():
+        (tool,) = executor.wrap(get_weather, concurrency={"get_weather": 1}, timeouts={"get_weather": 0.05})
+        with pytest.raises(ToolTimeoutError):
+            await tool.invoke(arguments=tool.input_model(location="Chennai"))
+        # The thread is still running, so the only slot is still taken
+        second = asyncio.create_task(tool.invoke(arguments=tool.input_model(location="Delhi")))
+        await asyncio.sleep(0.2)
+        assert not second.done()
+        assert tool._semaphore.locked()
+
+        release.set()
+        assert await second == "sunny in Delhi"
+        assert not tool._semaphore.locked()
+
+    executor = ToolExecutor(max_threads=4)
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+        executor.shutdown()
+    assert executor.stats["get_weather"].timeouts == 1